@@ -0,0 +1,203 @@
+import asyncio
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Optional, Tuple
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from auth import decode_token_username
+from metrics import (
+    ADMISSION_IN_FLIGHT, ADMISSION_LIMIT, ADMISSION_QUEUED,
+    ADMISSION_QUEUE_WAIT, ADMISSION_REJECTIONS
+)
+
+# Configuration
+SCAN_MAX_CONCURRENCY = int(os.getenv("SCAN_MAX_CONCURRENCY", "4"))
+SCAN_QUEUE_SIZE = int(os.getenv("SCAN_QUEUE_SIZE", "16"))
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", "16"))
+CHAT_QUEUE_SIZE = int(os.getenv("CHAT_QUEUE_SIZE", "32"))
+# Longest a request may wait for a slot before it is turned away with 503
+ADMISSION_QUEUE_TIMEOUT_S = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_S", "10"))
+# Per-user token bucket on LLM-backed routes; a rate of 0 disables it
+LLM_RATE_LIMIT_PER_MIN = float(os.getenv("LLM_RATE_LIMIT_PER_MIN", "30"))
+LLM_RATE_LIMIT_BURST = int(os.getenv("LLM_RATE_LIMIT_BURST", "10"))
+RATE_LIMIT_MAX_USERS = 10000  # buckets kept; the least recently seen user is forgotten
+
+class Rejected(Exception):
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+class ConcurrencyPool:
+    """At most `limit` requests run at once; up to `queue_size` more wait in FIFO order.
+
+    A request that finds the queue full, or waits longer than `queue_timeout`,
+    is rejected. Retry-After is estimated from the recent average time a slot
+    is held and the number of requests ahead.
+    """
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float = ADMISSION_QUEUE_TIMEOUT_S):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.avg_hold = 1.0  # seconds, exponentially weighted
+        self._waiters: Deque[asyncio.Future] = deque()
+        ADMISSION_LIMIT.set(limit, name)
+
+    def _retry_after(self) -> float:
+        return self.avg_hold * (len(self._waiters) + 1) / max(self.limit, 1)
+
+    def _reject(self, reason: str):
+        ADMISSION_REJECTIONS.inc(self.name, reason)
+        return Rejected(503, reason, self._retry_after())
+
+    def _gauges(self):
+        ADMISSION_IN_FLIGHT.set(self.active, self.name)
+        ADMISSION_QUEUED.set(len(self._waiters), self.name)
+
+    async def acquire(self):
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self._gauges()
+            return
+        if len(self._waiters) >= self.queue_size:
+            raise self._reject("queue_full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._gauges()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.done():
+                return  # the slot was handed over just as the budget ran out
+            self._forget(waiter)
+            raise self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            if waiter.done():
+                self.release(0.0)  # pass the slot we were just given on
+            else:
+                self._forget(waiter)
+            raise
+        finally:
+            ADMISSION_QUEUE_WAIT.observe(time.perf_counter() - start, self.name)
+
+    def _forget(self, waiter: asyncio.Future):
+        waiter.cancel()
+        self._waiters.remove(waiter)
+        self._gauges()
+
+    def release(self, held: float):
+        if held:
+            self.avg_hold = 0.8 * self.avg_hold + 0.2 * held
+        if self._waiters:
+            # Hand the slot straight to the next waiter; active stays the same
+            self._waiters.popleft().set_result(None)
+        else:
+            self.active -= 1
+        self._gauges()
+
+class TokenBucketLimiter:
+    """Per-key token buckets refilled at `rate_per_min`, holding at most `burst` tokens"""
+
+    def __init__(self, rate_per_min: float = LLM_RATE_LIMIT_PER_MIN, burst: int = LLM_RATE_LIMIT_BURST):
+        self.rate = rate_per_min / 60
+        self.burst = burst
+        # key -> (tokens, last refill)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str) -> float:
+        """Spend a token; returns 0 when allowed, else seconds until one is available"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > RATE_LIMIT_MAX_USERS:
+            self._buckets.popitem(last=False)
+        return wait
+
+class AdmissionPolicy:
+    def __init__(self, pool: ConcurrencyPool, rate_limited: bool = False):
+        self.pool = pool
+        self.rate_limited = rate_limited
+
+scan_pool = ConcurrencyPool("scan", SCAN_MAX_CONCURRENCY, SCAN_QUEUE_SIZE)
+chat_pool = ConcurrencyPool("chat", CHAT_MAX_CONCURRENCY, CHAT_QUEUE_SIZE)
+llm_rate_limiter = TokenBucketLimiter()
+
+# (method, path) -> policy; everything else is admitted untouched
+ADMISSION_ROUTES: Dict[Tuple[str, str], AdmissionPolicy] = {
+    ("POST", "/api/receipt/scan"): AdmissionPolicy(scan_pool, rate_limited=True),
+    ("POST", "/api/receipt/scan-batch"): AdmissionPolicy(scan_pool, rate_limited=True),
+    ("POST", "/api/chat"): AdmissionPolicy(chat_pool, rate_limited=True),
+}
+
+def _client_key(scope: Scope) -> str:
+    authorization = Headers(scope=scope).get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    username = decode_token_username(token) if scheme.lower() == "bearer" and token else None
+    if username is not None:
+        return f"user:{username}"
+    client = scope.get("client")
+    return f"ip:{client[0] if client else 'unknown'}"
+
+def _rejection(exc: Rejected) -> JSONResponse:
+    detail = (
+        "Too many requests, slow down" if exc.status_code == 429
+        else "Server is busy, try again shortly"
+    )
+    return JSONResponse(
+        {"detail": detail, "reason": exc.reason},
+        status_code=exc.status_code,
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    )
+
+class AdmissionMiddleware:
+    """Rate-limit and bound the concurrency of expensive routes.
+
+    Configured routes first spend a token from the caller's bucket (429 when
+    empty), then wait for a slot in their route's pool (503 when the queue is
+    full or the wait exceeds the budget). Other routes pass straight through,
+    so a burst of scans or chats cannot starve cheap reads.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Optional[Dict[Tuple[str, str], AdmissionPolicy]] = None):
+        self.app = app
+        self.routes = ADMISSION_ROUTES if routes is None else routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        policy = self.routes.get((scope["method"], scope["path"])) if scope["type"] == "http" else None
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            if policy.rate_limited and llm_rate_limiter.rate > 0:
+                wait = llm_rate_limiter.take(_client_key(scope))
+                if wait:
+                    ADMISSION_REJECTIONS.inc(policy.pool.name, "rate_limited")
+                    raise Rejected(429, "rate_limited", wait)
+            await policy.pool.acquire()
+        except Rejected as exc:
+            await _rejection(exc)(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            policy.pool.release(time.perf_counter() - start)
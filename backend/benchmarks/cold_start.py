@@ -0,0 +1,84 @@
+"""Cold start: time to import main and to finish the startup hook.
+
+Usage (from the backend directory):
+    python benchmarks/cold_start.py [--runs 15] [--max-ready-ms N]
+
+Each run is a fresh interpreter against a database that is already migrated,
+which is what a worker sees when it autoscales or reloads. The script also
+fails when a heavy optional dependency (OCR, LLM SDK) is imported before
+first use, or when the median time to ready exceeds --max-ready-ms, so it
+can run in CI as a regression guard.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Must stay unimported until a request needs them
+LAZY_MODULES = ("PIL", "pytesseract", "tesserocr", "openai", "uvicorn")
+
+PROBE = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+asyncio.run(main.app.router.startup())
+ready = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "ready_ms": (ready - start) * 1000,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+def probe(env) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    # Log records share stdout; the probe result is the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend cold start")
+    parser.add_argument("--runs", type=int, default=15)
+    parser.add_argument("--max-ready-ms", type=float, default=0, help="fail above this median; 0 disables")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite+aiosqlite:///{tmp}/cold_start.db",
+            SECRET_KEY="benchmark",
+            LOG_LEVEL="WARNING",
+        )
+        first = probe(env)  # creates the schema
+        runs = [probe(env) for _ in range(args.runs)]
+
+    print(f"first boot (creates schema): ready in {first['ready_ms']:.0f} ms")
+    print(f"{'':<10}{'median ms':>10}{'p90 ms':>9}")
+    for key in ("import_ms", "startup_ms", "ready_ms"):
+        values = sorted(run[key] for run in runs)
+        p90 = values[min(len(values) - 1, int(len(values) * 0.9))]
+        print(f"{key[:-3]:<10}{statistics.median(values):>10.0f}{p90:>9.0f}")
+
+    failed = False
+    loaded = sorted({name for run in runs for name in run["loaded"]})
+    if loaded:
+        print(f"FAIL: imported at startup: {', '.join(loaded)}")
+        failed = True
+    median_ready = statistics.median(run["ready_ms"] for run in runs)
+    if args.max_ready_ms and median_ready > args.max_ready_ms:
+        print(f"FAIL: median ready {median_ready:.0f} ms > {args.max_ready_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
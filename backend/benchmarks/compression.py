@@ -0,0 +1,115 @@
+"""Throughput and bytes-on-wire for list endpoints per content encoding.
+
+Usage (from the backend directory):
+    python benchmarks/compression.py [--items 500] [--plans 10] [--requests 50]
+
+"identity" is the uncompressed baseline. The JSON render comparison
+encodes the same meal-plan payload with the stdlib-based JSONResponse
+and with ORJSONResponse, the app's default response class.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+
+import httpx
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from main import app
+from database import engine, async_session_maker, migrate
+from models import PantryItemCreate, MealPlanCreate
+from auth import create_access_token
+from crud import create_user, create_pantry_item, create_meal_plan, get_meal_plans
+from serializers import meal_plan_to_dict
+
+def sample_meal(day: int, meal_type: str) -> dict:
+    return {
+        "date": f"2024-01-{day + 1:02d}",
+        "meal_type": meal_type,
+        "name": f"Roasted vegetable {meal_type} bowl #{day}",
+        "description": "A hearty bowl with seasonal vegetables, grains and a bright lemon dressing.",
+        "ingredients": [
+            {"item_name": name, "quantity": "1", "unit": "cup"}
+            for name in ("quinoa", "spinach", "carrot", "chickpeas", "lemon", "olive oil")
+        ],
+        "directions": [
+            "Preheat the oven to 425F and line a baking sheet with parchment paper.",
+            "Toss the chopped vegetables with olive oil, salt and pepper.",
+            "Roast for 25 minutes, turning halfway through, until golden at the edges.",
+            "Meanwhile cook the quinoa according to the package directions.",
+            "Whisk lemon juice with olive oil and season to taste.",
+            "Assemble bowls with quinoa, roasted vegetables and spinach, then drizzle with dressing.",
+        ],
+        "prep_time": "15 minutes",
+        "cook_time": "25 minutes",
+        "servings": 2,
+        "calories": 540,
+    }
+
+async def seed(num_items: int, num_plans: int) -> str:
+    await migrate()
+    async with async_session_maker() as db:
+        user = await create_user(db, "bench", "benchmark-password")
+        for i in range(num_items):
+            await create_pantry_item(db, user.id, PantryItemCreate(
+                item_name=f"Item {i % 50}", receipt_name=f"ITM {i} 12OZ",
+                days_before_expiry=7, type="vegetable", units="oz", volume=12, calories=150
+            ))
+        meals = [
+            sample_meal(day, meal_type)
+            for day in range(7) for meal_type in ("breakfast", "lunch", "dinner")
+        ]
+        for i in range(num_plans):
+            await create_meal_plan(db, user.id, MealPlanCreate(name=f"Plan {i}", meals=meals))
+    return create_access_token({"sub": "bench"})
+
+async def measure(client: httpx.AsyncClient, path: str, encoding: str, num_requests: int):
+    headers = {"Accept-Encoding": encoding}
+    response = await client.get(path, headers=headers)
+    wire_bytes = response.num_bytes_downloaded
+    start = time.perf_counter()
+    for _ in range(num_requests):
+        await client.get(path, headers=headers)
+    elapsed = time.perf_counter() - start
+    return num_requests / elapsed, wire_bytes
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--plans", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    token = await seed(args.items, args.plans)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport,
+        base_url="http://bench",
+        headers={"Authorization": f"Bearer {token}"}
+    ) as client:
+        print(f"{'endpoint':<36}{'encoding':<10}{'req/s':>10}{'bytes':>12}")
+        for path in (f"/api/pantry?limit={args.items}", "/api/meal-plans"):
+            for encoding in ("identity", "gzip", "br"):
+                rate, wire_bytes = await measure(client, path, encoding, args.requests)
+                print(f"{path:<36}{encoding:<10}{rate:>10.1f}{wire_bytes:>12}")
+
+    async with async_session_maker() as db:
+        payload = jsonable_encoder([meal_plan_to_dict(plan) for plan in await get_meal_plans(db, 1)])
+    print(f"\n{'meal-plan JSON render':<36}{'ms':>10}")
+    for name, response_class in (("JSONResponse", JSONResponse), ("ORJSONResponse", ORJSONResponse)):
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            response_class(payload)
+        elapsed = (time.perf_counter() - start) * 1000 / args.requests
+        print(f"{name:<36}{elapsed:>10.2f}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""Compare the pantry list serialization paths at 10k items per user.
+
+Usage (from the backend directory):
+    python benchmarks/list_projection.py [--items 10000] [--repeat 5]
+
+Paths measured:
+  orm+pydantic   load PantryItem entities, validate through PantryItemResponse
+                 and JSON-encode (the old /api/pantry path)
+  columns+orjson select every response column and encode with orjson
+  fields+orjson  select only item_name,date_estimated_expiry and encode
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+
+import orjson
+from sqlalchemy import insert
+
+from database import engine, async_session_maker, migrate, PantryItem
+from models import PantryItemResponse
+from crud import get_pantry_items, get_pantry_item_rows
+
+async def seed(num_items: int):
+    await migrate()
+    now = datetime.utcnow()
+    rows = [
+        {
+            "user_id": 1,
+            "item_name": f"Item {i}",
+            "receipt_name": f"ITM {i} 12OZ",
+            "date_added": now - timedelta(minutes=i),
+            "days_before_expiry": i % 30,
+            "date_estimated_expiry": now + timedelta(days=i % 30),
+            "perishable": i % 2 == 0,
+            "type": "vegetable",
+            "units": "oz",
+            "volume": 12.0,
+            "calories": 150.0,
+            "upc": f"{i:012d}",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(num_items)
+    ]
+    async with engine.begin() as conn:
+        await conn.execute(insert(PantryItem), rows)
+
+async def orm_pydantic(limit: int) -> bytes:
+    async with async_session_maker() as db:
+        items = await get_pantry_items(db, 1, 0, limit)
+        payload = [PantryItemResponse.model_validate(item).model_dump(mode="json") for item in items]
+        return json.dumps(payload).encode()
+
+async def columns_orjson(limit: int) -> bytes:
+    async with async_session_maker() as db:
+        return orjson.dumps(await get_pantry_item_rows(db, 1, None, 0, limit))
+
+async def fields_orjson(limit: int) -> bytes:
+    async with async_session_maker() as db:
+        rows = await get_pantry_item_rows(db, 1, ["id", "item_name", "date_estimated_expiry"], 0, limit)
+        return orjson.dumps(rows)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    await seed(args.items)
+    print(f"{'path':<16}{'best ms':>10}{'mean ms':>10}{'bytes':>12}")
+    for name, func in (
+        ("orm+pydantic", orm_pydantic),
+        ("columns+orjson", columns_orjson),
+        ("fields+orjson", fields_orjson),
+    ):
+        await func(args.items)  # warm up
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            body = await func(args.items)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{name:<16}{min(timings):>10.1f}{sum(timings) / len(timings):>10.1f}{len(body):>12}")
+    await engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""Latency-configurable stand-in for the AsyncOpenAI client.
+
+Install it with ``chatgpt_service._client = StubOpenAI(...)``. The real
+service functions still build their prompts and parse the replies; only
+the network round-trip is replaced by a sleep and canned answers.
+"""
+import asyncio
+import json
+import random
+import re
+from types import SimpleNamespace
+
+FOOD_TYPES = ["vegetable", "fruit", "dairy", "meat", "grain", "snack", "beverage"]
+
+def _usage(messages, content: str) -> SimpleNamespace:
+    prompt_chars = sum(len(message.get("content") or "") for message in messages)
+    return SimpleNamespace(prompt_tokens=prompt_chars // 4, completion_tokens=len(content) // 4)
+
+def _normalized_name(text: str) -> str:
+    name = text.rsplit(":", 1)[-1]
+    name = re.sub(r"\d+(\.\d+)?\s*(oz|lb|ct|pk|g|kg|ml|l)\b", "", name, flags=re.IGNORECASE)
+    name = re.sub(r"[^A-Za-z ]", " ", name)
+    return " ".join(name.split()).title() or "Food Item"
+
+def _item_details(rng: random.Random) -> str:
+    return json.dumps({
+        "days_before_expiry": rng.choice([3, 5, 7, 14, 30, 180]),
+        "perishable": rng.random() < 0.7,
+        "type": rng.choice(FOOD_TYPES),
+        "typical_units": rng.choice(["piece", "lb", "oz"]),
+        "calories_per_unit": round(rng.uniform(20, 400), 1)
+    })
+
+def _meal_plan(rng: random.Random) -> str:
+    meals = []
+    for day in range(7):
+        for meal_type in ("breakfast", "lunch", "dinner"):
+            meals.append({
+                "date": f"2024-01-{day + 1:02d}",
+                "meal_type": meal_type,
+                "name": f"Stub {meal_type} {day + 1}",
+                "description": "A simple meal from the benchmark stub.",
+                "ingredients": [
+                    {"item_name": name, "quantity": "1", "unit": "cup"}
+                    for name in rng.sample(["rice", "spinach", "eggs", "milk", "chicken", "beans", "tomato"], 3)
+                ],
+                "directions": ["Prepare the ingredients.", "Cook until done.", "Serve warm."],
+                "prep_time": "10 minutes",
+                "cook_time": "20 minutes",
+                "servings": 2,
+                "calories": 500
+            })
+    return json.dumps({"meals": meals})
+
+class _Completions:
+    def __init__(self, stub: "StubOpenAI"):
+        self.stub = stub
+
+    async def create(self, model=None, messages=(), response_format=None, **kwargs):
+        stub = self.stub
+        stub.calls += 1
+        await asyncio.sleep(max(0.0, stub.latency + stub.rng.uniform(-stub.jitter, stub.jitter)))
+        if stub.error_rate and stub.rng.random() < stub.error_rate:
+            raise RuntimeError("stub LLM error")
+
+        system = " ".join(m.get("content") or "" for m in messages if m.get("role") == "system")
+        user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        if "meal planning expert" in system:
+            content = _meal_plan(stub.rng)
+        elif response_format is not None:
+            content = _item_details(stub.rng)
+        elif "receipt item" in system:
+            content = _normalized_name(user)
+        else:
+            content = "Here is a quick idea from the benchmark stub: make a stir fry with what you have."
+
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=_usage(messages, content)
+        )
+
+class StubOpenAI:
+    def __init__(self, latency_ms: float = 300, jitter_ms: float = 50, error_rate: float = 0.0, seed: int = 0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=_Completions(self))
@@ -0,0 +1,295 @@
+"""End-to-end load test against the FastAPI app with a stubbed LLM.
+
+Runs the app in-process (httpx ASGITransport) against a throwaway SQLite
+database, or any DATABASE_URL given with --database-url (e.g. Postgres with
+asyncpg installed). chatgpt_service talks to benchmarks/llm_stub.StubOpenAI,
+and scans use the synthetic receipts from benchmarks/receipts.py, with OCR
+stubbed unless --ocr tesseract is given (then OCR_ENGINE picks the engine).
+
+Usage (from the backend directory):
+    python benchmarks/load_test.py --users 8 --duration 30 --output results.json
+    python benchmarks/load_test.py --compare baseline.json --output results.json
+
+Per operation the report has count, errors, throughput and
+p50/p95/p99 latency. --output saves it as JSON, and --compare prints the
+change against an earlier run.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Operation -> relative weight in the mixed workload
+WORKLOAD = {
+    "list_pantry": 20,
+    "list_pantry_large": 3,
+    "create_item": 15,
+    "update_item": 10,
+    "delete_item": 5,
+    "pantry_changes": 5,
+    "list_meal_plans": 10,
+    "get_meal_plan": 5,
+    "search": 5,
+    "scan": 3,
+    "scan_batch": 1,
+    "chat": 4,
+    "chat_meal_plan": 1,
+}
+
+def percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def timed(self, operation: str, request):
+        start = time.perf_counter()
+        try:
+            response = await request
+        except Exception:
+            self.errors[operation] += 1
+            return None
+        self.latencies[operation].append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            self.errors[operation] += 1
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        results = {}
+        for operation in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies[operation])
+            results[operation] = {
+                "count": len(values),
+                "errors": self.errors[operation],
+                "throughput_rps": round(len(values) / elapsed, 2),
+                "mean_ms": round(sum(values) / len(values), 2) if values else 0.0,
+                "p50_ms": round(percentile(values, 0.50), 2),
+                "p95_ms": round(percentile(values, 0.95), 2),
+                "p99_ms": round(percentile(values, 0.99), 2),
+                "max_ms": round(values[-1], 2) if values else 0.0,
+            }
+        return results
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+async def seed_large_pantry(user_id: int, num_items: int):
+    from sqlalchemy import insert
+    from database import engine, PantryItem
+
+    now = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "item_name": f"Item {i}",
+            "receipt_name": f"ITM {i}",
+            "date_added": now - timedelta(minutes=i),
+            "days_before_expiry": i % 30,
+            "date_estimated_expiry": now + timedelta(days=i % 30),
+            "perishable": True,
+            "type": "vegetable",
+            "units": "oz",
+            "volume": 1.0,
+            "calories": 100.0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(num_items)
+    ]
+    async with engine.begin() as conn:
+        for start in range(0, len(rows), 1000):
+            await conn.execute(insert(PantryItem), rows[start:start + 1000])
+
+async def virtual_user(index, client, recorder, corpus, large_headers, deadline, rng):
+    username = f"loaduser{index}_{rng.randrange(10**9)}"
+    password = "benchmark-password"
+    await recorder.timed("register", client.post("/api/auth/register", json={"username": username, "password": password}))
+    response = await recorder.timed("login", client.post("/api/auth/login", json={"username": username, "password": password}))
+    if response is None or response.status_code != 200:
+        return
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    item_ids, plan_ids = [], []
+    sync_cursor = None
+    operations, weights = zip(*WORKLOAD.items())
+
+    while time.perf_counter() < deadline:
+        operation = rng.choices(operations, weights)[0]
+        if operation == "list_pantry":
+            await recorder.timed(operation, client.get("/api/pantry", headers=headers))
+        elif operation == "list_pantry_large":
+            await recorder.timed(operation, client.get("/api/pantry", params={"limit": 100000}, headers=large_headers))
+        elif operation == "create_item":
+            response = await recorder.timed(operation, client.post(
+                "/api/pantry", headers=headers,
+                json={"item_name": rng.choice(["Milk", "Eggs", "Rice", "Spinach", "Apples"]), "volume": 1}
+            ))
+            if response is not None and response.status_code == 201:
+                item_ids.append(response.json()["id"])
+        elif operation == "update_item" and item_ids:
+            await recorder.timed(operation, client.put(
+                f"/api/pantry/{rng.choice(item_ids)}", headers=headers, json={"volume": rng.randint(1, 5)}
+            ))
+        elif operation == "delete_item" and item_ids:
+            item_id = item_ids.pop(rng.randrange(len(item_ids)))
+            await recorder.timed(operation, client.delete(f"/api/pantry/{item_id}", headers=headers))
+        elif operation == "pantry_changes":
+            params = {} if sync_cursor is None else {"since": sync_cursor}
+            response = await recorder.timed(operation, client.get("/api/pantry/changes", params=params, headers=headers))
+            if response is not None and response.status_code == 200:
+                sync_cursor = response.json()["cursor"]
+        elif operation == "list_meal_plans":
+            await recorder.timed(operation, client.get("/api/meal-plans", params={"view": "summary"}, headers=headers))
+        elif operation == "get_meal_plan" and plan_ids:
+            await recorder.timed(operation, client.get(f"/api/meal-plans/{rng.choice(plan_ids)}", headers=headers))
+        elif operation == "search":
+            await recorder.timed(operation, client.get("/api/search", params={"q": rng.choice(["milk", "rice", "spin"])}, headers=headers))
+        elif operation == "scan":
+            receipt = rng.choice(corpus)
+            response = await recorder.timed(operation, client.post(
+                "/api/receipt/scan", headers=headers, json={"image_base64": receipt["image_base64"]}
+            ))
+            if response is not None and response.status_code == 200:
+                item_ids.extend(item["id"] for item in response.json()["items"])
+        elif operation == "scan_batch":
+            receipts = rng.sample(corpus, min(4, len(corpus)))
+            response = await recorder.timed(operation, client.post(
+                "/api/receipt/scan-batch", headers=headers,
+                json={"images_base64": [receipt["image_base64"] for receipt in receipts]}
+            ))
+            if response is not None and response.status_code == 200:
+                item_ids.extend(item["id"] for receipt in response.json()["receipts"] for item in receipt["items"])
+        elif operation == "chat":
+            await recorder.timed(operation, client.post("/api/chat", headers=headers, json={"message": "How long does milk keep?"}))
+        elif operation == "chat_meal_plan":
+            response = await recorder.timed(operation, client.post(
+                "/api/chat", headers=headers, json={"message": "Make me a meal plan with what I have"}
+            ))
+            if response is not None and response.status_code == 200 and response.json().get("meal_plan"):
+                plan_ids.append(response.json()["meal_plan"]["id"])
+
+def print_report(results: dict, baseline: dict = None):
+    header = f"{'operation':<20}{'count':>7}{'err':>5}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    if baseline:
+        header += f"{'p95 vs base':>14}"
+    print(header)
+    for operation, stats in results.items():
+        line = (
+            f"{operation:<20}{stats['count']:>7}{stats['errors']:>5}{stats['throughput_rps']:>9.1f}"
+            f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+        )
+        if baseline:
+            before = baseline.get(operation, {}).get("p95_ms")
+            line += f"{((stats['p95_ms'] - before) / before * 100):>+13.1f}%" if before else f"{'n/a':>14}"
+        print(line)
+
+async def run(args):
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/load.db"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+    # Virtual users scan and chat far faster than people; measure the pools,
+    # not the per-user rate limit (export LLM_RATE_LIMIT_PER_MIN to include it)
+    os.environ.setdefault("LLM_RATE_LIMIT_PER_MIN", "0")
+
+    import httpx
+    import chatgpt_service
+    import ocr_service
+    from main import app
+    from database import engine, async_session_maker, migrate
+    from crud import create_user
+    from auth import create_access_token
+    from llm_stub import StubOpenAI
+    from receipts import build_corpus, StubOCREngine
+
+    stub = StubOpenAI(args.llm_latency_ms, args.llm_jitter_ms, args.llm_error_rate, args.seed)
+    chatgpt_service._client = stub
+    if args.ocr == "stub":
+        ocr_service._engine = StubOCREngine()
+
+    await migrate()
+    async with async_session_maker() as db:
+        large_user = await create_user(db, f"large_{random.randrange(10**9)}", "benchmark-password")
+    await seed_large_pantry(large_user.id, args.items)
+    large_headers = {"Authorization": f"Bearer {create_access_token({'sub': large_user.username})}"}
+    corpus = build_corpus(args.receipts, args.seed)
+
+    recorder = Recorder()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*[
+            virtual_user(index, client, recorder, corpus, large_headers, deadline, random.Random(args.seed + index))
+            for index in range(args.users)
+        ])
+        elapsed = time.perf_counter() - start
+    await engine.dispose()
+
+    return {
+        "meta": {
+            "git_revision": git_revision(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "database": os.environ["DATABASE_URL"].split("://", 1)[0],
+            "users": args.users,
+            "duration_s": round(elapsed, 2),
+            "large_pantry_items": args.items,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_jitter_ms": args.llm_jitter_ms,
+            "llm_calls": stub.calls,
+            "ocr": args.ocr,
+            "seed": args.seed,
+        },
+        "results": recorder.report(elapsed),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=8, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to run the mixed workload")
+    parser.add_argument("--items", type=int, default=10000, help="items in the large pantry")
+    parser.add_argument("--receipts", type=int, default=20, help="synthetic receipts in the corpus")
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--llm-jitter-ms", type=float, default=50)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--ocr", choices=["stub", "tesseract"], default="stub")
+    parser.add_argument("--database-url", help="defaults to a throwaway SQLite file")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+    print(json.dumps(report["meta"], indent=2))
+    print_report(report["results"], baseline)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"Saved results to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Compare OCR engines on the synthetic receipt corpus.
+
+Usage (from the backend directory, with tesseract installed):
+    python benchmarks/ocr_engines.py [--receipts 40] [--concurrency 4]
+
+Engines measured (see ocr_service.py):
+  pytesseract  tesseract CLI per image: process spawn, temp files, model load
+  tesserocr    persistent Tesseract API handles in a worker process pool
+               (skipped when the tesserocr package is not installed)
+
+Reports per-scan latency (p50/p95) and scans/sec at the given concurrency.
+The first tesserocr round warms the workers and is not timed.
+"""
+import argparse
+import asyncio
+import base64
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import ocr_service
+from receipts import build_corpus
+
+def percentile(sorted_values, fraction: float) -> float:
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+async def run_engine(engine, images, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def scan(image_data: bytes):
+        async with semaphore:
+            start = time.perf_counter()
+            await engine.recognize(image_data)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    # Warm-up: start workers / load models outside the timed run
+    await asyncio.gather(*[scan(image) for image in images[:concurrency]])
+    latencies.clear()
+
+    start = time.perf_counter()
+    await asyncio.gather(*[scan(image) for image in images])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(images) / elapsed, percentile(latencies, 0.50), percentile(latencies, 0.95)
+
+async def main_async(args):
+    images = [
+        base64.b64decode(receipt["image_base64"].split(",")[-1])
+        for receipt in build_corpus(args.receipts, args.seed)
+    ]
+    engines = [ocr_service.PytesseractEngine()]
+    if ocr_service.TESSEROCR_AVAILABLE:
+        engines.append(ocr_service.TesserocrPoolEngine(workers=args.concurrency))
+    else:
+        print("tesserocr not installed; measuring pytesseract only")
+
+    print(f"{'engine':<13}{'scans/s':>9}{'p50 ms':>10}{'p95 ms':>10}")
+    for engine in engines:
+        throughput, p50, p95 = await run_engine(engine, images, args.concurrency)
+        print(f"{engine.name:<13}{throughput:>9.1f}{p50:>10.1f}{p95:>10.1f}")
+        engine.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OCR engines")
+    parser.add_argument("--receipts", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Pantry prompt size and expiry coverage: old summary vs the token-budgeted builder.
+
+Usage (from the backend directory):
+    python benchmarks/prompt_context.py [--items 20 100 300] [--budget 200]
+
+Summaries measured:
+  legacy   the first 30 items in date_added order, one "- name: volume units" line each
+  budget   prompt_context.build_pantry_context (urgent perishables first,
+           grouped by type, cut at the token budget)
+
+"Urgent" is the share of perishables expiring within 3 days that made it into
+the prompt. Tokens use tiktoken when installed, else a 4 chars/token estimate.
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from prompt_context import build_pantry_context, estimate_tokens, PROMPT_PANTRY_TOKEN_BUDGET
+from receipts import PRODUCTS
+
+TYPES = ["produce", "dairy", "meat", "bakery", "pantry", "frozen", "snacks", "beverages"]
+UNITS = ["piece", "lb", "oz", "gallon", "pack", "can", "box"]
+
+def make_pantry(count: int, rng: random.Random, now: datetime):
+    items = []
+    for index in range(count):
+        perishable = rng.random() < 0.6
+        items.append({
+            "item_name": f"{PRODUCTS[index % len(PRODUCTS)].title()} {index:03d}",
+            "type": rng.choice(TYPES),
+            "volume": rng.choice([1, 1, 2, 0.5, 12, 3.5]),
+            "units": rng.choice(UNITS),
+            "perishable": perishable,
+            "date_added": now - timedelta(days=rng.randint(0, 30)),
+            "date_estimated_expiry": now + timedelta(days=rng.randint(0, 14) if perishable else rng.randint(60, 700)),
+        })
+    return items
+
+def legacy_summary(items):
+    newest_first = sorted(items, key=lambda item: item["date_added"], reverse=True)
+    return "\n".join([
+        f"- {item['item_name']}: {item.get('volume', '1')} {item.get('units', 'unit(s)')}"
+        for item in newest_first[:30]
+    ])
+
+def urgent_coverage(items, summary: str, now: datetime) -> float:
+    urgent = [
+        item for item in items
+        if item["perishable"] and (item["date_estimated_expiry"] - now).days <= 3
+    ]
+    if not urgent:
+        return 1.0
+    return sum(item["item_name"] in summary for item in urgent) / len(urgent)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pantry prompt context")
+    parser.add_argument("--items", type=int, nargs="+", default=[20, 100, 300])
+    parser.add_argument("--budget", type=int, default=PROMPT_PANTRY_TOKEN_BUDGET)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    now = datetime.utcnow()
+    print(f"{'items':>6}{'summary':>9}{'tokens':>8}{'listed':>8}{'urgent':>8}{'build ms':>10}")
+    for count in args.items:
+        items = make_pantry(count, random.Random(args.seed), now)
+        builders = {
+            "legacy": legacy_summary,
+            "budget": lambda pantry: build_pantry_context(pantry, args.budget, now),
+        }
+        for name, build in builders.items():
+            start = time.perf_counter()
+            summary = build(items)
+            elapsed = time.perf_counter() - start
+            listed = sum(item["item_name"] in summary for item in items)
+            print(
+                f"{count:>6}{name:>9}{estimate_tokens(summary):>8}{listed:>8}"
+                f"{urgent_coverage(items, summary, now):>8.2f}{elapsed * 1000:>10.2f}"
+            )
+
+if __name__ == "__main__":
+    main()
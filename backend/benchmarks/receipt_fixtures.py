@@ -0,0 +1,219 @@
+"""Hand-labeled receipt transcripts for the receipt parser benchmark.
+
+Unlike the synthetic corpus in receipts.py, these are not generated from the
+layouts the parser encodes. Each one is typed out line by line the way
+tesseract returns a phone photo of a grocery receipt, OCR slips included
+(O for 0, dropped decimal points, split lines, department headers, deposits
+and loyalty lines), and its items were labeled by reading the receipt, not by
+running the parser. Add new layouts here as they turn up in bug reports.
+"""
+
+FIXTURES = [
+    {
+        "source": "supermarket, quantity line before the item",
+        "text": """SAFEWAY
+Store 1711 Dir Jane Park
+Main: (650) 555-0142
+
+        PRODUCE
+GREEN ONIONS             0.99 S
+  2 @ 1.99
+GREEN PEPPERS            3.98 S
+LIMES                    0.50 S
+        GROCERY
+BARILLA SPAGHETTI        1.79 B
+  3 @ 2.50
+SIGNATURE CRUSHED TMTO   7.50 B
+        DAIRY
+LUCERNE MILK 2%          3.49 B
+CRV                      0.10 B
+Club Card Savings       -1.00
+****  BALANCE            18.35
+VISA CREDIT              18.35
+CHANGE                    0.00
+TOTAL NUMBER OF ITEMS SOLD =   9
+YOUR CLUB CARD SAVINGS     1.00""",
+        "labels": [
+            {"receipt_name": "GREEN ONIONS", "quantity": "1"},
+            {"receipt_name": "GREEN PEPPERS", "quantity": "2"},
+            {"receipt_name": "LIMES", "quantity": "1"},
+            {"receipt_name": "BARILLA SPAGHETTI", "quantity": "1"},
+            {"receipt_name": "SIGNATURE CRUSHED TMTO", "quantity": "3"},
+            {"receipt_name": "LUCERNE MILK 2%", "quantity": "1"},
+        ],
+    },
+    {
+        "source": "supermarket, quantity line after the item",
+        "text": """Kroger
+1420 W Main St
+  (555) 010-2020
+
+YOPLAIT ORIG YOGURT
+  4 @ 0.69               2.76  B
+KRO LARGE EGGS 12CT      2.29  B
+BANANAS
+  2.41 lb @ 0.59 /lb     1.42  B
+SC  KROGER SAVINGS       0.50-
+PRIVATE SELECTION BREAD  3.99  B
+   TAX                   0.00
+**** BALANCE             9.96
+MASTERCARD               9.96
+TOTAL SAVINGS            0.50""",
+        "labels": [
+            {"receipt_name": "YOPLAIT ORIG YOGURT", "quantity": "4"},
+            {"receipt_name": "KRO LARGE EGGS 12CT", "quantity": "1"},
+            {"receipt_name": "BANANAS", "quantity": "2.41"},
+            {"receipt_name": "PRIVATE SELECTION BREAD", "quantity": "1"},
+        ],
+    },
+    {
+        "source": "warehouse club with item numbers and instant savings",
+        "text": """COSTCO
+WHOLESALE
+Mountain View #423
+1000 N Rengstorff Ave
+
+E   512515 KS ORG EGGS   8.99 N
+E   27003 STRAWBERRIES   5.99 N
+E   1186238 KS WATER     4.49 A
+    334475 /1186238      1.00-A
+E   87745 ROTISSERIE     4.99 N
+E   1092 AVOCADO HASS    7.49 N
+SUBTOTAL                 30.95
+TAX                       0.32
+**** TOTAL               31.27
+XXXXXXXXXXXX1234 CHIP Read
+AID: A0000000031010
+TOTAL NUMBER OF ITEMS SOLD = 5
+INSTANT SAVINGS          $1.00""",
+        "labels": [
+            {"receipt_name": "KS ORG EGGS", "quantity": "1"},
+            {"receipt_name": "STRAWBERRIES", "quantity": "1"},
+            {"receipt_name": "KS WATER", "quantity": "1"},
+            {"receipt_name": "ROTISSERIE", "quantity": "1"},
+            {"receipt_name": "AVOCADO HASS", "quantity": "1"},
+        ],
+    },
+    {
+        "source": "big-box store with UPCs and OCR digit slips",
+        "text": """WALMART
+Save money. Live better.
+( 650 ) 555 - 0199
+ST# 02280 OP# 00000158 TE# 58 TR# 07066
+GV WHL MLK 007874235186 F    3.12 N
+BANANAS 000000004011 KF      1.24 N
+  2.11 lb @ 1 lb /0.58
+FROZ PIZZA O71921008911 F    4.98 N
+GV PNT BUTR 078742370750 F   2.38 N
+CLOROX WIPE 004460030623     5.97 X
+SUBTOTAL                    17.69
+TAX 1  7.250 %               0.43
+TOTAL                       18.12
+DEBIT TEND                  18.12
+CHANGE DUE                   0.00
+# ITEMS SOLD 5""",
+        "labels": [
+            {"receipt_name": "GV WHL MLK", "quantity": "1"},
+            {"receipt_name": "BANANAS", "quantity": "2.11"},
+            {"receipt_name": "FROZ PIZZA", "quantity": "1"},
+            {"receipt_name": "GV PNT BUTR", "quantity": "1"},
+            {"receipt_name": "CLOROX WIPE", "quantity": "1"},
+        ],
+    },
+    {
+        "source": "co-op with prices on their own line",
+        "text": """Rainbow Grocery Cooperative
+1745 Folsom Street
+
+BULK ROLLED OATS
+                         2.84
+ORGANIC CARROTS
+                         1.79
+FRESH TOFU FIRM
+                         2.49
+KOMBUCHA GINGER
+                         3.99
+BOTTLE DEPOSIT           0.05
+Subtotal                11.16
+Total                   11.16
+Visa                    11.16
+Thank you for shopping with us!""",
+        "labels": [
+            {"receipt_name": "BULK ROLLED OATS", "quantity": "1"},
+            {"receipt_name": "ORGANIC CARROTS", "quantity": "1"},
+            {"receipt_name": "FRESH TOFU FIRM", "quantity": "1"},
+            {"receipt_name": "KOMBUCHA GINGER", "quantity": "1"},
+        ],
+    },
+    {
+        "source": "discount grocer, multi-buy and void",
+        "text": """ALDI
+Store #67
+www.aldi.us
+
+     Whole Milk Gal       2.85 FA
+     Bread Wheat          1.45 FA
+  2 x Cucumbers           1.18 FA
+     Chips Tortilla       2.29 FA
+     Chips Tortilla       2.29 FA
+     VOID Chips Tortilla -2.29 FA
+     Shredded Mozz        2.65 FA
+Subtotal                 10.42
+Tax                       0.00
+Total                    10.42
+DEBIT                    10.42""",
+        "labels": [
+            {"receipt_name": "Whole Milk Gal", "quantity": "1"},
+            {"receipt_name": "Bread Wheat", "quantity": "1"},
+            {"receipt_name": "Cucumbers", "quantity": "2"},
+            {"receipt_name": "Chips Tortilla", "quantity": "1"},
+            {"receipt_name": "Shredded Mozz", "quantity": "1"},
+        ],
+    },
+    {
+        "source": "independent market, noisy OCR",
+        "text": """CORNER MARKET
+  OPEN 7 DAYS
+Cashier: 03  Reg: 1
+
+RED GRAPES 2.07 LB
+ @ 2.49/LB               5.15
+CHIC THIGH BNLS          6.71
+JASMINE RICE 5LB        8.99
+CILANTRO               0,79
+Ta x                     0.00
+T0TAL                   21.64
+CASH                    25.00
+CHANGE                   3.36""",
+        "labels": [
+            {"receipt_name": "RED GRAPES", "quantity": "2.07"},
+            {"receipt_name": "CHIC THIGH BNLS", "quantity": "1"},
+            {"receipt_name": "JASMINE RICE 5LB", "quantity": "1"},
+            {"receipt_name": "CILANTRO", "quantity": "1"},
+        ],
+    },
+    {
+        "source": "supermarket, weighed produce and bonus buys",
+        "text": """Trader Joe's
+#127 Westside
+OPEN 8:00AM TO 9:00PM DAILY
+
+SALE TRANSACTION
+ORGANIC BABY SPINACH         2.49
+HASS AVOCADO BAG             3.99
+CHICKEN TIKKA MASALA         3.99
+  2 @ 3.99
+GREEK YOGURT PLAIN          5.49
+ONIONS YELLOW 2 LB           1.99
+Items in Transaction:7
+Balance to pay              21.93
+Visa                        21.93""",
+        "labels": [
+            {"receipt_name": "ORGANIC BABY SPINACH", "quantity": "1"},
+            {"receipt_name": "HASS AVOCADO BAG", "quantity": "1"},
+            {"receipt_name": "CHICKEN TIKKA MASALA", "quantity": "2"},
+            {"receipt_name": "GREEK YOGURT PLAIN", "quantity": "1"},
+            {"receipt_name": "ONIONS YELLOW 2 LB", "quantity": "1"},
+        ],
+    },
+]
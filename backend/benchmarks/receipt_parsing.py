@@ -0,0 +1,142 @@
+"""Receipt parser throughput and accuracy on labeled receipts.
+
+Usage (from the backend directory):
+    python benchmarks/receipt_parsing.py [--receipts 700] [--repeat 20]
+
+Parsers measured:
+  legacy  the original line-by-line parse_receipt_items (kept here as a baseline)
+  engine  receipt_parser.parse_receipt
+
+Precision is the share of parsed items that are real items; every false
+positive would be sent to the LLM for normalization and enrichment. Recall is
+the share of labeled items found. Quantity accuracy is over the true
+positives.
+
+The synthetic corpus (receipts.py) is generated from the same layouts the
+parser encodes, so it measures speed and regressions, not real-world
+accuracy. The hand-labeled transcripts in receipt_fixtures.py are scored
+separately and are the accuracy numbers to quote.
+"""
+import argparse
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from receipt_parser import parse_receipt
+from receipt_fixtures import FIXTURES
+from receipts import build_labeled_corpus
+
+def legacy_parse(receipt_text: str):
+    items = []
+    for line in receipt_text.split('\n'):
+        line = line.strip()
+        if not line or len(line) < 3:
+            continue
+        skip_terms = ['total', 'subtotal', 'tax', 'change', 'cash', 'credit',
+                      'debit', 'thank you', 'receipt', 'store', 'date', 'time']
+        if any(term in line.lower() for term in skip_terms):
+            continue
+        if re.search(r'[a-zA-Z]{3,}', line):
+            price_match = re.search(r'\$?\d+\.\d{2}$', line)
+            item_name = line[:price_match.start()].strip() if price_match else line
+            qty_match = re.search(r'^(\d+)x?\s+', item_name, re.IGNORECASE)
+            quantity = "1"
+            if qty_match:
+                quantity = qty_match.group(1)
+                item_name = item_name[qty_match.end():].strip()
+            if item_name and len(item_name) > 2:
+                items.append({"receipt_name": item_name, "quantity": quantity})
+    return items
+
+PARSERS = {"legacy": legacy_parse, "engine": parse_receipt}
+
+def _key(name: str) -> str:
+    return " ".join(name.upper().split())
+
+def score(parser, corpus, group: str = "layout"):
+    true_positives = false_positives = false_negatives = quantity_correct = 0
+    per_layout = defaultdict(lambda: [0, 0, 0])  # layout -> [tp, fp, fn]
+    for receipt in corpus:
+        parsed = parser(receipt["text"])
+        expected = Counter(_key(label["receipt_name"]) for label in receipt["labels"])
+        quantities = {_key(label["receipt_name"]): label["quantity"] for label in receipt["labels"]}
+        tp = fp = 0
+        for item in parsed:
+            key = _key(item["receipt_name"])
+            if expected[key] > 0:
+                expected[key] -= 1
+                tp += 1
+                if float(item["quantity"]) == float(quantities[key]):
+                    quantity_correct += 1
+            else:
+                fp += 1
+        fn = sum(expected.values())
+        true_positives += tp
+        false_positives += fp
+        false_negatives += fn
+        stats = per_layout[receipt[group]]
+        stats[0] += tp
+        stats[1] += fp
+        stats[2] += fn
+    return true_positives, false_positives, false_negatives, quantity_correct, per_layout
+
+def _ratio(numerator: int, denominator: int) -> float:
+    return numerator / denominator if denominator else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the receipt parser")
+    parser.add_argument("--receipts", type=int, default=700)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = build_labeled_corpus(args.receipts, args.seed)
+    total_lines = sum(receipt["text"].count("\n") + 1 for receipt in corpus)
+    print(f"{len(corpus)} receipts, {total_lines} lines, "
+          f"{sum(len(receipt['labels']) for receipt in corpus)} labeled items")
+
+    print(f"{'parser':<8}{'lines/s':>12}{'precision':>11}{'recall':>9}{'qty acc':>9}{'junk items':>12}")
+    layouts = {}
+    for name, parse in PARSERS.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for receipt in corpus:
+                parse(receipt["text"])
+        elapsed = time.perf_counter() - start
+        tp, fp, fn, quantity_correct, per_layout = score(parse, corpus)
+        layouts[name] = per_layout
+        print(
+            f"{name:<8}{total_lines * args.repeat / elapsed:>12,.0f}"
+            f"{_ratio(tp, tp + fp):>11.3f}{_ratio(tp, tp + fn):>9.3f}"
+            f"{_ratio(quantity_correct, tp):>9.3f}{fp:>12}"
+        )
+
+    print(f"\n{'layout':<13}" + "".join(f"{name + ' P/R':>18}" for name in PARSERS))
+    for layout in sorted(layouts["engine"]):
+        row = f"{layout:<13}"
+        for name in PARSERS:
+            tp, fp, fn = layouts[name][layout]
+            row += f"{_ratio(tp, tp + fp):>11.3f}/{_ratio(tp, tp + fn):.3f}"
+        print(row)
+
+    print(f"\nHand-labeled transcripts: {len(FIXTURES)} receipts, "
+          f"{sum(len(receipt['labels']) for receipt in FIXTURES)} labeled items")
+    print(f"{'parser':<8}{'precision':>11}{'recall':>9}{'qty acc':>9}{'junk items':>12}")
+    fixtures = {}
+    for name, parse in PARSERS.items():
+        tp, fp, fn, quantity_correct, fixtures[name] = score(parse, FIXTURES, group="source")
+        print(
+            f"{name:<8}{_ratio(tp, tp + fp):>11.3f}{_ratio(tp, tp + fn):>9.3f}"
+            f"{_ratio(quantity_correct, tp):>9.3f}{fp:>12}"
+        )
+    print()
+    for source in (receipt["source"] for receipt in FIXTURES):
+        tp, fp, fn = fixtures["engine"][source]
+        print(f"  {source:<54} engine {_ratio(tp, tp + fp):.3f}/{_ratio(tp, tp + fn):.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Synthetic receipt corpus for benchmarks.
+
+Receipts are generated deterministically from a seed. Each image is a PNG
+with the receipt text drawn on it and also stored in a "receipt" text
+chunk, so benchmarks can stub OCR (StubOCREngine / stub_image_to_string)
+when tesseract is not installed.
+
+Write a corpus to disk:
+    python benchmarks/receipts.py --out /tmp/receipts --count 20
+"""
+import argparse
+import base64
+import io
+import random
+from pathlib import Path
+from typing import List, Tuple
+
+from PIL import Image, ImageDraw
+from PIL.PngImagePlugin import PngInfo
+
+PRODUCTS = [
+    "ORG BABY SPINACH 5OZ", "BANANAS", "GALA APPLES 3LB", "WHOLE MILK 1GAL",
+    "LARGE EGGS 12CT", "CHKN BRST BNLS", "GRND BEEF 80/20", "SHARP CHEDDAR 8OZ",
+    "GREEK YOGURT 32OZ", "BROWN RICE 2LB", "PENNE PASTA 16OZ", "ROMA TOMATOES",
+    "YELLOW ONIONS 3LB", "RUSSET POTATOES 5LB", "BLK BEANS 15OZ", "OLIVE OIL 500ML",
+    "SOURDOUGH LOAF", "BUTTER UNSLTD", "CARROTS 2LB", "BROCCOLI CROWNS",
+    "AVOCADOS HASS", "STRAWBERRIES 1LB", "OAT MILK 64OZ", "FROZEN PEAS 16OZ",
+]
+STORES = ["FRESH MART #1042", "GREEN GROCER", "VALUE FOODS 77", "CORNER MARKET"]
+
+def generate_receipt_text(rng: random.Random, num_items: int = 12) -> str:
+    lines = [rng.choice(STORES), "123 MAIN ST", f"DATE 01/{rng.randint(1, 28):02d}/2024 TIME 10:{rng.randint(10, 59)}", ""]
+    subtotal = 0.0
+    for product in rng.sample(PRODUCTS, min(num_items, len(PRODUCTS))):
+        price = round(rng.uniform(0.99, 12.99), 2)
+        subtotal += price
+        quantity = rng.choice(["", "", "", "2 ", "3x "])
+        lines.append(f"{quantity}{product}   {price:.2f}")
+    tax = round(subtotal * 0.07, 2)
+    lines += ["", f"SUBTOTAL {subtotal:.2f}", f"TAX {tax:.2f}", f"TOTAL {subtotal + tax:.2f}", "THANK YOU"]
+    return "\n".join(lines)
+
+# Layouts for the labeled parser corpus; each exercises one receipt feature
+LAYOUTS = ["plain", "weighted", "quantity_at", "multi_line", "discounts", "warehouse", "upc_suffix"]
+LAYOUT_STORES = {"warehouse": "COSTCO WHOLESALE #118", "upc_suffix": "WALMART SUPERCENTER"}
+PRODUCE = ["BANANAS", "ROMA TOMATOES", "GALA APPLES", "YELLOW ONIONS", "RUSSET POTATOES", "GRAPES RED"]
+
+def generate_labeled_receipt(rng: random.Random, layout: str, num_items: int = 10) -> Tuple[str, List[dict]]:
+    """Return (receipt text, expected [{"receipt_name", "quantity"}]) for a layout"""
+    store = LAYOUT_STORES.get(layout, rng.choice(STORES))
+    lines = [store, "123 MAIN ST", f"DATE 01/{rng.randint(1, 28):02d}/2024 TIME 10:{rng.randint(10, 59)}", ""]
+    if layout == "upc_suffix":
+        lines.insert(1, "ST# 5821 OP# 004 TE# 12 TR# 0931")
+    labels = []
+    subtotal = 0.0
+    for product in rng.sample(PRODUCTS, min(num_items, len(PRODUCTS))):
+        price = round(rng.uniform(0.99, 12.99), 2)
+        subtotal += price
+        quantity = "1"
+        if layout == "warehouse":
+            lines.append(f"{rng.randint(10000, 999999)} {product}   {price:.2f} A")
+        elif layout == "upc_suffix":
+            lines.append(f"{product} {rng.randint(10**11, 10**12 - 1)} F   {price:.2f} N")
+        elif layout == "quantity_at" and rng.random() < 0.5:
+            quantity = str(rng.randint(2, 4))
+            lines.append(f"{product}")
+            lines.append(f"  {quantity} @ {price:.2f}   {int(quantity) * price:.2f}")
+        elif layout == "multi_line" and rng.random() < 0.5:
+            lines.append(product)
+            lines.append(f"{price:.2f}")
+        else:
+            prefix = rng.choice(["", "", "2 ", "3x "]) if layout == "plain" else ""
+            if prefix:
+                quantity = prefix.strip().rstrip("x")
+            lines.append(f"{prefix}{product}   {price:.2f}")
+        labels.append({"receipt_name": product, "quantity": quantity})
+
+        if layout == "discounts" and rng.random() < 0.3:
+            lines.append(f"COUPON {product[:10]}   -{rng.uniform(0.25, 1.5):.2f}")
+        if layout == "discounts" and rng.random() < 0.1:
+            # Voided immediately after being rung up
+            lines.append(f"VOID {product}   -{price:.2f}")
+            labels.pop()
+
+    if layout == "weighted":
+        for product in rng.sample(PRODUCE, 3):
+            weight = round(rng.uniform(0.3, 4.0), 2)
+            unit_price = round(rng.uniform(0.49, 3.99), 2)
+            lines.append(product)
+            lines.append(f"  {weight:.2f} lb @ {unit_price:.2f} /lb   {weight * unit_price:.2f}")
+            labels.append({"receipt_name": product, "quantity": f"{weight:.2f}"})
+
+    tax = round(subtotal * 0.07, 2)
+    lines += [
+        "", f"SUBTOTAL {subtotal:.2f}", f"TAX {tax:.2f}", f"TOTAL {subtotal + tax:.2f}",
+        f"VISA TEND {subtotal + tax:.2f}", "APPROVED AUTH 004512", "ITEMS SOLD 10",
+        "RETURNS ACCEPTED WITH RECEIPT", "THANK YOU FOR SHOPPING"
+    ]
+    return "\n".join(lines), labels
+
+def build_labeled_corpus(count: int, seed: int = 0) -> List[dict]:
+    """Return [{"layout", "text", "labels"}], cycling through LAYOUTS"""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(count):
+        layout = LAYOUTS[index % len(LAYOUTS)]
+        text, labels = generate_labeled_receipt(rng, layout, rng.randint(5, 15))
+        corpus.append({"layout": layout, "text": text, "labels": labels})
+    return corpus
+
+def render_receipt_png(text: str) -> bytes:
+    lines = text.split("\n")
+    image = Image.new("L", (420, 20 * len(lines) + 20), color=255)
+    draw = ImageDraw.Draw(image)
+    for index, line in enumerate(lines):
+        draw.text((10, 10 + 20 * index), line, fill=0)
+    info = PngInfo()
+    info.add_text("receipt", text)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", pnginfo=info)
+    return buffer.getvalue()
+
+def build_corpus(count: int, seed: int = 0) -> List[dict]:
+    """Return [{"text": ..., "image_base64": ...}] for `count` receipts"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        text = generate_receipt_text(rng, rng.randint(5, 20))
+        corpus.append({
+            "text": text,
+            "image_base64": "data:image/png;base64," + base64.b64encode(render_receipt_png(text)).decode()
+        })
+    return corpus
+
+def stub_image_to_string(image, *args, **kwargs) -> str:
+    """Drop-in for pytesseract.image_to_string that reads the embedded text"""
+    return image.info.get("receipt", "")
+
+class StubOCREngine:
+    """Drop-in for ocr_service's engine: ``ocr_service._engine = StubOCREngine()``"""
+
+    name = "stub"
+
+    async def recognize(self, image_data: bytes) -> str:
+        return stub_image_to_string(Image.open(io.BytesIO(image_data)))
+
+    def shutdown(self):
+        pass
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic receipt corpus")
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--count", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    for index, receipt in enumerate(build_corpus(args.count, args.seed)):
+        (out / f"receipt_{index:03d}.txt").write_text(receipt["text"])
+        (out / f"receipt_{index:03d}.png").write_bytes(render_receipt_png(receipt["text"]))
+    print(f"Wrote {args.count} receipts to {out}")
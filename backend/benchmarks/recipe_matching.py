@@ -0,0 +1,84 @@
+"""Local recipe matching latency and hit rate over a synthetic recipe corpus.
+
+Usage (from the backend directory):
+    python benchmarks/recipe_matching.py [--recipes 20000] [--pantry 60] [--queries 200] [--users 1]
+
+Builds a recipe_index.UserRecipes per user from random meals over the bundled
+food dataset, then times suggestions for random pantries of the first user. "Answered" is the share
+of queries with at least one recipe at RECIPE_MIN_COVERAGE, i.e. the recipe
+questions that would skip the LLM meal plan call.
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from food_knowledge import get_food_knowledge
+from recipe_index import UserRecipes, RECIPE_MIN_COVERAGE
+
+MEAL_TYPES = ["breakfast", "lunch", "dinner"]
+
+def make_meal(rng: random.Random, foods, index: int):
+    ingredients = rng.sample(foods, rng.randint(3, 8))
+    return {
+        "name": f"Recipe {index}",
+        "meal_type": rng.choice(MEAL_TYPES),
+        "description": None,
+        "ingredients": [{"item_name": food, "quantity": "1", "unit": ""} for food in ingredients],
+        "directions": ["Cook"],
+        "prep_time": None,
+        "cook_time": None,
+        "servings": 2,
+        "calories": None,
+    }
+
+def make_pantry(rng: random.Random, foods, size: int, now: datetime):
+    return [
+        {
+            "item_name": food,
+            "perishable": True,
+            "date_estimated_expiry": now + timedelta(days=rng.randint(0, 14)),
+        }
+        for food in rng.sample(foods, size)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local recipe matching")
+    parser.add_argument("--recipes", type=int, default=20000)
+    parser.add_argument("--pantry", type=int, default=60, help="pantry items per query")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--users", type=int, default=1, help="owners the recipes are spread over")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    foods = [entry.item_name for entry in get_food_knowledge().entries()]
+    users = {user_id: UserRecipes() for user_id in range(1, args.users + 1)}
+    start = time.perf_counter()
+    for meal_id in range(1, args.recipes + 1):
+        users[meal_id % args.users + 1].add_meal(meal_id, make_meal(rng, foods, meal_id))
+    index = users[1]
+    print(f"indexed {sum(len(recipes.recipes) for recipes in users.values())} recipes "
+          f"in {time.perf_counter() - start:.2f}s; user 1 has {len(index.recipes)} recipes, "
+          f"{len(index.postings)} ingredients")
+
+    now = datetime.utcnow()
+    timings = []
+    answered = 0
+    for _ in range(args.queries):
+        pantry = make_pantry(rng, foods, min(args.pantry, len(foods)), now)
+        start = time.perf_counter()
+        suggestions = index.suggest(pantry, min_coverage=RECIPE_MIN_COVERAGE, now=now)
+        timings.append((time.perf_counter() - start) * 1000)
+        answered += bool(suggestions)
+    timings.sort()
+    print(f"suggest p50 {statistics.median(timings):.2f} ms, "
+          f"p95 {timings[int(len(timings) * 0.95)]:.2f} ms, answered {answered / args.queries:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from chatgpt_service import chat_messages, summarize_conversation
+from crud import get_chat_thread, get_recent_chat_messages, update_chat_summary
+from database import ChatMessage, ChatThread, async_session_maker
+from prompt_context import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+# Upper bound on a chat prompt (system prompt, context, summary, turns, new message)
+CHAT_PROMPT_TOKEN_CEILING = int(os.getenv("CHAT_PROMPT_TOKEN_CEILING", "2000"))
+# Recent turns kept verbatim; older turns are folded into the rolling summary
+# once the unsummarized turns reach twice this
+CHAT_WINDOW_TOKENS = int(os.getenv("CHAT_WINDOW_TOKENS", "800"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "250"))
+CHAT_HISTORY_MAX_MESSAGES = 50  # unsummarized messages read per prompt
+# Most turns left verbatim after a summary, so many short turns still get folded
+CHAT_SUMMARY_KEEP_MESSAGES = CHAT_HISTORY_MAX_MESSAGES // 2
+
+def _window(messages: List[ChatMessage], budget_tokens: int) -> List[ChatMessage]:
+    """The newest messages whose tokens fit the budget, oldest first"""
+    kept = 0
+    used = 0
+    for message in reversed(messages):
+        if used + message.tokens > budget_tokens:
+            break
+        used += message.tokens
+        kept += 1
+    return messages[len(messages) - kept:]
+
+async def load_history(
+    db: AsyncSession,
+    thread: ChatThread,
+    message: str,
+    context: Dict[str, Any]
+) -> Tuple[List[Dict[str, str]], List[ChatMessage]]:
+    """Recent turns that fit under CHAT_PROMPT_TOKEN_CEILING with everything else in the prompt.
+
+    Returns the turns as prompt messages and every unsummarized message read,
+    which `needs_summary` uses to decide whether to fold older turns.
+    """
+    unsummarized = await get_recent_chat_messages(
+        db, thread.id, thread.summarized_through, limit=CHAT_HISTORY_MAX_MESSAGES
+    )
+    fixed = sum(
+        estimate_tokens(part["content"]) + 4
+        for part in chat_messages(message, context, summary=thread.summary)
+    )
+    budget = min(CHAT_WINDOW_TOKENS * 2, CHAT_PROMPT_TOKEN_CEILING - fixed)
+    history = [
+        {"role": turn.role, "content": turn.content}
+        for turn in _window(unsummarized, max(budget, 0))
+    ]
+    return history, unsummarized
+
+def needs_summary(unsummarized_tokens: int, unsummarized_count: int) -> bool:
+    """Either trigger leaves `summarize_thread` something to fold: the token
+    trigger overflows the CHAT_WINDOW_TOKENS window and the count trigger
+    overflows the CHAT_SUMMARY_KEEP_MESSAGES cap"""
+    return (
+        unsummarized_tokens >= CHAT_WINDOW_TOKENS * 2
+        or unsummarized_count >= CHAT_HISTORY_MAX_MESSAGES
+    )
+
+async def summarize_thread(thread_id: int):
+    """Fold everything but the last CHAT_WINDOW_TOKENS of turns (at most
+    CHAT_SUMMARY_KEEP_MESSAGES of them) into the thread's summary"""
+    async with async_session_maker() as db:
+        thread = await get_chat_thread(db, thread_id)
+        if thread is None:
+            return
+        previous_through = thread.summarized_through
+        messages = await get_recent_chat_messages(
+            db, thread_id, previous_through, limit=CHAT_HISTORY_MAX_MESSAGES * 4
+        )
+        kept = min(len(_window(messages, CHAT_WINDOW_TOKENS)), CHAT_SUMMARY_KEEP_MESSAGES)
+        older = messages[:len(messages) - kept]
+        if not older:
+            return
+        summary = await summarize_conversation(
+            thread.summary,
+            [{"role": message.role, "content": message.content} for message in older],
+            max_tokens=CHAT_SUMMARY_MAX_TOKENS
+        )
+        if summary:
+            await update_chat_summary(db, thread_id, summary, previous_through, older[-1].id)
+
+_summarizing: Set[int] = set()
+_tasks: Set[asyncio.Task] = set()
+
+def schedule_summary(thread_id: int) -> Optional[asyncio.Task]:
+    """Summarize a thread in the background; at most one run per thread at a time"""
+    if thread_id in _summarizing:
+        return None
+    _summarizing.add(thread_id)
+    task = asyncio.create_task(summarize_thread(thread_id))
+    _tasks.add(task)
+
+    def finished(task: asyncio.Task):
+        _tasks.discard(task)
+        _summarizing.discard(thread_id)
+        exc = None if task.cancelled() else task.exception()
+        if exc is not None:
+            logger.error(
+                "Error summarizing chat thread %d", thread_id,
+                exc_info=(type(exc), exc, exc.__traceback__)
+            )
+
+    task.add_done_callback(finished)
+    return task
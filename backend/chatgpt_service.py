@@ -2,6 +2,11 @@ import os
 import json
 from typing import List, Dict, Any, Optional
 
+from metrics import track_llm_call
+from prompt_context import build_pantry_context
+from singleflight import single_flight
+from tracing import span
+
 # Initialize OpenAI client (lazy loaded to avoid initialization errors)
 _client = None
 
@@ -13,11 +18,24 @@ def get_client():
         _client = AsyncOpenAI(api_key=api_key)
     return _client
 
+async def create_completion(function: str, **kwargs):
+    """Run a chat completion, recording latency, tokens and errors under `function`"""
+    with span(f"llm.{function}", model=kwargs.get("model")):
+        async with track_llm_call(function) as call:
+            response = await get_client().chat.completions.create(**kwargs)
+            call.record(response)
+    return response
+
+def _name_key(name: str) -> str:
+    return " ".join(name.lower().split())
+
+# Concurrent scans asking about the same name share one completion
+@single_flight("normalize_item_name", key=_name_key)
 async def normalize_item_name(receipt_name: str) -> str:
     """Convert receipt name to a normalized item name using GPT"""
     try:
-        client = get_client()
-        response = await client.chat.completions.create(
+        response = await create_completion(
+            "normalize_item_name",
             model="gpt-3.5-turbo",
             messages=[
                 {
@@ -37,11 +55,12 @@ async def normalize_item_name(receipt_name: str) -> str:
         print(f"Error normalizing item name: {e}")
         return receipt_name
 
+@single_flight("get_item_details", key=_name_key)
 async def get_item_details(item_name: str) -> Dict[str, Any]:
     """Get detailed information about a food item using GPT"""
     try:
-        client = get_client()
-        response = await client.chat.completions.create(
+        response = await create_completion(
+            "get_item_details",
             model="gpt-3.5-turbo",
             messages=[
                 {
@@ -81,13 +100,10 @@ async def generate_meal_plan(
 ) -> Dict[str, Any]:
     """Generate a meal plan based on user guidelines and available pantry items"""
     try:
-        client = get_client()
-        pantry_summary = "\n".join([
-            f"- {item['item_name']}: {item.get('volume', '1')} {item.get('units', 'unit(s)')}"
-            for item in pantry_items[:30]
-        ])
-        
-        response = await client.chat.completions.create(
+        pantry_summary = build_pantry_context(pantry_items)
+
+        response = await create_completion(
+            "generate_meal_plan",
             model="gpt-3.5-turbo",  # Using 3.5-turbo for cost optimization
             messages=[
                 {
@@ -105,7 +121,8 @@ async def generate_meal_plan(
                     - servings: number of servings
                     - calories: estimated total calories
                     
-                    Prioritize using the available pantry items."""
+                    Prioritize using the available pantry items, soonest to expire first.
+                    Pantry items are grouped by type; (Nd) means N days until it expires."""
                 },
                 {
                     "role": "user",
@@ -125,36 +142,41 @@ Generate a {num_days}-day meal plan."""
         print(f"Error generating meal plan: {e}")
         return {"meals": []}
 
+CHAT_SYSTEM_PROMPT = """You are a helpful pantry and meal planning assistant. 
+                You help users manage their food inventory and create meal plans.
+                Be concise and helpful."""
+
+def chat_messages(
+    message: str,
+    context: Optional[Dict[str, Any]] = None,
+    history: Optional[List[Dict[str, str]]] = None,
+    summary: Optional[str] = None
+) -> List[Dict[str, str]]:
+    """Prompt messages: system prompt, context, earlier-conversation summary, recent turns, new message"""
+    messages = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
+    if context:
+        messages.append({
+            "role": "system",
+            "content": f"Context: {json.dumps(context, separators=(',', ':'), default=str)}"
+        })
+    if summary:
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation: {summary}"})
+    messages.extend(history or [])
+    messages.append({"role": "user", "content": message})
+    return messages
+
 async def chat_with_assistant(
     message: str,
-    context: Optional[Dict[str, Any]] = None
+    context: Optional[Dict[str, Any]] = None,
+    history: Optional[List[Dict[str, str]]] = None,
+    summary: Optional[str] = None
 ) -> str:
     """General chat interface for the assistant"""
     try:
-        client = get_client()
-        messages = [
-            {
-                "role": "system",
-                "content": """You are a helpful pantry and meal planning assistant. 
-                You help users manage their food inventory and create meal plans.
-                Be concise and helpful."""
-            }
-        ]
-        
-        if context:
-            messages.append({
-                "role": "system",
-                "content": f"Context: {json.dumps(context)}"
-            })
-        
-        messages.append({
-            "role": "user",
-            "content": message
-        })
-        
-        response = await client.chat.completions.create(
+        response = await create_completion(
+            "chat_with_assistant",
             model="gpt-3.5-turbo",
-            messages=messages,
+            messages=chat_messages(message, context, history, summary),
             temperature=0.7,
             max_tokens=500
         )
@@ -162,3 +184,28 @@ async def chat_with_assistant(
     except Exception as e:
         print(f"Error in chat: {e}")
         return "I'm sorry, I encountered an error. Please try again."
+
+async def summarize_conversation(
+    summary: Optional[str],
+    turns: List[Dict[str, str]],
+    max_tokens: int = 250
+) -> str:
+    """Fold older turns into the rolling summary; errors propagate to the caller"""
+    transcript = "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+    response = await create_completion(
+        "summarize_conversation",
+        model="gpt-3.5-turbo",
+        messages=[
+            {
+                "role": "system",
+                "content": "Summarize this conversation between a user and a pantry and meal planning assistant. Keep the user's preferences, dietary constraints, decisions and open questions. Be brief; write plain prose."
+            },
+            {
+                "role": "user",
+                "content": f"Summary so far: {summary or '(none)'}\n\nNew messages:\n{transcript}"
+            }
+        ],
+        temperature=0.3,
+        max_tokens=max_tokens
+    )
+    return response.choices[0].message.content.strip()
@@ -0,0 +1,102 @@
+import gzip
+import os
+from typing import List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Configuration
+COMPRESSION_ALGORITHMS = [
+    name.strip()
+    for name in os.getenv("COMPRESSION_ALGORITHMS", "br,gzip").split(",")
+    if name.strip()
+]
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+def _compress(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+def choose_encoding(accept_encoding: str, algorithms: List[str]) -> Optional[str]:
+    """Pick the first configured algorithm the client accepts (q=0 means refused)"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip())
+    for name in algorithms:
+        if name == "br" and brotli is None:
+            continue
+        if name in accepted or "*" in accepted:
+            return name
+    return None
+
+class CompressionMiddleware:
+    """Compress buffered responses with brotli or gzip above a size threshold.
+
+    Streaming responses (more than one body chunk) and responses that
+    already carry a Content-Encoding are passed through unchanged.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        algorithms: Optional[List[str]] = None,
+        minimum_size: int = COMPRESSION_MINIMUM_SIZE
+    ):
+        self.app = app
+        self.algorithms = COMPRESSION_ALGORITHMS if algorithms is None else algorithms
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not self.algorithms:
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(
+            Headers(scope=scope).get("accept-encoding", ""), self.algorithms
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = _compress(encoding, body)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,14 +1,25 @@
+import os
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select, update, delete, func, or_
+from sqlalchemy.orm import selectinload
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
-from database import User, PantryItem, GlobalKnowledgeItem, MealPlan
+from database import (
+    engine, User, PantryItem, GlobalKnowledgeItem, MealPlan, MealPlanMeal, MealPlanIngredient,
+    CollectionRevision, PantryItemDeletion, ChatThread, ChatMessage
+)
 from models import (
     PantryItemCreate, PantryItemUpdate, 
     MealPlanCreate
 )
 from auth import get_password_hash
+from recipe_index import recipe_index
+from serializers import meal_to_dict
+from search_service import (
+    index_pantry_item, remove_pantry_item_from_index,
+    index_meal_plan, remove_meal_plan_from_index
+)
 
 # User CRUD
 async def create_user(db: AsyncSession, username: str, password: str) -> User:
@@ -20,19 +31,67 @@ async def create_user(db: AsyncSession, username: str, password: str) -> User:
     await db.refresh(db_user)
     return db_user
 
+# Configuration
+# Pantry tombstones older than this are pruned; sync cursors from before them get a 410
+PANTRY_TOMBSTONE_RETENTION_DAYS = int(os.getenv("PANTRY_TOMBSTONE_RETENTION_DAYS", "30"))
+
+# Collection revisions
+PANTRY_COLLECTION = "pantry"
+MEAL_PLANS_COLLECTION = "meal_plans"
+
+async def get_collection_revision(db: AsyncSession, user_id: int, collection: str) -> int:
+    """Get the current revision of a user's collection (0 if never written)"""
+    result = await db.execute(
+        select(CollectionRevision.revision)
+        .where(CollectionRevision.user_id == user_id, CollectionRevision.collection == collection)
+    )
+    return result.scalar_one_or_none() or 0
+
+async def bump_collection_revision(db: AsyncSession, user_id: int, collection: str) -> int:
+    """Increment a collection's revision and return it; call inside the writing transaction.
+
+    On SQLite and Postgres this is one INSERT ... ON CONFLICT DO UPDATE, which
+    locks the counter row until commit even on a user's first write, so writes
+    get revisions in commit order and rows stamped with them can serve as a
+    sync cursor.
+    """
+    dialect = engine.dialect.name
+    where = (CollectionRevision.user_id == user_id, CollectionRevision.collection == collection)
+    if dialect not in ("sqlite", "postgresql"):
+        result = await db.execute(
+            update(CollectionRevision)
+            .where(*where)
+            .values(revision=CollectionRevision.revision + 1)
+        )
+        if result.rowcount == 0:
+            db.add(CollectionRevision(user_id=user_id, collection=collection, revision=1))
+            await db.flush()
+            return 1
+        result = await db.execute(select(CollectionRevision.revision).where(*where))
+        return result.scalar_one()
+
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    statement = insert(CollectionRevision).values(
+        user_id=user_id, collection=collection, revision=1
+    )
+    result = await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[CollectionRevision.user_id, CollectionRevision.collection],
+            set_={"revision": CollectionRevision.revision + 1}
+        ).returning(CollectionRevision.revision)
+    )
+    return result.scalar_one()
+
 # Pantry Item CRUD
-async def create_pantry_item(
-    db: AsyncSession, 
-    user_id: int, 
-    item: PantryItemCreate
-) -> PantryItem:
-    """Create a new pantry item"""
+def _new_pantry_item(user_id: int, item: PantryItemCreate) -> PantryItem:
     # Calculate expiry date if days_before_expiry is provided
     date_estimated_expiry = None
     if item.days_before_expiry:
         date_estimated_expiry = datetime.utcnow() + timedelta(days=item.days_before_expiry)
-    
-    db_item = PantryItem(
+    return PantryItem(
         user_id=user_id,
         item_name=item.item_name,
         receipt_name=item.receipt_name,
@@ -45,7 +104,18 @@ async def create_pantry_item(
         calories=item.calories,
         upc=item.upc
     )
+
+async def create_pantry_item(
+    db: AsyncSession, 
+    user_id: int, 
+    item: PantryItemCreate
+) -> PantryItem:
+    """Create a new pantry item"""
+    db_item = _new_pantry_item(user_id, item)
+    db_item.revision = await bump_collection_revision(db, user_id, PANTRY_COLLECTION)
     db.add(db_item)
+    await db.flush()
+    await index_pantry_item(db, db_item)
     await db.commit()
     await db.refresh(db_item)
     
@@ -54,6 +124,32 @@ async def create_pantry_item(
     
     return db_item
 
+async def create_pantry_items(
+    db: AsyncSession,
+    user_id: int,
+    items: List[PantryItemCreate]
+) -> List[PantryItem]:
+    """Create many pantry items in one transaction (one revision bump, one commit)"""
+    revision = await bump_collection_revision(db, user_id, PANTRY_COLLECTION)
+    db_items = [_new_pantry_item(user_id, item) for item in items]
+    for db_item in db_items:
+        db_item.revision = revision
+    db.add_all(db_items)
+    await db.flush()
+    for db_item in db_items:
+        await index_pantry_item(db, db_item)
+
+    # Update global knowledge base: one upsert per distinct name
+    counts: Dict[str, int] = {}
+    first: Dict[str, PantryItemCreate] = {}
+    for item in items:
+        counts[item.item_name] = counts.get(item.item_name, 0) + 1
+        first.setdefault(item.item_name, item)
+    for item_name, count in counts.items():
+        await _upsert_global_knowledge(db, item_name, first[item_name], count)
+    await db.commit()
+    return db_items
+
 async def get_pantry_items(
     db: AsyncSession, 
     user_id: int,
@@ -70,6 +166,125 @@ async def get_pantry_items(
     )
     return result.scalars().all()
 
+# Columns that list endpoints may project with ?fields=
+PANTRY_ITEM_FIELDS = {
+    name: getattr(PantryItem, name)
+    for name in (
+        "id", "user_id", "item_name", "receipt_name", "date_added",
+        "days_before_expiry", "date_estimated_expiry", "perishable", "type",
+        "units", "volume", "calories", "upc", "created_at", "updated_at"
+    )
+}
+
+async def get_pantry_item_rows(
+    db: AsyncSession,
+    user_id: int,
+    fields: Optional[List[str]] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[Dict[str, Any]]:
+    """Get pantry items as plain dicts, selecting only the requested columns"""
+    columns = [PANTRY_ITEM_FIELDS[name] for name in fields or PANTRY_ITEM_FIELDS]
+    result = await db.execute(
+        select(*columns)
+        .where(PantryItem.user_id == user_id)
+        .order_by(PantryItem.date_added.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return [dict(row) for row in result.mappings()]
+
+async def get_pantry_context_rows(
+    db: AsyncSession,
+    user_id: int,
+    limit: int = 200
+) -> List[Dict[str, Any]]:
+    """Get the columns prompts use, perishables soonest to expire first"""
+    result = await db.execute(
+        select(
+            PantryItem.item_name, PantryItem.type, PantryItem.volume, PantryItem.units,
+            PantryItem.perishable, PantryItem.date_estimated_expiry
+        )
+        .where(PantryItem.user_id == user_id)
+        .order_by(
+            PantryItem.perishable.desc(),
+            PantryItem.date_estimated_expiry.is_(None),
+            PantryItem.date_estimated_expiry
+        )
+        .limit(limit)
+    )
+    return [dict(row) for row in result.mappings()]
+
+async def count_pantry_items(db: AsyncSession, user_id: int) -> int:
+    result = await db.execute(
+        select(func.count()).select_from(PantryItem).where(PantryItem.user_id == user_id)
+    )
+    return result.scalar_one()
+
+async def get_pantry_changes(
+    db: AsyncSession,
+    user_id: int,
+    since: Optional[int] = None
+) -> Optional[Tuple[List[Dict[str, Any]], List[int], int]]:
+    """Get pantry rows written after revision `since`, ids deleted after it, and the new cursor.
+
+    Without `since` every row is returned and there are no tombstones.
+    Returns None when tombstones after `since` have been pruned and the
+    client has to start over with a full snapshot.
+    """
+    # Every write up to the current revision has committed, so reading the
+    # counter first and bounding the rows by it never skips a write
+    result = await db.execute(
+        select(CollectionRevision.revision, CollectionRevision.pruned_revision)
+        .where(CollectionRevision.user_id == user_id, CollectionRevision.collection == PANTRY_COLLECTION)
+    )
+    cursor, pruned_revision = result.one_or_none() or (0, 0)
+    if since is not None and since < pruned_revision:
+        return None
+
+    query = select(*PANTRY_ITEM_FIELDS.values()).where(
+        PantryItem.user_id == user_id, PantryItem.revision <= cursor
+    )
+    if since is not None:
+        query = query.where(PantryItem.revision > since)
+    result = await db.execute(query.order_by(PantryItem.revision))
+    items = [dict(row) for row in result.mappings()]
+    if since is None:
+        return items, [], cursor
+
+    result = await db.execute(
+        select(PantryItemDeletion.item_id)
+        .where(
+            PantryItemDeletion.user_id == user_id,
+            PantryItemDeletion.revision > since,
+            PantryItemDeletion.revision <= cursor
+        )
+    )
+    # An id can come back if SQLite reuses it; the live row wins over its tombstone
+    live_ids = {item["id"] for item in items}
+    deleted_ids = sorted({item_id for item_id in result.scalars() if item_id not in live_ids})
+    return items, deleted_ids, cursor
+
+async def prune_pantry_tombstones(db: AsyncSession, user_id: int):
+    """Drop tombstones older than PANTRY_TOMBSTONE_RETENTION_DAYS and record the revision they covered"""
+    horizon = datetime.utcnow() - timedelta(days=PANTRY_TOMBSTONE_RETENTION_DAYS)
+    result = await db.execute(
+        select(func.max(PantryItemDeletion.revision))
+        .where(PantryItemDeletion.user_id == user_id, PantryItemDeletion.deleted_at < horizon)
+    )
+    pruned_through = result.scalar_one_or_none()
+    if pruned_through is None:
+        return
+    await db.execute(
+        delete(PantryItemDeletion)
+        .where(PantryItemDeletion.user_id == user_id, PantryItemDeletion.revision <= pruned_through)
+    )
+    await db.execute(
+        update(CollectionRevision)
+        .where(CollectionRevision.user_id == user_id, CollectionRevision.collection == PANTRY_COLLECTION)
+        .values(pruned_revision=pruned_through)
+    )
+
 async def get_pantry_item(
     db: AsyncSession, 
     item_id: int, 
@@ -105,6 +320,8 @@ async def update_pantry_item(
         setattr(db_item, field, value)
     
     db_item.updated_at = datetime.utcnow()
+    db_item.revision = await bump_collection_revision(db, user_id, PANTRY_COLLECTION)
+    await index_pantry_item(db, db_item)
     await db.commit()
     await db.refresh(db_item)
     return db_item
@@ -119,7 +336,11 @@ async def delete_pantry_item(
     if db_item is None:
         return False
     
+    revision = await bump_collection_revision(db, user_id, PANTRY_COLLECTION)
+    await remove_pantry_item_from_index(db, db_item.id)
+    db.add(PantryItemDeletion(user_id=user_id, item_id=db_item.id, revision=revision))
     await db.delete(db_item)
+    await prune_pantry_tombstones(db, user_id)
     await db.commit()
     return True
 
@@ -135,49 +356,234 @@ async def get_global_knowledge_item(
     )
     return result.scalar_one_or_none()
 
+async def get_global_knowledge_items(
+    db: AsyncSession,
+    item_names: List[str]
+) -> Dict[str, GlobalKnowledgeItem]:
+    """Get global knowledge items for many names in one query"""
+    if not item_names:
+        return {}
+    result = await db.execute(
+        select(GlobalKnowledgeItem)
+        .where(GlobalKnowledgeItem.item_name.in_(item_names))
+    )
+    return {knowledge.item_name: knowledge for knowledge in result.scalars()}
+
 async def update_global_knowledge(
     db: AsyncSession,
     item_name: str,
     item_data: PantryItemCreate
 ):
     """Update or create global knowledge item"""
-    existing = await get_global_knowledge_item(db, item_name)
-    
-    if existing:
-        # Increment usage count
-        existing.usage_count += 1
-        await db.commit()
+    await _upsert_global_knowledge(db, item_name, item_data, 1)
+    await db.commit()
+
+async def _upsert_global_knowledge(
+    db: AsyncSession,
+    item_name: str,
+    item_data: PantryItemCreate,
+    count: int
+):
+    """Create the knowledge entry or add `count` uses to it.
+
+    On SQLite and Postgres this is one INSERT ... ON CONFLICT, so concurrent
+    scans adding the same new name don't collide on the unique item_name.
+    """
+    dialect = engine.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        existing = await get_global_knowledge_item(db, item_name)
+        if existing:
+            # Increment usage count
+            existing.usage_count += count
+        else:
+            # Create new global knowledge entry
+            knowledge = _new_global_knowledge(item_name, item_data)
+            knowledge.usage_count = count
+            db.add(knowledge)
+            await db.flush()
+        return
+
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
     else:
-        # Create new global knowledge entry
-        db_knowledge = GlobalKnowledgeItem(
-            item_name=item_name,
-            typical_days_before_expiry=item_data.days_before_expiry,
-            perishable=item_data.perishable,
-            type=item_data.type,
-            typical_units=item_data.units,
-            calories_per_unit=item_data.calories / item_data.volume if item_data.calories and item_data.volume and item_data.volume > 0 else None
+        from sqlalchemy.dialects.postgresql import insert
+    knowledge = _new_global_knowledge(item_name, item_data)
+    statement = insert(GlobalKnowledgeItem).values(
+        item_name=item_name,
+        typical_days_before_expiry=knowledge.typical_days_before_expiry,
+        perishable=knowledge.perishable,
+        type=knowledge.type,
+        typical_units=knowledge.typical_units,
+        calories_per_unit=knowledge.calories_per_unit,
+        created_at=datetime.utcnow(),
+        usage_count=count
+    )
+    await db.execute(statement.on_conflict_do_update(
+        index_elements=[GlobalKnowledgeItem.item_name],
+        set_={"usage_count": GlobalKnowledgeItem.usage_count + statement.excluded.usage_count}
+    ))
+
+async def import_global_knowledge(db: AsyncSession, entries) -> int:
+    """Add knowledge entries whose names are not known yet; existing rows are kept.
+
+    Entries need the GlobalKnowledgeItem attributes. Imported rows start with
+    usage_count 0 so they don't outrank items people have actually added.
+    """
+    entries = list({entry.item_name: entry for entry in entries}.values())
+    existing = await get_global_knowledge_items(db, [entry.item_name for entry in entries])
+    added = [
+        GlobalKnowledgeItem(
+            item_name=entry.item_name,
+            typical_days_before_expiry=entry.typical_days_before_expiry,
+            perishable=entry.perishable,
+            type=entry.type,
+            typical_units=entry.typical_units,
+            calories_per_unit=entry.calories_per_unit,
+            usage_count=0
         )
-        db.add(db_knowledge)
-        await db.commit()
+        for entry in entries if entry.item_name not in existing
+    ]
+    db.add_all(added)
+    await db.commit()
+    return len(added)
+
+def _new_global_knowledge(item_name: str, item_data: PantryItemCreate) -> GlobalKnowledgeItem:
+    return GlobalKnowledgeItem(
+        item_name=item_name,
+        typical_days_before_expiry=item_data.days_before_expiry,
+        perishable=item_data.perishable,
+        type=item_data.type,
+        typical_units=item_data.units,
+        calories_per_unit=item_data.calories / item_data.volume if item_data.calories and item_data.volume and item_data.volume > 0 else None
+    )
+
+# Chat CRUD
+async def create_chat_thread(db: AsyncSession, user_id: int) -> ChatThread:
+    thread = ChatThread(user_id=user_id)
+    db.add(thread)
+    await db.flush()
+    return thread
+
+async def get_chat_thread(db: AsyncSession, thread_id: int, user_id: Optional[int] = None) -> Optional[ChatThread]:
+    """Get a chat thread, only if it belongs to `user_id` when given"""
+    query = select(ChatThread).where(ChatThread.id == thread_id)
+    if user_id is not None:
+        query = query.where(ChatThread.user_id == user_id)
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+async def get_chat_threads(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 50) -> List[ChatThread]:
+    result = await db.execute(
+        select(ChatThread)
+        .where(ChatThread.user_id == user_id)
+        .order_by(ChatThread.updated_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    return result.scalars().all()
+
+async def get_recent_chat_messages(
+    db: AsyncSession,
+    thread_id: int,
+    after_id: int = 0,
+    limit: int = 50
+) -> List[ChatMessage]:
+    """Get the newest `limit` messages with ids above `after_id`, oldest first"""
+    result = await db.execute(
+        select(ChatMessage)
+        .where(ChatMessage.thread_id == thread_id, ChatMessage.id > after_id)
+        .order_by(ChatMessage.id.desc())
+        .limit(limit)
+    )
+    return list(reversed(result.scalars().all()))
+
+async def add_chat_messages(db: AsyncSession, thread: ChatThread, messages: List[Tuple[str, str, int]]):
+    """Append (role, content, tokens) messages to a thread and commit"""
+    db.add_all([
+        ChatMessage(thread_id=thread.id, role=role, content=content, tokens=tokens)
+        for role, content, tokens in messages
+    ])
+    thread.updated_at = datetime.utcnow()
+    await db.commit()
+
+async def update_chat_summary(
+    db: AsyncSession,
+    thread_id: int,
+    summary: str,
+    previous_through: int,
+    summarized_through: int
+) -> bool:
+    """Store a new rolling summary unless another summarizer got there first"""
+    result = await db.execute(
+        update(ChatThread)
+        .where(ChatThread.id == thread_id, ChatThread.summarized_through == previous_through)
+        .values(summary=summary, summarized_through=summarized_through, updated_at=ChatThread.updated_at)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+async def delete_chat_thread(db: AsyncSession, thread_id: int, user_id: int) -> bool:
+    thread = await get_chat_thread(db, thread_id, user_id)
+    if thread is None:
+        return False
+    await db.execute(delete(ChatMessage).where(ChatMessage.thread_id == thread_id))
+    await db.delete(thread)
+    await db.commit()
+    return True
 
 # Meal Plan CRUD
+def _with_meals(query):
+    """Eagerly load meals and their ingredients (two extra IN queries per page)"""
+    return query.options(
+        selectinload(MealPlan.meals).selectinload(MealPlanMeal.ingredients)
+    )
+
+async def get_user_meals(
+    db: AsyncSession,
+    user_id: int
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """Get (plan id, meal) for every meal in a user's plans, oldest first"""
+    result = await db.execute(
+        select(MealPlanMeal)
+        .join(MealPlan, MealPlan.id == MealPlanMeal.meal_plan_id)
+        .options(selectinload(MealPlanMeal.ingredients))
+        .where(MealPlan.user_id == user_id)
+        .order_by(MealPlanMeal.id)
+    )
+    return [(meal.meal_plan_id, meal_to_dict(meal)) for meal in result.scalars().all()]
+
 async def create_meal_plan(
     db: AsyncSession,
     user_id: int,
     meal_plan: MealPlanCreate
 ) -> MealPlan:
     """Create a new meal plan"""
-    meals_data = [meal.model_dump() for meal in meal_plan.meals]
-    
     db_meal_plan = MealPlan(
         user_id=user_id,
         name=meal_plan.name,
         description=meal_plan.description,
-        meals=meals_data
+        meals=[
+            MealPlanMeal(
+                position=position,
+                ingredients=[
+                    MealPlanIngredient(position=index, **ingredient.model_dump())
+                    for index, ingredient in enumerate(meal.ingredients)
+                ],
+                **meal.model_dump(exclude={"ingredients"})
+            )
+            for position, meal in enumerate(meal_plan.meals)
+        ]
     )
     db.add(db_meal_plan)
+    await db.flush()
+    await index_meal_plan(db, db_meal_plan)
+    revision = await bump_collection_revision(db, user_id, MEAL_PLANS_COLLECTION)
     await db.commit()
-    await db.refresh(db_meal_plan)
+    # Only once committed, so a failed commit leaves no phantom recipes
+    recipe_index.add_plan(
+        user_id, revision, db_meal_plan.id,
+        [meal_to_dict(meal) for meal in db_meal_plan.meals]
+    )
     return db_meal_plan
 
 async def get_meal_plans(
@@ -186,9 +592,9 @@ async def get_meal_plans(
     skip: int = 0,
     limit: int = 100
 ) -> List[MealPlan]:
-    """Get all meal plans for a user"""
+    """Get all meal plans for a user, including every meal"""
     result = await db.execute(
-        select(MealPlan)
+        _with_meals(select(MealPlan))
         .where(MealPlan.user_id == user_id)
         .order_by(MealPlan.created_at.desc())
         .offset(skip)
@@ -196,6 +602,42 @@ async def get_meal_plans(
     )
     return result.scalars().all()
 
+# Plan-level columns that the summary view may project with ?fields=
+MEAL_PLAN_SUMMARY_FIELDS = {
+    "id": MealPlan.id,
+    "user_id": MealPlan.user_id,
+    "name": MealPlan.name,
+    "description": MealPlan.description,
+    "meal_count": func.count(MealPlanMeal.id).label("meal_count"),
+    "created_at": MealPlan.created_at,
+    "updated_at": MealPlan.updated_at,
+}
+
+async def get_meal_plan_summaries(
+    db: AsyncSession,
+    user_id: int,
+    fields: Optional[List[str]] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[Dict[str, Any]]:
+    """Get plan-level columns and meal counts without loading any meals"""
+    fields = list(fields or MEAL_PLAN_SUMMARY_FIELDS)
+    query = (
+        select(*[MEAL_PLAN_SUMMARY_FIELDS[name] for name in fields])
+        .where(MealPlan.user_id == user_id)
+        .order_by(MealPlan.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    # Only join the meals table when the count was actually asked for
+    if "meal_count" in fields:
+        query = (
+            query.outerjoin(MealPlanMeal, MealPlanMeal.meal_plan_id == MealPlan.id)
+            .group_by(MealPlan.id)
+        )
+    result = await db.execute(query)
+    return [dict(row) for row in result.mappings()]
+
 async def get_meal_plan(
     db: AsyncSession,
     meal_plan_id: int,
@@ -203,7 +645,7 @@ async def get_meal_plan(
 ) -> Optional[MealPlan]:
     """Get a specific meal plan"""
     result = await db.execute(
-        select(MealPlan)
+        _with_meals(select(MealPlan))
         .where(MealPlan.id == meal_plan_id, MealPlan.user_id == user_id)
     )
     return result.scalar_one_or_none()
@@ -214,10 +656,20 @@ async def delete_meal_plan(
     user_id: int
 ) -> bool:
     """Delete a meal plan"""
-    db_meal_plan = await get_meal_plan(db, meal_plan_id, user_id)
+    result = await db.execute(
+        select(MealPlan)
+        .where(MealPlan.id == meal_plan_id, MealPlan.user_id == user_id)
+    )
+    db_meal_plan = result.scalar_one_or_none()
     if db_meal_plan is None:
         return False
     
+    meal_ids = select(MealPlanMeal.id).where(MealPlanMeal.meal_plan_id == meal_plan_id)
+    await db.execute(delete(MealPlanIngredient).where(MealPlanIngredient.meal_id.in_(meal_ids)))
+    await db.execute(delete(MealPlanMeal).where(MealPlanMeal.meal_plan_id == meal_plan_id))
+    await remove_meal_plan_from_index(db, db_meal_plan.id)
+    revision = await bump_collection_revision(db, user_id, MEAL_PLANS_COLLECTION)
     await db.delete(db_meal_plan)
     await db.commit()
+    recipe_index.remove_plan(user_id, revision, meal_plan_id)
     return True
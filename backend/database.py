@@ -1,16 +1,30 @@
 import os
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import declarative_base
-from sqlalchemy import Column, Integer, String, DateTime, JSON, Boolean, Float, Text
+from sqlalchemy.orm import declarative_base, relationship
+from sqlalchemy import (
+    Column, Integer, String, DateTime, JSON, Boolean, Float, Text, ForeignKey, Index,
+    select, insert, update, delete, inspect
+)
 from datetime import datetime
+from typing import Optional
+
+from metrics import instrument_engine
+from tracing import instrument_engine_tracing
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./pantry_manager.db")
+# Migrate an out-of-date database at startup; turn off when deploys run
+# `python database.py migrate` once instead of every worker racing to do it
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "true").lower() == "true"
+# Bump whenever migrate() learns a new step
+SCHEMA_VERSION = 3
 
 engine = create_async_engine(
     DATABASE_URL,
     echo=False,
     future=True
 )
+instrument_engine(engine.sync_engine)
+instrument_engine_tracing(engine.sync_engine)
 
 async_session_maker = async_sessionmaker(
     engine,
@@ -46,6 +60,40 @@ class PantryItem(Base):
     upc = Column(String(50), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Pantry collection revision of the transaction that last wrote the row;
+    # the delta sync cursor
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Serves GET /api/pantry/changes: a range scan over one user's recent writes
+    __table_args__ = (
+        Index("ix_pantry_items_user_id_revision", "user_id", "revision"),
+    )
+
+class PantryItemDeletion(Base):
+    """Tombstone written by delete_pantry_item for delta sync clients"""
+    __tablename__ = "pantry_item_deletions"
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    item_id = Column(Integer, nullable=False)
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
+
+    __table_args__ = (
+        Index("ix_pantry_item_deletions_user_id_revision", "user_id", "revision"),
+        # Serves tombstone pruning
+        Index("ix_pantry_item_deletions_user_id_deleted_at", "user_id", "deleted_at"),
+    )
+
+class CollectionRevision(Base):
+    """Per-user revision counter for a collection, bumped on every write"""
+    __tablename__ = "collection_revisions"
+
+    user_id = Column(Integer, primary_key=True)
+    collection = Column(String(50), primary_key=True)  # "pantry" or "meal_plans"
+    revision = Column(Integer, nullable=False, default=0)
+    # Tombstones up to this revision have been pruned; older sync cursors need a full resync
+    pruned_revision = Column(Integer, nullable=False, default=0, server_default="0")
 
 class GlobalKnowledgeItem(Base):
     __tablename__ = "global_knowledge_items"
@@ -67,14 +115,204 @@ class MealPlan(Base):
     user_id = Column(Integer, nullable=False, index=True)
     name = Column(String(200), nullable=False)
     description = Column(Text, nullable=True)
-    meals = Column(JSON, nullable=False)  # Array of meal objects with dates
+    # Legacy JSON blob of meals; emptied by migrate_meal_plan_blobs once the
+    # meals have been copied into meal_plan_meals / meal_plan_ingredients
+    legacy_meals = Column("meals", JSON, nullable=True, default=list)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
-async def init_db():
+    # Not loaded unless a query asks for it (selectinload), so listing plans
+    # never pulls recipe text by accident
+    meals = relationship(
+        "MealPlanMeal",
+        order_by="MealPlanMeal.position",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise"
+    )
+
+class MealPlanMeal(Base):
+    __tablename__ = "meal_plan_meals"
+
+    id = Column(Integer, primary_key=True, index=True)
+    meal_plan_id = Column(Integer, ForeignKey("meal_plans.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False, default=0)
+    date = Column(String(50), nullable=False)
+    meal_type = Column(String(50), nullable=False)
+    name = Column(String(200), nullable=False)
+    description = Column(Text, nullable=True)
+    directions = Column(JSON, nullable=False, default=list)
+    prep_time = Column(String(50), nullable=True)
+    cook_time = Column(String(50), nullable=True)
+    servings = Column(Integer, nullable=True)
+    calories = Column(Float, nullable=True)
+
+    ingredients = relationship(
+        "MealPlanIngredient",
+        order_by="MealPlanIngredient.position",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise"
+    )
+
+class MealPlanIngredient(Base):
+    __tablename__ = "meal_plan_ingredients"
+
+    id = Column(Integer, primary_key=True, index=True)
+    meal_id = Column(Integer, ForeignKey("meal_plan_meals.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False, default=0)
+    item_name = Column(String(200), nullable=False, index=True)
+    quantity = Column(String(50), nullable=True)
+    unit = Column(String(50), nullable=True)
+
+class ChatThread(Base):
+    __tablename__ = "chat_threads"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    # Rolling summary of every message up to and including summarized_through
+    summary = Column(Text, nullable=True)
+    summarized_through = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ChatMessage(Base):
+    __tablename__ = "chat_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    thread_id = Column(Integer, ForeignKey("chat_threads.id", ondelete="CASCADE"), nullable=False)
+    role = Column(String(20), nullable=False)  # "user" or "assistant"
+    content = Column(Text, nullable=False)
+    tokens = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    # Serves the newest-first window read for each prompt
+    __table_args__ = (
+        Index("ix_chat_messages_thread_id_id", "thread_id", "id"),
+    )
+
+class SchemaVersion(Base):
+    """Single row recording the schema version `migrate()` last brought the database to"""
+    __tablename__ = "schema_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False)
+    migrated_at = Column(DateTime, default=datetime.utcnow)
+
+async def migrate_meal_plan_blobs(conn):
+    """Copy meals out of legacy MealPlan.meals JSON blobs into the meal tables"""
+    result = await conn.execute(
+        select(MealPlan.id, MealPlan.legacy_meals)
+        .where(MealPlan.legacy_meals.is_not(None))
+    )
+    migrated = 0
+    for plan_id, blob in result.all():
+        if not blob:
+            continue
+        for position, meal in enumerate(blob):
+            meal_result = await conn.execute(
+                insert(MealPlanMeal).values(
+                    meal_plan_id=plan_id,
+                    position=position,
+                    date=meal.get("date") or "",
+                    meal_type=meal.get("meal_type") or "",
+                    name=meal.get("name") or "",
+                    description=meal.get("description"),
+                    directions=meal.get("directions") or [],
+                    prep_time=meal.get("prep_time"),
+                    cook_time=meal.get("cook_time"),
+                    servings=meal.get("servings"),
+                    calories=meal.get("calories")
+                )
+            )
+            meal_id = meal_result.inserted_primary_key[0]
+            ingredients = [
+                {
+                    "meal_id": meal_id,
+                    "position": index,
+                    "item_name": ingredient.get("item_name") or "",
+                    "quantity": ingredient.get("quantity"),
+                    "unit": ingredient.get("unit")
+                }
+                for index, ingredient in enumerate(meal.get("ingredients") or [])
+            ]
+            if ingredients:
+                await conn.execute(insert(MealPlanIngredient), ingredients)
+        await conn.execute(
+            update(MealPlan)
+            .where(MealPlan.id == plan_id)
+            .values(legacy_meals=[], updated_at=MealPlan.updated_at)
+        )
+        migrated += 1
+    return migrated
+
+def add_missing_columns(sync_conn):
+    """ALTER TABLE ADD COLUMN for model columns an existing table lacks (needs a server_default)"""
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(dialect=sync_conn.dialect)
+            ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"
+            if column.server_default is not None:
+                ddl += f" DEFAULT {column.server_default.arg}"
+                if not column.nullable:
+                    ddl += " NOT NULL"
+            sync_conn.exec_driver_sql(ddl)
+
+async def get_schema_version(conn) -> Optional[int]:
+    """Version recorded by the last migrate(), or None for a database it never ran on"""
+    has_table = await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table(SchemaVersion.__tablename__))
+    if not has_table:
+        return None
+    result = await conn.execute(select(SchemaVersion.version).where(SchemaVersion.id == 1))
+    return result.scalar_one_or_none()
+
+async def migrate():
+    """Create tables and indexes and run data migrations, then record SCHEMA_VERSION"""
+    from search_service import ensure_search_index
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        # create_all skips new columns and indexes on tables that already exist
+        await conn.run_sync(add_missing_columns)
+        for table in (PantryItem.__table__, PantryItemDeletion.__table__):
+            for index in table.indexes:
+                await conn.run_sync(index.create, checkfirst=True)
+        await migrate_meal_plan_blobs(conn)
+        await ensure_search_index(conn)
+        await conn.execute(delete(SchemaVersion))
+        await conn.execute(insert(SchemaVersion).values(id=1, version=SCHEMA_VERSION, migrated_at=datetime.utcnow()))
+
+async def init_db():
+    """Startup check: one small query when the schema is current.
+
+    An out-of-date database is migrated here when AUTO_MIGRATE is on;
+    otherwise startup fails until `python database.py migrate` has run.
+    """
+    async with engine.connect() as conn:
+        version = await get_schema_version(conn)
+    if version is not None and version >= SCHEMA_VERSION:
+        return
+    if not AUTO_MIGRATE:
+        raise RuntimeError(
+            f"Database schema is at version {version}, expected {SCHEMA_VERSION}; "
+            "run `python database.py migrate`"
+        )
+    await migrate()
 
 async def get_db():
     async with async_session_maker() as session:
         yield session
+
+if __name__ == "__main__":
+    import asyncio
+    import sys
+
+    if sys.argv[1:] != ["migrate"]:
+        sys.exit("usage: python database.py migrate")
+    asyncio.run(migrate())
+    print(f"Database at schema version {SCHEMA_VERSION}")
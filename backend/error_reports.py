@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from metrics import FRONTEND_ERRORS
+
+logger = logging.getLogger("frontend_errors")
+
+# Configuration
+ERROR_REPORT_WINDOW_S = float(os.getenv("ERROR_REPORT_WINDOW_S", "60"))
+ERROR_REPORT_USER_LIMIT = int(os.getenv("ERROR_REPORT_USER_LIMIT", "50"))         # reports per user per window
+ERROR_REPORT_MAX_FINGERPRINTS = int(os.getenv("ERROR_REPORT_MAX_FINGERPRINTS", "1000"))
+
+STACK_MAX_CHARS = 4000
+DATA_MAX_CHARS = 2000
+
+def fingerprint(message: str, component: Optional[str], url: Optional[str]) -> str:
+    """Stable id for an error; query strings and fragments are ignored"""
+    path = ""
+    if url:
+        parts = urlsplit(url)
+        path = parts.netloc + parts.path
+    key = "\x1f".join((message, component or "", path))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+class _Aggregate:
+    __slots__ = ("message", "component", "url", "count", "users", "first_seen", "last_seen")
+
+    def __init__(self, message: str, component: Optional[str], url: Optional[str], now: float):
+        self.message = message
+        self.component = component
+        self.url = url
+        self.count = 0
+        self.users = set()
+        self.first_seen = now
+        self.last_seen = now
+
+class ErrorReportAggregator:
+    """Deduplicate, rate limit and count frontend error reports per time window.
+
+    The first report of a fingerprint in a window is logged in full; repeats
+    only bump its count. When the window closes, fingerprints seen more than
+    once are logged as a single summary record each. `start()` closes windows
+    on a timer so the last burst before traffic stops is still summarized;
+    `stop()` flushes the open window at shutdown.
+    """
+
+    def __init__(
+        self,
+        window_s: float = ERROR_REPORT_WINDOW_S,
+        user_limit: int = ERROR_REPORT_USER_LIMIT,
+        max_fingerprints: int = ERROR_REPORT_MAX_FINGERPRINTS
+    ):
+        self.window_s = window_s
+        self.user_limit = user_limit
+        self.max_fingerprints = max_fingerprints
+        self._window_start = time.monotonic()
+        self._aggregates: Dict[str, _Aggregate] = {}
+        self._user_counts: Dict[str, int] = {}
+        self._flusher: Optional[asyncio.Task] = None
+
+    def _roll_window(self, now: float):
+        if now - self._window_start >= self.window_s:
+            self.flush(now)
+
+    def flush(self, now: Optional[float] = None):
+        """Log the open window's summaries and start a new window"""
+        for fp, aggregate in self._aggregates.items():
+            if aggregate.count > 1:
+                logger.warning(
+                    "Frontend error repeated %d times in %.0fs: %s",
+                    aggregate.count, self.window_s, aggregate.message,
+                    extra={
+                        "event": "frontend_error_summary",
+                        "fingerprint": fp,
+                        "component": aggregate.component,
+                        "url": aggregate.url,
+                        "count": aggregate.count,
+                        "users": len(aggregate.users),
+                    }
+                )
+        self._aggregates.clear()
+        self._user_counts.clear()
+        self._window_start = time.monotonic() if now is None else now
+
+    async def _flush_on_timer(self):
+        while True:
+            await asyncio.sleep(max(self._window_start + self.window_s - time.monotonic(), 0) + 0.05)
+            self._roll_window(time.monotonic())
+
+    def start(self):
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_on_timer())
+
+    async def stop(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        self.flush()
+
+    def ingest(self, username: str, reports: List, client: Optional[str] = None) -> Tuple[int, int, int]:
+        """Record FrontendErrorLog reports; returns (accepted, aggregated, dropped)"""
+        now = time.monotonic()
+        self._roll_window(now)
+        accepted = aggregated = dropped = 0
+
+        for report in reports:
+            used = self._user_counts.get(username, 0)
+            if used >= self.user_limit:
+                dropped += 1
+                continue
+            self._user_counts[username] = used + 1
+
+            fp = fingerprint(report.error_message, report.component, report.url)
+            aggregate = self._aggregates.get(fp)
+            if aggregate is None:
+                if len(self._aggregates) >= self.max_fingerprints:
+                    dropped += 1
+                    continue
+                aggregate = self._aggregates[fp] = _Aggregate(
+                    report.error_message, report.component, report.url, now
+                )
+                accepted += 1
+                self._log_first(fp, username, client, report)
+            else:
+                aggregated += 1
+            aggregate.count += report.count
+            aggregate.users.add(username)
+            aggregate.last_seen = now
+
+        if accepted:
+            FRONTEND_ERRORS.inc("accepted", amount=accepted)
+        if aggregated:
+            FRONTEND_ERRORS.inc("aggregated", amount=aggregated)
+        if dropped:
+            FRONTEND_ERRORS.inc("dropped", amount=dropped)
+        return accepted, aggregated, dropped
+
+    def _log_first(self, fp: str, username: str, client: Optional[str], report):
+        # One structured record per new fingerprint; stack and extra data are
+        # bounded so a noisy client can't flood the log pipeline
+        logger.error(
+            "Frontend error in %s: %s", report.component or "N/A", report.error_message,
+            extra={
+                "event": "frontend_error",
+                "fingerprint": fp,
+                "username": username,
+                "client": client,
+                "component": report.component,
+                "url": report.url,
+                "user_agent": report.user_agent,
+                "client_timestamp": report.timestamp,
+                "error_stack": (report.error_stack or "")[:STACK_MAX_CHARS] or None,
+                "additional_data": str(report.additional_data)[:DATA_MAX_CHARS] if report.additional_data else None,
+            }
+        )
+
+error_reports = ErrorReportAggregator()
@@ -0,0 +1,228 @@
+"""Bundled seed dataset of common foods, consulted before the database and the LLM.
+
+The source is data/food_knowledge.csv, versioned by its "# version:" line.
+`python food_knowledge.py build` compiles it into a small read-only SQLite
+file that the server opens immutable and memory-mapped, so a lookup is an
+index probe on pages the OS already has cached. `python food_knowledge.py
+import` merges the dataset into global_knowledge_items.
+"""
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent / "data"
+
+# Configuration
+# Compiled dataset; an empty value disables the seed lookup
+FOOD_KNOWLEDGE_PATH = os.getenv("FOOD_KNOWLEDGE_PATH", str(DATA_DIR / "food_knowledge.db"))
+FOOD_KNOWLEDGE_SOURCE = DATA_DIR / "food_knowledge.csv"
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL) WITHOUT ROWID;
+CREATE TABLE foods (
+    id INTEGER PRIMARY KEY,
+    item_name TEXT NOT NULL,
+    typical_days_before_expiry INTEGER,
+    perishable INTEGER NOT NULL,
+    type TEXT,
+    typical_units TEXT,
+    calories_per_unit REAL
+);
+CREATE TABLE names (key TEXT PRIMARY KEY, food_id INTEGER NOT NULL) WITHOUT ROWID;
+"""
+
+def name_key(name: str) -> str:
+    """Lookup key: lowercased with whitespace folded"""
+    return " ".join(name.lower().split())
+
+def _candidate_keys(name: str, fuzzy: bool = False) -> Iterator[str]:
+    # The name, then without a plural "s". Fuzzy adds its trailing words:
+    # "Organic Baby Spinach" -> "baby spinach", "spinach". That also maps
+    # "Coconut Water" to water, so only use it when nothing better is known
+    words = name_key(name).split()
+    for start in range(len(words) if fuzzy else 1):
+        key = " ".join(words[start:])
+        yield key
+        if key.endswith("s") and len(key) > 3:
+            yield key[:-1]
+
+class FoodKnowledge:
+    """One seed entry, with the same attributes as GlobalKnowledgeItem"""
+
+    __slots__ = (
+        "item_name", "typical_days_before_expiry", "perishable",
+        "type", "typical_units", "calories_per_unit"
+    )
+
+    def __init__(self, item_name, typical_days_before_expiry, perishable, type, typical_units, calories_per_unit):
+        self.item_name = item_name
+        self.typical_days_before_expiry = typical_days_before_expiry
+        self.perishable = bool(perishable)
+        self.type = type
+        self.typical_units = typical_units
+        self.calories_per_unit = calories_per_unit
+
+class FoodKnowledgeDataset:
+    """Read-only view of a compiled dataset file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        # immutable=1: no locking or change detection, the file never changes under us
+        self._conn = sqlite3.connect(
+            f"{Path(path).resolve().as_uri()}?mode=ro&immutable=1",
+            uri=True,
+            check_same_thread=False
+        )
+        self._conn.execute(f"PRAGMA mmap_size={max(os.path.getsize(path), 1 << 20)}")
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        self.version = meta.get("version", "")
+        self.size = int(meta.get("foods", "0"))
+
+    def lookup(self, name: str, fuzzy: bool = False) -> Optional[FoodKnowledge]:
+        """Find the entry for a name or alias; `fuzzy` also tries its trailing words"""
+        for key in _candidate_keys(name, fuzzy):
+            row = self._conn.execute(
+                "SELECT f.item_name, f.typical_days_before_expiry, f.perishable, "
+                "f.type, f.typical_units, f.calories_per_unit "
+                "FROM names n JOIN foods f ON f.id = n.food_id WHERE n.key = ?",
+                (key,)
+            ).fetchone()
+            if row is not None:
+                return FoodKnowledge(*row)
+        return None
+
+    def lookup_many(self, names: Iterable[str], fuzzy: bool = False) -> Dict[str, FoodKnowledge]:
+        found = {}
+        for name in names:
+            entry = self.lookup(name, fuzzy)
+            if entry is not None:
+                found[name] = entry
+        return found
+
+    def entries(self) -> List[FoodKnowledge]:
+        rows = self._conn.execute(
+            "SELECT item_name, typical_days_before_expiry, perishable, "
+            "type, typical_units, calories_per_unit FROM foods ORDER BY id"
+        )
+        return [FoodKnowledge(*row) for row in rows]
+
+    def close(self):
+        self._conn.close()
+
+_dataset: Optional[FoodKnowledgeDataset] = None
+_opened = False
+
+def get_food_knowledge() -> Optional[FoodKnowledgeDataset]:
+    """Return the process-wide dataset, opening it on first use; None when unavailable"""
+    global _dataset, _opened
+    if not _opened:
+        _opened = True
+        if FOOD_KNOWLEDGE_PATH:
+            try:
+                _dataset = FoodKnowledgeDataset(FOOD_KNOWLEDGE_PATH)
+            except Exception as e:
+                logger.warning("Food knowledge dataset unavailable (%s): %s", FOOD_KNOWLEDGE_PATH, e)
+    return _dataset
+
+def lookup_food_knowledge(name: str, fuzzy: bool = False) -> Optional[FoodKnowledge]:
+    """Seed entry for a name. Callers try an exact lookup before the database
+    and a fuzzy one only after a database miss"""
+    dataset = get_food_knowledge()
+    return dataset.lookup(name, fuzzy) if dataset is not None else None
+
+def lookup_food_knowledge_many(names: Iterable[str], fuzzy: bool = False) -> Dict[str, FoodKnowledge]:
+    dataset = get_food_knowledge()
+    return dataset.lookup_many(names, fuzzy) if dataset is not None else {}
+
+def _read_source(source: Path):
+    with open(source, newline="") as handle:
+        version = handle.readline().partition("# version:")[2].strip()
+        if not version:
+            raise ValueError(f"{source} must start with a '# version: N' line")
+        return version, list(csv.DictReader(handle))
+
+def _optional(value: str, cast):
+    return cast(value) if value.strip() else None
+
+def build(source: Path = FOOD_KNOWLEDGE_SOURCE, target: str = FOOD_KNOWLEDGE_PATH) -> int:
+    """Compile the CSV source into the dataset file; returns the number of foods"""
+    version, rows = _read_source(source)
+    scratch = f"{target}.tmp"
+    if os.path.exists(scratch):
+        os.remove(scratch)
+    conn = sqlite3.connect(scratch)
+    try:
+        conn.executescript(SCHEMA)
+        keys: Dict[str, str] = {}
+        for food_id, row in enumerate(rows, start=1):
+            item_name = row["name"].strip().title()
+            conn.execute(
+                "INSERT INTO foods VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    food_id,
+                    item_name,
+                    _optional(row["days_before_expiry"], int),
+                    row["perishable"].strip().lower() == "true",
+                    row["type"].strip() or None,
+                    row["typical_units"].strip() or None,
+                    _optional(row["calories_per_unit"], float),
+                )
+            )
+            for alias in [row["name"], *row["aliases"].split("|")]:
+                key = name_key(alias)
+                if not key:
+                    continue
+                if key in keys and keys[key] != item_name:
+                    raise ValueError(f"'{key}' names both {keys[key]} and {item_name}")
+                keys[key] = item_name
+                conn.execute("INSERT OR IGNORE INTO names VALUES (?, ?)", (key, food_id))
+        conn.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [("version", version), ("foods", str(len(rows))), ("names", str(len(keys)))]
+        )
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(scratch, target)
+    return len(rows)
+
+async def import_dataset(path: str = FOOD_KNOWLEDGE_PATH) -> int:
+    """Insert every seed entry missing from global_knowledge_items; returns rows added"""
+    from crud import import_global_knowledge
+    from database import async_session_maker, migrate
+
+    dataset = FoodKnowledgeDataset(path)
+    try:
+        await migrate()
+        async with async_session_maker() as db:
+            return await import_global_knowledge(db, dataset.entries())
+    finally:
+        dataset.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the bundled food knowledge dataset")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_command = commands.add_parser("build", help="compile the CSV source into the dataset file")
+    build_command.add_argument("--source", default=str(FOOD_KNOWLEDGE_SOURCE))
+    build_command.add_argument("--output", default=FOOD_KNOWLEDGE_PATH)
+    import_command = commands.add_parser("import", help="merge the dataset into global_knowledge_items")
+    import_command.add_argument("--dataset", default=FOOD_KNOWLEDGE_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build(Path(args.source), args.output)
+        print(f"Wrote {count} foods to {args.output}")
+    else:
+        added = asyncio.run(import_dataset(args.dataset))
+        print(f"Added {added} foods to global_knowledge_items")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+from metrics import LOG_RECORDS_DROPPED
+from tracing import current_trace_id, export_logger, TRACE_EXPORT_PATH
+
+# Configuration
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")            # "json" or "text"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+def _parse_mapping(value: str) -> Dict[str, float]:
+    """Parse "logger=value,other.logger=value" into a dict"""
+    mapping = {}
+    for part in value.split(","):
+        name, _, number = part.partition("=")
+        if name.strip() and number.strip():
+            mapping[name.strip()] = float(number)
+    return mapping
+
+# Fraction of DEBUG/INFO records kept per logger, e.g. "uvicorn.access=0.1"
+LOG_SAMPLING = _parse_mapping(os.getenv("LOG_SAMPLING", ""))
+# Max records per second per logger (any level), e.g. "main=200"
+LOG_RATE_LIMITS = _parse_mapping(os.getenv("LOG_RATE_LIMITS", ""))
+
+# Attributes every LogRecord has; anything else came in through extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "trace_id"}
+
+def _lookup(mapping: Dict[str, float], logger_name: str) -> Optional[float]:
+    """Find the setting for a logger or its nearest configured ancestor"""
+    name = logger_name
+    while name:
+        if name in mapping:
+            return mapping[name]
+        name = name.rpartition(".")[0]
+    return mapping.get("root")
+
+class SamplingRateLimitFilter(logging.Filter):
+    """Drop sampled-out DEBUG/INFO records and records over a logger's rate limit"""
+
+    def __init__(self, sampling: Dict[str, float], rate_limits: Dict[str, float]):
+        super().__init__()
+        self.sampling = sampling
+        self.rate_limits = rate_limits
+        self._sample_counters: Dict[str, float] = {}
+        self._buckets: Dict[str, list] = {}  # logger -> [tokens, last refill]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        name = record.name
+        if self.sampling and record.levelno < logging.WARNING:
+            rate = _lookup(self.sampling, name)
+            if rate is not None and rate < 1:
+                # Deterministic 1-in-N sampling: keep a record whenever the
+                # accumulated fraction crosses a whole number
+                before = self._sample_counters.get(name, 0.0)
+                after = before + rate
+                self._sample_counters[name] = after
+                if int(after) == int(before):
+                    LOG_RECORDS_DROPPED.inc("sampled")
+                    return False
+
+        if self.rate_limits:
+            limit = _lookup(self.rate_limits, name)
+            if limit is not None:
+                now = time.monotonic()
+                bucket = self._buckets.get(name)
+                if bucket is None:
+                    bucket = self._buckets[name] = [limit, now]
+                bucket[0] = min(limit, bucket[0] + (now - bucket[1]) * limit)
+                bucket[1] = now
+                if bucket[0] < 1:
+                    LOG_RECORDS_DROPPED.inc("rate_limited")
+                    return False
+                bucket[0] -= 1
+        return True
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hand records to the writer thread without formatting or blocking.
+
+    Unlike QueueHandler.prepare, the message is not formatted here; the
+    writer thread does it. Only the trace id and exception text, which
+    are not safe to defer, are captured eagerly. When the queue is full
+    the record is dropped and counted.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.trace_id = current_trace_id()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc("queue_full")
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line; extra={...} fields are included as keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            payload["trace_id"] = trace_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                payload[key] = value
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+class TraceExportFormatter(logging.Formatter):
+    """The exported trace as one JSON line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record.trace, default=str)
+
+_listener: Optional[QueueListener] = None
+
+def configure_logging() -> QueueListener:
+    """Route all logging through a bounded queue drained by one writer thread"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JSONFormatter() if LOG_FORMAT == "json" else TextFormatter())
+    stream_handler.addFilter(lambda record: record.name != export_logger.name)
+    handlers = [stream_handler]
+    if TRACE_EXPORT_PATH:
+        # Traces share the queue and writer thread but go only to their own file
+        export_handler = logging.FileHandler(TRACE_EXPORT_PATH)
+        export_handler.setFormatter(TraceExportFormatter())
+        export_handler.addFilter(lambda record: record.name == export_logger.name)
+        handlers.append(export_handler)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingRateLimitFilter(LOG_SAMPLING, LOG_RATE_LIMITS))
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
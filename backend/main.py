@@ -1,70 +1,105 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Request
+# First, so the startup report times every import after it
+from startup_report import startup_report
+startup_report.track_imports()
+
+from fastapi import FastAPI, HTTPException, Depends, status, Request, Response, Query, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from datetime import timedelta
+from typing import List, Optional, Tuple, Union
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-import uvicorn
 from dotenv import load_dotenv
+import hashlib
 import logging
-import sys
 import os
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-logger = logging.getLogger(__name__)
-
 # Load environment variables from .env file
 # Try loading from parent directory first, then from backend directory
 # Try to load from project root
 root_env = Path(__file__).parent.parent / '.env'
 backend_env = Path(__file__).parent / '.env'
 
+loaded_env = None
 if root_env.exists():
     load_dotenv(root_env)
-    logger.info(f"Loaded environment variables from {root_env}")
+    loaded_env = root_env
 elif backend_env.exists():
     load_dotenv(backend_env)
-    logger.info(f"Loaded environment variables from {backend_env}")
+    loaded_env = backend_env
+
+# Configure logging (after .env so LOG_* settings apply). Records go through
+# a bounded queue to a background writer thread, so logging never blocks
+# the event loop on stdout.
+from logging_config import configure_logging
+configure_logging()
+logger = logging.getLogger(__name__)
+
+if loaded_env:
+    logger.info("Loaded environment variables from %s", loaded_env)
 else:
     logger.warning("No .env file found in project root or backend directory")
 
 from database import init_db, get_db, User
 from models import (
     UserCreate, UserLogin, UserResponse, Token,
-    PantryItemCreate, PantryItemUpdate, PantryItemResponse,
-    ReceiptScanRequest, ReceiptScanResponse,
-    MealPlanCreate, MealPlanResponse,
-    ChatRequest, ChatResponse, FrontendErrorLog
+    PantryItemCreate, PantryItemUpdate, PantryItemResponse, PantryChangesResponse,
+    ReceiptScanRequest, ReceiptScanResponse, ReceiptBatchScanRequest, ReceiptBatchScanResponse,
+    MealPlanCreate, MealPlanResponse, MealPlanSummary, SearchResponse,
+    ChatRequest, ChatResponse, ChatThreadSummary, ChatThreadResponse,
+    FrontendErrorLog, FrontendErrorBatch, FrontendErrorBatchResponse,
+    ProfilerArmRequest
 )
 from auth import (
-    authenticate_user, create_access_token, get_current_user,
+    authenticate_user, create_access_token, get_current_user, get_current_admin, get_token_username,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 from crud import (
-    create_user, create_pantry_item, get_pantry_items, get_pantry_item,
+    create_user, create_pantry_item, get_pantry_item_rows,
+    get_pantry_context_rows, count_pantry_items,
+    get_pantry_changes, get_pantry_item,
     update_pantry_item, delete_pantry_item, get_global_knowledge_item,
-    create_meal_plan, get_meal_plans, get_meal_plan, delete_meal_plan
+    create_meal_plan, get_meal_plans, get_meal_plan_summaries, get_meal_plan,
+    delete_meal_plan, get_collection_revision,
+    create_chat_thread, get_chat_thread, get_chat_threads, get_recent_chat_messages,
+    add_chat_messages, delete_chat_thread,
+    PANTRY_ITEM_FIELDS, MEAL_PLAN_SUMMARY_FIELDS, PANTRY_COLLECTION, MEAL_PLANS_COLLECTION
 )
-from ocr_service import extract_text_from_image, parse_receipt_items
+from serializers import meal_plan_to_dict
+from admission import AdmissionMiddleware
+from compression import CompressionMiddleware
+from metrics import MetricsMiddleware, render_metrics, record_cache
+from tracing import TracingMiddleware, slow_traces, span
+from profiler import ProfilerMiddleware, profiler_state, profiles
+from error_reports import error_reports
+from scan_pipeline import ReceiptScan, scan_receipts
+from scan_cache import (
+    content_hash, scan_idempotency,
+    IDEMPOTENCY_TTL_S, SCAN_DEDUP_WINDOW_S
+)
+from search_service import search_pantry_items, search_meal_plans
+from ocr_service import decode_image_base64, shutdown_ocr_engine
+from food_knowledge import lookup_food_knowledge
+from prompt_context import clamp_context, estimate_tokens, PANTRY_CONTEXT_MAX_ITEMS
+from chat_history import load_history, needs_summary, schedule_summary, CHAT_HISTORY_MAX_MESSAGES
+from recipe_index import describe_suggestions, suggest_recipes
 from chatgpt_service import (
     normalize_item_name, get_item_details, generate_meal_plan,
     chat_with_assistant
 )
+startup_report.imports_finished()
 
 app = FastAPI(
     title="Pantry & Meal Planning Manager API",
     description="Manage your pantry and create meal plans with AI assistance",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Innermost, just before routing: queue or reject expensive routes. Inside
+# CORS, so 429/503 responses stay readable by the browser
+app.add_middleware(AdmissionMiddleware)
+
 # Configure CORS
 import os
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:5173").split(",")
@@ -74,16 +109,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing", "X-Trace-Id", "Idempotent-Replayed", "Retry-After"],
 )
 
+# Compress large responses (meal plans are long, repetitive text)
+app.add_middleware(CompressionMiddleware)
+
+# On-demand sampling profiler, armed from /api/admin/profiler
+app.add_middleware(ProfilerMiddleware)
+
+# Per-request span tracing, summarized in the Server-Timing header
+app.add_middleware(TracingMiddleware)
+
+# Outermost, so timings include compression and every other middleware
+app.add_middleware(MetricsMiddleware)
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Catch and log all unhandled exceptions"""
     logger.error(
-        f"Unhandled exception: {type(exc).__name__}: {str(exc)} | "
-        f"Path: {request.url.path} | "
-        f"Method: {request.method}",
+        "Unhandled exception: %s: %s | Path: %s | Method: %s",
+        type(exc).__name__, exc, request.url.path, request.method,
         exc_info=True
     )
     return JSONResponse(
@@ -96,13 +143,66 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 @app.on_event("startup")
 async def startup_event():
+    # Cheap schema version check; migrates only when the schema is behind
     await init_db()
-    logger.info("Database initialized successfully")
+    logger.info("Database schema is current")
     # Validate OpenAI API key is set
     api_key = os.getenv("OPENAI_API_KEY", "")
     if not api_key:
         logger.warning("OPENAI_API_KEY not set. ChatGPT features will not work.")
-        print("WARNING: OPENAI_API_KEY not set. ChatGPT features will not work.")
+    error_reports.start()
+    startup_report.mark_ready()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_ocr_engine()
+    await error_reports.stop()
+
+def parse_fields(fields: Optional[str], allowed) -> Optional[List[str]]:
+    """Parse a comma-separated ?fields= value; the id column is always included"""
+    if fields is None:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}"
+        )
+    if "id" not in requested:
+        requested.insert(0, "id")
+    return list(dict.fromkeys(requested))
+
+def etag_headers(etag: str) -> dict:
+    """Validator headers: browsers keep the body but revalidate on every use"""
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+async def check_collection_etag(
+    request: Request,
+    db: AsyncSession,
+    user_id: int,
+    collection: str
+) -> Tuple[str, Optional[Response]]:
+    """Compute the ETag for this request from the collection revision.
+
+    Returns the ETag and, when it matches If-None-Match, a ready 304 response
+    so the handler can return before running its query. The tag is weak:
+    CompressionMiddleware sends the same representation as identity, gzip or
+    brotli bytes under it, and If-None-Match uses weak comparison anyway.
+    """
+    revision = await get_collection_revision(db, user_id, collection)
+    key = f"{user_id}:{collection}:{revision}:{request.url.path}?{request.url.query}"
+    opaque = '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+    etag = "W/" + opaque
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        matched = "*" in candidates or opaque in candidates
+        record_cache("etag", matched)
+        if matched:
+            return etag, Response(status_code=304, headers=etag_headers(etag))
+    return etag, None
 
 @app.get("/")
 async def root():
@@ -112,6 +212,11 @@ async def root():
         "docs": "/docs"
     }
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health_check(db: AsyncSession = Depends(get_db)):
     """Health check endpoint for monitoring"""
@@ -134,7 +239,7 @@ async def health_check(db: AsyncSession = Depends(get_db)):
 @app.post("/api/auth/register", response_model=UserResponse, status_code=201)
 async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Register a new user"""
-    logger.info(f"Registration attempt for username: {user.username}")
+    logger.info("Registration attempt for username: %s", user.username)
     
     # Check if username already exists
     from sqlalchemy import select
@@ -142,7 +247,7 @@ async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
         select(User).where(User.username == user.username)
     )
     if result.scalar_one_or_none():
-        logger.warning(f"Registration failed - username already exists: {user.username}")
+        logger.warning("Registration failed - username already exists: %s", user.username)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
@@ -150,10 +255,10 @@ async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     
     try:
         db_user = await create_user(db, user.username, user.password)
-        logger.info(f"User registered successfully: {db_user.username} (ID: {db_user.id})")
+        logger.info("User registered successfully: %s (ID: %s)", db_user.username, db_user.id)
         return db_user
     except Exception as e:
-        logger.error(f"Error during user registration for {user.username}: {str(e)}", exc_info=True)
+        logger.error("Error during user registration for %s: %s", user.username, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Registration failed"
@@ -162,11 +267,11 @@ async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
 @app.post("/api/auth/login", response_model=Token)
 async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
     """Login user and return access token"""
-    logger.info(f"Login attempt for username: {user.username}")
+    logger.info("Login attempt for username: %s", user.username)
     
     db_user = await authenticate_user(db, user.username, user.password)
     if not db_user:
-        logger.warning(f"Login failed for username: {user.username}")
+        logger.warning("Login failed for username: %s", user.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -177,7 +282,7 @@ async def login(user: UserLogin, db: AsyncSession = Depends(get_db)):
     access_token = create_access_token(
         data={"sub": db_user.username}, expires_delta=access_token_expires
     )
-    logger.info(f"Login successful for user: {db_user.username} (ID: {db_user.id})")
+    logger.info("Login successful for user: %s (ID: %s)", db_user.username, db_user.id)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.get("/api/auth/me", response_model=UserResponse)
@@ -193,8 +298,16 @@ async def add_pantry_item(
     db: AsyncSession = Depends(get_db)
 ):
     """Add a new item to pantry"""
-    # Check global knowledge base first
-    knowledge_item = await get_global_knowledge_item(db, item.item_name)
+    # Check the bundled seed dataset, then the global knowledge base, then
+    # the seed again by trailing words ("Organic Baby Spinach" -> spinach)
+    knowledge_item = lookup_food_knowledge(item.item_name)
+    record_cache("food_knowledge", knowledge_item is not None)
+    if knowledge_item is None:
+        knowledge_item = await get_global_knowledge_item(db, item.item_name)
+        record_cache("global_knowledge", knowledge_item is not None)
+    if knowledge_item is None:
+        knowledge_item = lookup_food_knowledge(item.item_name, fuzzy=True)
+        record_cache("food_knowledge_fuzzy", knowledge_item is not None)
     
     if knowledge_item and not item.days_before_expiry:
         # Use global knowledge to fill in missing data
@@ -208,24 +321,62 @@ async def add_pantry_item(
 
 @app.get("/api/pantry", response_model=List[PantryItemResponse])
 async def list_pantry_items(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    fields: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get all pantry items for current user
+
+    ``fields`` is a comma-separated list of columns to return (e.g.
+    ``fields=item_name,date_estimated_expiry``); only those columns are queried.
+    """
+    selected = parse_fields(fields, PANTRY_ITEM_FIELDS)
+    etag, not_modified = await check_collection_etag(request, db, current_user.id, PANTRY_COLLECTION)
+    if not_modified:
+        return not_modified
+    rows = await get_pantry_item_rows(db, current_user.id, selected, skip, limit)
+    return ORJSONResponse(rows, headers=etag_headers(etag))
+
+@app.get("/api/pantry/changes", response_model=PantryChangesResponse)
+async def list_pantry_changes(
+    since: Optional[int] = Query(None, ge=0),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all pantry items for current user"""
-    return await get_pantry_items(db, current_user.id, skip, limit)
+    """Get pantry items changed and ids deleted since a previous sync cursor
+
+    Omit ``since`` for a full snapshot, then send the returned ``cursor``
+    on the next call. A 410 means the cursor predates the tombstone
+    retention window; start over without ``since``.
+    """
+    changes = await get_pantry_changes(db, current_user.id, since)
+    if changes is None:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Sync cursor is too old; fetch a full snapshot without since"
+        )
+    items, deleted_ids, cursor = changes
+    return ORJSONResponse({"items": items, "deleted_ids": deleted_ids, "cursor": cursor})
 
 @app.get("/api/pantry/{item_id}", response_model=PantryItemResponse)
 async def get_pantry_item_by_id(
     item_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific pantry item"""
+    etag, not_modified = await check_collection_etag(request, db, current_user.id, PANTRY_COLLECTION)
+    if not_modified:
+        return not_modified
     item = await get_pantry_item(db, item_id, current_user.id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
+    response.headers.update(etag_headers(etag))
     return item
 
 @app.put("/api/pantry/{item_id}", response_model=PantryItemResponse)
@@ -256,74 +407,89 @@ async def delete_pantry_item_by_id(
 @app.post("/api/receipt/scan", response_model=ReceiptScanResponse)
 async def scan_receipt(
     request: ReceiptScanRequest,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, max_length=255)
 ):
     """Scan a receipt and add items to pantry"""
-    # Extract text from image
-    receipt_text = await extract_text_from_image(request.image_base64)
-    
-    if not receipt_text:
-        raise HTTPException(
-            status_code=400,
-            detail="Could not extract text from image"
-        )
-    
-    # Parse receipt items
-    extracted_items = parse_receipt_items(receipt_text)
-    
-    if not extracted_items:
-        raise HTTPException(
-            status_code=400,
-            detail="Could not find any items in the receipt"
-        )
-    
-    # Process each item
-    created_items = []
-    for extracted in extracted_items:
-        receipt_name = extracted["receipt_name"]
-        
-        # Normalize item name using ChatGPT
-        item_name = await normalize_item_name(receipt_name)
-        
-        # Check global knowledge base
-        knowledge_item = await get_global_knowledge_item(db, item_name)
-        
-        if knowledge_item:
-            # Use existing knowledge
-            item_data = PantryItemCreate(
-                item_name=item_name,
-                receipt_name=receipt_name,
-                days_before_expiry=knowledge_item.typical_days_before_expiry,
-                perishable=knowledge_item.perishable,
-                type=knowledge_item.type,
-                units=knowledge_item.typical_units,
-                volume=float(extracted.get("quantity", "1")),
-                calories=knowledge_item.calories_per_unit
-            )
-        else:
-            # Get details from ChatGPT
-            details = await get_item_details(item_name)
-            item_data = PantryItemCreate(
-                item_name=item_name,
-                receipt_name=receipt_name,
-                days_before_expiry=details.get("days_before_expiry"),
-                perishable=details.get("perishable", True),
-                type=details.get("type"),
-                units=details.get("typical_units"),
-                volume=float(extracted.get("quantity", "1")),
-                calories=details.get("calories_per_unit")
-            )
-        
-        # Create pantry item
-        db_item = await create_pantry_item(db, current_user.id, item_data)
-        created_items.append(db_item)
-    
+    try:
+        image_data = decode_image_base64(request.image_base64)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Could not decode image")
+    image_hash = content_hash(image_data)
+
+    # A retried request (same Idempotency-Key), or the same image uploaded
+    # again shortly after, gets the original result instead of new rows
+    if idempotency_key:
+        key, ttl = (current_user.id, "key", idempotency_key), IDEMPOTENCY_TTL_S
+    else:
+        key, ttl = (current_user.id, "image", image_hash), SCAN_DEDUP_WINDOW_S
+    result, replayed = await scan_idempotency.run(
+        key, image_hash, ttl, lambda: process_receipt_scan(image_data, image_hash, current_user, db)
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
+async def process_receipt_scan(image_data: bytes, image_hash: str, current_user: User, db: AsyncSession) -> dict:
+    [scan] = await scan_receipts(db, current_user.id, [ReceiptScan(0, image_data, image_hash)])
+    if scan.status != "ok":
+        raise HTTPException(status_code=400, detail=scan.message)
     return {
-        "items": created_items,
-        "message": f"Successfully added {len(created_items)} items to your pantry"
+        "items": [PantryItemResponse.model_validate(item).model_dump() for item in scan.items],
+        "message": scan.message
     }
 
+@app.post("/api/receipt/scan-batch", response_model=ReceiptBatchScanResponse)
+async def scan_receipt_batch(
+    request: ReceiptBatchScanRequest,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, max_length=255)
+):
+    """Scan many receipts at once; each receipt reports its own result"""
+    scans = []
+    for index, image_base64 in enumerate(request.images_base64):
+        try:
+            image_data = decode_image_base64(image_base64)
+        except Exception:
+            image_data = b""
+        scan = ReceiptScan(index, image_data, content_hash(image_data))
+        if not image_data:
+            scan.fail("Could not decode image")
+        scans.append(scan)
+
+    async def process() -> dict:
+        await scan_receipts(db, current_user.id, scans)
+        receipts = [
+            {
+                "index": scan.index,
+                "status": scan.status,
+                "message": scan.message,
+                "items": [PantryItemResponse.model_validate(item).model_dump() for item in scan.items]
+            }
+            for scan in scans
+        ]
+        added = sum(len(receipt["items"]) for receipt in receipts)
+        scanned = sum(receipt["status"] == "ok" for receipt in receipts)
+        return {
+            "receipts": receipts,
+            "items_added": added,
+            "message": f"Added {added} items from {scanned} of {len(scans)} receipts"
+        }
+
+    if not idempotency_key:
+        return await process()
+    fingerprint = content_hash("".join(scan.image_hash for scan in scans).encode())
+    result, replayed = await scan_idempotency.run(
+        (current_user.id, "batch", idempotency_key), fingerprint, IDEMPOTENCY_TTL_S, process
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return result
+
 # Meal plan endpoints
 @app.post("/api/meal-plans", response_model=MealPlanResponse, status_code=201)
 async def create_new_meal_plan(
@@ -334,26 +500,60 @@ async def create_new_meal_plan(
     """Create a new meal plan"""
     return await create_meal_plan(db, current_user.id, meal_plan)
 
-@app.get("/api/meal-plans", response_model=List[MealPlanResponse])
+@app.get(
+    "/api/meal-plans",
+    response_model=Union[List[MealPlanSummary], List[MealPlanResponse]]
+)
 async def list_meal_plans(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    fields: Optional[str] = None,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all meal plans for current user"""
-    return await get_meal_plans(db, current_user.id, skip, limit)
+    """Get all meal plans for current user
+
+    With view=summary only plan-level fields and a meal count are returned;
+    fetch /api/meal-plans/{id} for the meals themselves. ``fields`` narrows
+    the summary columns further.
+    """
+    if view == "summary":
+        selected = parse_fields(fields, MEAL_PLAN_SUMMARY_FIELDS)
+    elif fields is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="fields is only supported with view=summary"
+        )
+    etag, not_modified = await check_collection_etag(request, db, current_user.id, MEAL_PLANS_COLLECTION)
+    if not_modified:
+        return not_modified
+    if view == "summary":
+        rows = await get_meal_plan_summaries(db, current_user.id, selected, skip, limit)
+        return ORJSONResponse(rows, headers=etag_headers(etag))
+    meal_plans = await get_meal_plans(db, current_user.id, skip, limit)
+    return ORJSONResponse(
+        [meal_plan_to_dict(plan) for plan in meal_plans],
+        headers=etag_headers(etag)
+    )
 
 @app.get("/api/meal-plans/{meal_plan_id}", response_model=MealPlanResponse)
 async def get_meal_plan_by_id(
     meal_plan_id: int,
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific meal plan"""
+    etag, not_modified = await check_collection_etag(request, db, current_user.id, MEAL_PLANS_COLLECTION)
+    if not_modified:
+        return not_modified
     meal_plan = await get_meal_plan(db, meal_plan_id, current_user.id)
     if not meal_plan:
         raise HTTPException(status_code=404, detail="Meal plan not found")
+    response.headers.update(etag_headers(etag))
     return meal_plan
 
 @app.delete("/api/meal-plans/{meal_plan_id}", status_code=204)
@@ -367,32 +567,62 @@ async def delete_meal_plan_by_id(
     if not success:
         raise HTTPException(status_code=404, detail="Meal plan not found")
 
-# Chat endpoint
+# Search endpoint
+@app.get("/api/search", response_model=SearchResponse)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Full-text search over the current user's pantry items and meal plans"""
+    pantry_items = await search_pantry_items(db, current_user.id, q, limit)
+    meal_plans = await search_meal_plans(db, current_user.id, q, limit)
+    return {"query": q, "pantry_items": pantry_items, "meal_plans": meal_plans}
+
+# Chat endpoints
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Chat with AI assistant for meal planning"""
-    # Get user's pantry items for context
-    pantry_items = await get_pantry_items(db, current_user.id, limit=100)
-    pantry_data = [
-        {
-            "item_name": item.item_name,
-            "type": item.type,
-            "volume": item.volume,
-            "units": item.units,
-            "calories": item.calories,
-            "days_before_expiry": item.days_before_expiry
-        }
-        for item in pantry_items
-    ]
-    
+    """Chat with AI assistant for meal planning.
+
+    Send only the new message; history is kept server-side per thread. Omit
+    thread_id to start a new thread and reuse the returned one afterwards.
+    """
+    if request.thread_id is not None:
+        thread = await get_chat_thread(db, request.thread_id, current_user.id)
+        if thread is None:
+            raise HTTPException(status_code=404, detail="Chat thread not found")
+    else:
+        thread = await create_chat_thread(db, current_user.id)
+
+    response = await _chat_reply(request, thread, current_user, db)
+    response.thread_id = thread.id
+    return response
+
+async def _chat_reply(request: ChatRequest, thread, current_user: User, db: AsyncSession) -> ChatResponse:
     # Check if user wants a meal plan
     message_lower = request.message.lower()
     if any(keyword in message_lower for keyword in ["meal plan", "recipe", "cook", "dinner", "lunch", "breakfast"]):
-        # Generate meal plan
+        # The most urgent pantry items, trimmed to the prompt's token budget
+        with span("load_pantry"):
+            pantry_data = await get_pantry_context_rows(db, current_user.id, limit=PANTRY_CONTEXT_MAX_ITEMS)
+
+        # Recipe questions are answered from stored meals when they fit the
+        # pantry well enough; only an explicit meal plan request always
+        # goes to the LLM
+        if "meal plan" not in message_lower:
+            with span("recipe_match"):
+                recipes = await suggest_recipes(db, current_user.id, pantry_data, request.message)
+            record_cache("recipe_index", bool(recipes))
+            if recipes:
+                response_text = describe_suggestions(recipes)
+                await _record_turn(db, thread, request.message, response_text)
+                return ChatResponse(response=response_text, recipes=recipes)
+
         meal_plan_data = await generate_meal_plan(
             user_guidelines=request.message,
             pantry_items=pantry_data,
@@ -404,68 +634,171 @@ async def chat(
             from models import Meal
             from datetime import datetime
             meals = [Meal(**meal) for meal in meal_plan_data["meals"]]
-            plan_date = pantry_items[0].date_added.strftime('%Y-%m-%d') if pantry_items else datetime.utcnow().strftime('%Y-%m-%d')
+            plan_date = datetime.utcnow().strftime('%Y-%m-%d')
             meal_plan_create = MealPlanCreate(
                 name=f"AI Generated Plan - {plan_date}",
                 description=request.message,
                 meals=meals
             )
-            db_meal_plan = await create_meal_plan(db, current_user.id, meal_plan_create)
+            with span("save_meal_plan"):
+                db_meal_plan = await create_meal_plan(db, current_user.id, meal_plan_create)
             
-            return ChatResponse(
-                response=f"I've created a meal plan for you! It includes {len(meals)} meals. You can view it in your meal plans.",
-                meal_plan=db_meal_plan
-            )
+            response_text = f"I've created a meal plan for you! It includes {len(meals)} meals. You can view it in your meal plans."
+            await _record_turn(db, thread, request.message, response_text)
+            return ChatResponse(response=response_text, meal_plan=db_meal_plan)
     
-    # Regular chat
-    context = {
-        "pantry_item_count": len(pantry_items),
-        "has_items": len(pantry_items) > 0
-    }
-    if request.context:
-        context.update(request.context)
-    
-    response_text = await chat_with_assistant(request.message, context)
+    # Regular chat: client context is bounded; server keys win on conflict
+    with span("load_pantry"):
+        pantry_item_count = await count_pantry_items(db, current_user.id)
+    context = clamp_context(request.context)
+    context.update({
+        "pantry_item_count": pantry_item_count,
+        "has_items": pantry_item_count > 0
+    })
+
+    # Rolling summary plus the recent turns that fit the prompt ceiling
+    with span("load_chat_history"):
+        history, unsummarized = await load_history(db, thread, request.message, context)
+    response_text = await chat_with_assistant(request.message, context, history, thread.summary)
+    await _record_turn(db, thread, request.message, response_text, unsummarized)
     return ChatResponse(response=response_text)
 
-# Frontend error logging endpoint
+async def _record_turn(db: AsyncSession, thread, message: str, response_text: str, unsummarized=None):
+    """Store a user message and its reply; summarize in the background once the window overflows"""
+    turn = [
+        ("user", message, estimate_tokens(message)),
+        ("assistant", response_text, estimate_tokens(response_text))
+    ]
+    with span("save_chat_turn"):
+        if unsummarized is None:
+            unsummarized = await get_recent_chat_messages(
+                db, thread.id, thread.summarized_through, limit=CHAT_HISTORY_MAX_MESSAGES
+            )
+        await add_chat_messages(db, thread, turn)
+    unsummarized_tokens = sum(message.tokens for message in unsummarized) + turn[0][2] + turn[1][2]
+    if needs_summary(unsummarized_tokens, len(unsummarized) + len(turn)):
+        schedule_summary(thread.id)
+
+@app.get("/api/chat/threads", response_model=List[ChatThreadSummary])
+async def list_chat_threads(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the current user's chat threads, most recently active first"""
+    return await get_chat_threads(db, current_user.id, skip, limit)
+
+@app.get("/api/chat/threads/{thread_id}", response_model=ChatThreadResponse)
+async def get_chat_thread_by_id(
+    thread_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a chat thread's rolling summary and its most recent messages"""
+    thread = await get_chat_thread(db, thread_id, current_user.id)
+    if thread is None:
+        raise HTTPException(status_code=404, detail="Chat thread not found")
+    messages = await get_recent_chat_messages(db, thread_id, limit=limit)
+    return ChatThreadResponse(
+        id=thread.id,
+        created_at=thread.created_at,
+        updated_at=thread.updated_at,
+        summary=thread.summary,
+        messages=messages
+    )
+
+@app.delete("/api/chat/threads/{thread_id}", status_code=204)
+async def delete_chat_thread_by_id(
+    thread_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a chat thread and its messages"""
+    success = await delete_chat_thread(db, thread_id, current_user.id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Chat thread not found")
+
+# Admin endpoints
+@app.get("/api/admin/traces")
+async def list_slow_traces(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(get_current_admin)
+):
+    """Get the most recent slow request traces, newest first"""
+    return list(reversed(slow_traces))[:limit]
+
+@app.post("/api/admin/profiler")
+async def arm_profiler(
+    request: ProfilerArmRequest,
+    current_user: User = Depends(get_current_admin)
+):
+    """Profile the next N requests (optionally only those to one path)"""
+    profiler_state.arm(request.requests, request.route)
+    logger.info(
+        "Profiler armed by %s for %d request(s) on %s",
+        current_user.username, request.requests, request.route or "any route"
+    )
+    return {"remaining": profiler_state.remaining, "route": profiler_state.route}
+
+@app.get("/api/admin/profiles")
+async def list_profiles(current_user: User = Depends(get_current_admin)):
+    """List routes with collected profiles"""
+    return {"remaining": profiler_state.remaining, "profiles": profiles.summary()}
+
+@app.get("/api/admin/profiles/collapsed", response_class=PlainTextResponse)
+async def get_collapsed_profile(
+    route: str,
+    current_user: User = Depends(get_current_admin)
+):
+    """Collapsed stacks for a route template (load into speedscope or flamegraph.pl)"""
+    collapsed = profiles.collapsed(route)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="No profile for this route")
+    return PlainTextResponse(collapsed)
+
+@app.delete("/api/admin/profiles", status_code=204)
+async def clear_profiles(current_user: User = Depends(get_current_admin)):
+    """Discard collected profiles and disarm the profiler"""
+    profiles.clear()
+    profiler_state.arm(0)
+
+# Frontend error logging endpoints. Reports are authenticated from the token
+# alone (no user lookup), deduplicated by fingerprint and rate limited per user.
 @app.post("/api/log/frontend-error", status_code=200)
 async def log_frontend_error(
     error: FrontendErrorLog,
     request: Request,
-    current_user: User = Depends(get_current_user)
+    username: str = Depends(get_token_username)
 ):
     """Log frontend errors for debugging and monitoring"""
     try:
         # Extract client info
         client_host = request.client.host if request.client else "unknown"
-        
-        # Log the error with full details
-        logger.error(
-            f"FRONTEND ERROR - User: {current_user.username} (ID: {current_user.id}) | "
-            f"Client: {client_host} | "
-            f"Component: {error.component or 'N/A'} | "
-            f"URL: {error.url or 'N/A'} | "
-            f"Message: {error.error_message} | "
-            f"User-Agent: {error.user_agent or 'N/A'} | "
-            f"Timestamp: {error.timestamp or 'N/A'}"
-        )
-        
-        # Log stack trace if available
-        if error.error_stack:
-            logger.error(f"Stack trace: {error.error_stack}")
-        
-        # Log additional data if available
-        if error.additional_data:
-            logger.error(f"Additional data: {error.additional_data}")
-        
+        accepted, aggregated, dropped = error_reports.ingest(username, [error], client_host)
+        if dropped:
+            return {"status": "dropped", "message": "Error report rate limit reached"}
         return {"status": "logged", "message": "Error logged successfully"}
     except Exception as e:
-        logger.error(f"Failed to log frontend error: {str(e)}")
+        logger.error("Failed to log frontend error: %s", e)
         # Don't raise exception - we don't want logging failures to break the app
         return {"status": "error", "message": "Failed to log error"}
 
+@app.post("/api/log/frontend-errors", response_model=FrontendErrorBatchResponse)
+async def log_frontend_errors(
+    batch: FrontendErrorBatch,
+    request: Request,
+    username: str = Depends(get_token_username)
+):
+    """Log a batch of buffered frontend errors"""
+    client_host = request.client.host if request.client else "unknown"
+    accepted, aggregated, dropped = error_reports.ingest(username, batch.errors, client_host)
+    return {"accepted": accepted, "aggregated": aggregated, "dropped": dropped}
+
 if __name__ == "__main__":
-    import os
+    import uvicorn
     port = int(os.getenv("BACKEND_PORT", "8001"))
-    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True)
+    # log_config=None: uvicorn's loggers propagate into our queue instead of
+    # installing their own synchronous stream handlers
+    uvicorn.run("main:app", host="0.0.0.0", port=port, reload=True, log_config=None)
@@ -0,0 +1,262 @@
+import time
+from bisect import bisect_left
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# A small in-process Prometheus registry. Metrics are plain dicts keyed by
+# label values and updated from the event loop thread, so recording a sample
+# is a dict lookup and an add - no locks, no background work.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 500)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labels, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {value}")
+        return lines
+
+class Gauge(Counter):
+    def dec(self, *labels: str, amount: float = 1):
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+    def collect(self) -> List[str]:
+        lines = super().collect()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._values.get(labels)
+        if series is None:
+            series = self._values[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._values.get(labels)
+        return int(sum(series[:-1])) if series else 0
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, series):
+                cumulative += bucket_count
+                label_str = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+            cumulative += series[len(self.buckets)]
+            label_str = _format_labels(self.labelnames, labels, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{label_str} {cumulative}")
+            plain = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{plain} {series[-1]}")
+            lines.append(f"{self.name}_count{plain} {cumulative}")
+        return lines
+
+REGISTRY: List = []
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+def render_metrics() -> str:
+    """Render every registered metric in the Prometheus text format"""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+# HTTP
+HTTP_REQUESTS = register(Counter(
+    "http_requests_total", "HTTP requests by route template and status",
+    ("method", "route", "status")
+))
+HTTP_REQUEST_DURATION = register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route")
+))
+HTTP_REQUESTS_IN_FLIGHT = register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ("method",)
+))
+HTTP_REQUEST_DB_QUERIES = register(Histogram(
+    "http_request_db_queries", "SQL statements issued per HTTP request",
+    ("method", "route"), COUNT_BUCKETS
+))
+
+# Database
+DB_QUERIES = register(Counter("db_queries_total", "SQL statements executed", ("statement",)))
+DB_QUERY_DURATION = register(Histogram(
+    "db_query_duration_seconds", "SQL statement duration", ("statement",), DB_BUCKETS
+))
+
+# OCR / LLM
+OCR_DURATION = register(Histogram("ocr_duration_seconds", "Receipt OCR duration"))
+LLM_CALL_DURATION = register(Histogram(
+    "llm_call_duration_seconds", "LLM completion latency by calling function", ("function",)
+))
+LLM_TOKENS = register(Counter(
+    "llm_tokens_total", "LLM tokens used by calling function and kind", ("function", "kind")
+))
+LLM_ERRORS = register(Counter("llm_errors_total", "Failed LLM calls by calling function", ("function",)))
+
+# Caches ("hit" / "miss")
+CACHE_REQUESTS = register(Counter("cache_requests_total", "Cache lookups by cache and result", ("cache", "result")))
+
+# Single-flight ("leader" ran the call, "coalesced" awaited it, "overflow"
+# ran its own because the waiter limit was reached)
+SINGLEFLIGHT_CALLS = register(Counter(
+    "singleflight_calls_total", "Single-flight calls by group and outcome", ("group", "result")
+))
+
+# Logging pipeline ("queue_full" / "rate_limited" / "sampled")
+LOG_RECORDS_DROPPED = register(Counter(
+    "log_records_dropped_total", "Log records dropped instead of written", ("reason",)
+))
+
+# Admission control: in_flight / limit is a pool's saturation; rejections by
+# reason ("queue_full" / "queue_timeout" / "rate_limited")
+ADMISSION_IN_FLIGHT = register(Gauge(
+    "admission_in_flight", "Requests holding a slot in a concurrency pool", ("pool",)
+))
+ADMISSION_LIMIT = register(Gauge("admission_limit", "Concurrency pool size", ("pool",)))
+ADMISSION_QUEUED = register(Gauge(
+    "admission_queue_depth", "Requests waiting for a slot in a concurrency pool", ("pool",)
+))
+ADMISSION_QUEUE_WAIT = register(Histogram(
+    "admission_queue_wait_seconds", "Time requests waited for a pool slot", ("pool",)
+))
+ADMISSION_REJECTIONS = register(Counter(
+    "admission_rejections_total", "Requests rejected by admission control", ("pool", "reason")
+))
+
+# Frontend error reports by ingestion result ("accepted" / "aggregated" / "dropped")
+FRONTEND_ERRORS = register(Counter(
+    "frontend_error_reports_total", "Frontend error reports by ingestion result", ("result",)
+))
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+@asynccontextmanager
+async def track_llm_call(function: str):
+    """Time an LLM completion; call .record(response) to count its tokens"""
+    call = _LLMCall(function)
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        LLM_ERRORS.inc(function)
+        raise
+    finally:
+        LLM_CALL_DURATION.observe(time.perf_counter() - start, function)
+
+class _LLMCall:
+    def __init__(self, function: str):
+        self.function = function
+
+    def record(self, response):
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            LLM_TOKENS.inc(self.function, "prompt", amount=usage.prompt_tokens or 0)
+            LLM_TOKENS.inc(self.function, "completion", amount=usage.completion_tokens or 0)
+
+# Per-request SQL statement counter; a one-element list so the SQLAlchemy
+# event handlers can bump it in place
+_request_query_count: ContextVar[Optional[List[int]]] = ContextVar("request_query_count", default=None)
+
+def instrument_engine(sync_engine):
+    """Count and time every SQL statement run through the engine"""
+    from sqlalchemy import event
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        kind = statement.lstrip().split(None, 1)[0].upper() if statement else "OTHER"
+        DB_QUERIES.inc(kind)
+        DB_QUERY_DURATION.observe(elapsed, kind)
+        counter = _request_query_count.get()
+        if counter is not None:
+            counter[0] += 1
+
+class MetricsMiddleware:
+    """Record latency, status, in-flight count and SQL count per route template"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        query_count = [0]
+        token = _request_query_count.set(query_count)
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc(method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec(method)
+            _request_query_count.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            HTTP_REQUESTS.inc(method, template, str(status_code))
+            HTTP_REQUEST_DURATION.observe(elapsed, method, template)
+            HTTP_REQUEST_DB_QUERIES.observe(query_count[0], method, template)
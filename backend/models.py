@@ -61,6 +61,11 @@ class PantryItemResponse(PantryItemBase):
     class Config:
         from_attributes = True
 
+class PantryChangesResponse(BaseModel):
+    items: List[PantryItemResponse]
+    deleted_ids: List[int]
+    cursor: int  # pass back as ?since= on the next sync
+
 # Receipt scanning models
 class ReceiptScanRequest(BaseModel):
     image_base64: str
@@ -73,12 +78,29 @@ class ReceiptScanResponse(BaseModel):
     items: List[PantryItemResponse]
     message: str
 
+class ReceiptBatchScanRequest(BaseModel):
+    images_base64: List[str] = Field(..., min_length=1, max_length=20)
+
+class ReceiptBatchResult(BaseModel):
+    index: int      # position in images_base64
+    status: str     # "ok", "error" or "duplicate" (same image earlier in the batch)
+    message: str
+    items: List[PantryItemResponse] = []
+
+class ReceiptBatchScanResponse(BaseModel):
+    receipts: List[ReceiptBatchResult]
+    items_added: int
+    message: str
+
 # Meal models
 class MealIngredient(BaseModel):
     item_name: str
     quantity: str
     unit: str
 
+    class Config:
+        from_attributes = True
+
 class Meal(BaseModel):
     date: str  # ISO date string
     meal_type: str  # breakfast, lunch, dinner, snack
@@ -91,6 +113,9 @@ class Meal(BaseModel):
     servings: Optional[int] = None
     calories: Optional[float] = None
 
+    class Config:
+        from_attributes = True
+
 class MealPlanCreate(BaseModel):
     name: str
     description: Optional[str] = None
@@ -101,21 +126,79 @@ class MealPlanResponse(BaseModel):
     user_id: int
     name: str
     description: Optional[str] = None
-    meals: List[Dict[str, Any]]
+    meals: List[Meal]
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
 
+class MealPlanSummary(BaseModel):
+    id: int
+    user_id: int
+    name: str
+    description: Optional[str] = None
+    meal_count: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+# Search models
+class SearchResponse(BaseModel):
+    query: str
+    pantry_items: List[PantryItemResponse]
+    meal_plans: List[MealPlanResponse]
+
 # Chat models
 class ChatRequest(BaseModel):
-    message: str
+    message: str = Field(..., min_length=1, max_length=4000)
     context: Optional[Dict[str, Any]] = None
+    # Continue a stored conversation; omitted starts a new thread
+    thread_id: Optional[int] = None
+
+class RecipeSuggestion(BaseModel):
+    """A stored meal matched against the pantry"""
+    name: str
+    meal_type: str
+    description: Optional[str] = None
+    ingredients: List[MealIngredient]
+    directions: List[str]
+    prep_time: Optional[str] = None
+    cook_time: Optional[str] = None
+    servings: Optional[int] = None
+    calories: Optional[float] = None
+    coverage: float  # share of non-staple ingredients in the pantry
+    missing: List[str]
+    expiring: List[str]  # pantry ingredients it uses that expire within 2 days
 
 class ChatResponse(BaseModel):
     response: str
     meal_plan: Optional[MealPlanResponse] = None
+    recipes: Optional[List[RecipeSuggestion]] = None
+    thread_id: Optional[int] = None
+
+class ChatMessageResponse(BaseModel):
+    id: int
+    role: str
+    content: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ChatThreadSummary(BaseModel):
+    id: int
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ChatThreadResponse(ChatThreadSummary):
+    summary: Optional[str] = None
+    messages: List[ChatMessageResponse]  # newest last
 
 # Frontend Error Logging models
 class FrontendErrorLog(BaseModel):
@@ -126,3 +209,17 @@ class FrontendErrorLog(BaseModel):
     user_agent: Optional[str] = None
     timestamp: Optional[str] = None
     additional_data: Optional[Dict[str, Any]] = None
+    count: int = Field(1, ge=1)  # occurrences collapsed into this report by the client
+
+class FrontendErrorBatch(BaseModel):
+    errors: List[FrontendErrorLog] = Field(..., max_length=100)
+
+class FrontendErrorBatchResponse(BaseModel):
+    accepted: int   # new fingerprints logged in full
+    aggregated: int # repeats folded into an existing fingerprint's count
+    dropped: int    # over the per-user rate limit
+
+# Admin models
+class ProfilerArmRequest(BaseModel):
+    requests: int = Field(..., ge=1, le=1000)
+    route: Optional[str] = None  # request path to match, e.g. "/api/receipt/scan"
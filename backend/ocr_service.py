@@ -1,62 +1,191 @@
+import asyncio
 import base64
+import importlib.util
 import io
-import re
-from typing import List, Dict
-from PIL import Image
-import pytesseract
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Optional
+
+from metrics import OCR_DURATION
+from receipt_parser import parse_receipt
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+OCR_ENGINE = os.getenv("OCR_ENGINE", "auto")              # "auto", "tesserocr" or "pytesseract"
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0")) or os.cpu_count() or 1
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+# 6 = a single uniform block of text, which suits receipt columns better
+# than tesseract's default full page layout analysis (3)
+OCR_PSM = int(os.getenv("OCR_PSM", "6"))
+OCR_CHAR_WHITELIST = os.getenv("OCR_CHAR_WHITELIST", "")
+
+# PIL, pytesseract and tesserocr are imported on first OCR, not at server
+# start. tesserocr is optional; pytesseract is always available.
+TESSEROCR_AVAILABLE = importlib.util.find_spec("tesserocr") is not None
+
+class OCREngine:
+    """Turns encoded image bytes into text"""
+
+    name = "base"
+
+    async def recognize(self, image_data: bytes) -> str:
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+class PytesseractEngine(OCREngine):
+    """Runs the tesseract CLI per image, in a thread so the event loop stays free.
+
+    Every call spawns a process and reloads the language model; it is the
+    fallback when tesserocr is not installed.
+    """
+
+    name = "pytesseract"
+
+    def __init__(self, lang: str = OCR_LANG, psm: int = OCR_PSM, whitelist: str = OCR_CHAR_WHITELIST):
+        self.lang = lang
+        self.config = f"--psm {psm}"
+        if whitelist:
+            self.config += f" -c tessedit_char_whitelist={whitelist}"
+
+    def _recognize(self, image_data: bytes) -> str:
+        import pytesseract
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(image_data))
+        return pytesseract.image_to_string(image, lang=self.lang, config=self.config)
+
+    async def recognize(self, image_data: bytes) -> str:
+        return await asyncio.to_thread(self._recognize, image_data)
+
+# Per-worker-process tesserocr handle, created once by _init_tesserocr_worker
+_worker_api = None
+
+def _init_tesserocr_worker(lang: str, psm: int, whitelist: str):
+    global _worker_api
+    import tesserocr
+
+    _worker_api = tesserocr.PyTessBaseAPI(lang=lang, psm=psm)
+    if whitelist:
+        _worker_api.SetVariable("tessedit_char_whitelist", whitelist)
+
+def _tesserocr_recognize(image_data: bytes) -> str:
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(image_data))
+    _worker_api.SetImage(image)
+    try:
+        return _worker_api.GetUTF8Text()
+    finally:
+        _worker_api.Clear()
+
+class TesserocrPoolEngine(OCREngine):
+    """Keeps an initialized Tesseract API per worker process (one per core).
+
+    The language model is loaded once when a worker starts, so a scan only
+    pays for recognition. Images cross the process boundary as encoded bytes.
+    Workers come from a forkserver (spawn where unavailable), not a fork of
+    the server with its logging thread and event loop. If a worker dies the
+    pool is rebuilt and the scan retried once.
+    """
+
+    name = "tesserocr"
+
+    def __init__(
+        self,
+        workers: int = OCR_WORKERS,
+        lang: str = OCR_LANG,
+        psm: int = OCR_PSM,
+        whitelist: str = OCR_CHAR_WHITELIST
+    ):
+        self.workers = workers
+        self.initargs = (lang, psm, whitelist)
+        self.executor = self._new_executor()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(method),
+            initializer=_init_tesserocr_worker,
+            initargs=self.initargs
+        )
+
+    def _replace_broken(self, broken: ProcessPoolExecutor):
+        # Scans that were in flight on the broken pool all land here; only the first rebuilds it
+        if self.executor is broken:
+            logger.warning("OCR worker died; restarting the tesserocr pool")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.executor = self._new_executor()
+
+    async def recognize(self, image_data: bytes) -> str:
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        try:
+            return await loop.run_in_executor(executor, _tesserocr_recognize, image_data)
+        except BrokenProcessPool:
+            self._replace_broken(executor)
+            return await loop.run_in_executor(self.executor, _tesserocr_recognize, image_data)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+_engine: Optional[OCREngine] = None
+
+def create_ocr_engine(kind: str = OCR_ENGINE) -> OCREngine:
+    if kind == "tesserocr" or (kind == "auto" and TESSEROCR_AVAILABLE):
+        if not TESSEROCR_AVAILABLE:
+            raise RuntimeError("OCR_ENGINE=tesserocr but the tesserocr package is not installed")
+        return TesserocrPoolEngine()
+    return PytesseractEngine()
+
+def get_ocr_engine() -> OCREngine:
+    """Return the process-wide OCR engine, creating it on first use"""
+    global _engine
+    if _engine is None:
+        _engine = create_ocr_engine()
+    return _engine
+
+def shutdown_ocr_engine():
+    global _engine
+    if _engine is not None:
+        _engine.shutdown()
+        _engine = None
+
+def decode_image_base64(image_base64: str) -> bytes:
+    """Decode a base64 image, with or without a data: URL prefix"""
+    with span("ocr.decode"):
+        return base64.b64decode(image_base64.split(',')[-1])
+
+async def extract_text(image_data: bytes) -> str:
+    """Extract text from encoded image bytes using OCR"""
+    try:
+        engine = get_ocr_engine()
+        start = time.perf_counter()
+        with span("ocr.tesseract", engine=engine.name):
+            text = await engine.recognize(image_data)
+        OCR_DURATION.observe(time.perf_counter() - start)
+        return text
+    except Exception as e:
+        logger.error("Error extracting text from image: %s", e)
+        return ""
 
 async def extract_text_from_image(image_base64: str) -> str:
     """Extract text from base64 encoded image using OCR"""
     try:
-        # Decode base64 image
-        image_data = base64.b64decode(image_base64.split(',')[-1])
-        image = Image.open(io.BytesIO(image_data))
-        
-        # Perform OCR
-        text = pytesseract.image_to_string(image)
-        return text
+        image_data = decode_image_base64(image_base64)
     except Exception as e:
-        print(f"Error extracting text from image: {e}")
+        logger.error("Error decoding image: %s", e)
         return ""
+    return await extract_text(image_data)
 
 def parse_receipt_items(receipt_text: str) -> List[Dict[str, str]]:
     """Parse receipt text to extract item names and quantities"""
-    items = []
-    lines = receipt_text.split('\n')
-    
-    # Simple pattern matching for receipt items
-    # This is a basic implementation; real-world would need more sophisticated parsing
-    for line in lines:
-        line = line.strip()
-        if not line or len(line) < 3:
-            continue
-        
-        # Skip common receipt headers/footers
-        skip_terms = ['total', 'subtotal', 'tax', 'change', 'cash', 'credit', 
-                      'debit', 'thank you', 'receipt', 'store', 'date', 'time']
-        if any(term in line.lower() for term in skip_terms):
-            continue
-        
-        # Look for items (simple heuristic: lines with letters and possibly numbers/prices)
-        if re.search(r'[a-zA-Z]{3,}', line):
-            # Try to extract price at end
-            price_match = re.search(r'\$?\d+\.\d{2}$', line)
-            if price_match:
-                item_name = line[:price_match.start()].strip()
-            else:
-                item_name = line
-            
-            # Try to extract quantity
-            qty_match = re.search(r'^(\d+)x?\s+', item_name, re.IGNORECASE)
-            quantity = "1"
-            if qty_match:
-                quantity = qty_match.group(1)
-                item_name = item_name[qty_match.end():].strip()
-            
-            if item_name and len(item_name) > 2:
-                items.append({
-                    "receipt_name": item_name,
-                    "quantity": quantity
-                })
-    
-    return items
+    return parse_receipt(receipt_text)
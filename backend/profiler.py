@@ -0,0 +1,186 @@
+import asyncio
+import hmac
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Dict, Optional, Set
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Configuration
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+# Requests carrying X-Profile-Token: <this value> are profiled; unset disables the header
+PROFILER_TOKEN = os.getenv("PROFILER_TOKEN", "")
+MAX_STACK_DEPTH = 128
+
+class StackSampler:
+    """Sample one thread's Python stack on a background thread.
+
+    Stacks are stored collapsed ("outer;inner;leaf" -> count), the input
+    format of flamegraph.pl and speedscope. With `tasks`, only samples
+    taken while one of those asyncio tasks is running on `loop` are kept;
+    the rest (other requests, an idle loop) are counted in `excluded`.
+    """
+
+    def __init__(
+        self,
+        thread_id: int,
+        interval: float,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        tasks: Optional[Set[asyncio.Task]] = None
+    ):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.loop = loop
+        self.tasks = tasks
+        self.stacks: Counter = Counter()
+        self.excluded = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _running_profiled_task(self) -> bool:
+        return self.tasks is None or asyncio.current_task(self.loop) in self.tasks
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self._running_profiled_task():
+                self.excluded += 1
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            # The loop may have switched tasks while the frame was read
+            if frame is None or not self._running_profiled_task():
+                self.excluded += 1
+                continue
+            names = []
+            while frame is not None and len(names) < MAX_STACK_DEPTH:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+class ProfileStore:
+    """Collapsed stacks merged per route template"""
+
+    def __init__(self):
+        self.stacks: Dict[str, Counter] = {}
+        self.requests: Dict[str, int] = {}
+        self.excluded: Dict[str, int] = {}
+
+    def add(self, route: str, stacks: Counter, excluded: int = 0):
+        self.stacks.setdefault(route, Counter()).update(stacks)
+        self.requests[route] = self.requests.get(route, 0) + 1
+        self.excluded[route] = self.excluded.get(route, 0) + excluded
+
+    def summary(self):
+        return [
+            {
+                "route": route,
+                "requests": self.requests[route],
+                "samples": sum(self.stacks[route].values()),
+                # taken while other requests ran or the loop was idle
+                "excluded_samples": self.excluded[route]
+            }
+            for route in self.stacks
+        ]
+
+    def collapsed(self, route: str) -> Optional[str]:
+        stacks = self.stacks.get(route)
+        if stacks is None:
+            return None
+        return "\n".join(f"{stack} {count}" for stack, count in stacks.most_common()) + "\n"
+
+    def clear(self):
+        self.stacks.clear()
+        self.requests.clear()
+        self.excluded.clear()
+
+class ProfilerState:
+    def __init__(self):
+        self.remaining = 0          # profile this many upcoming requests
+        self.route: Optional[str] = None  # only requests to this path, if set
+        self.active = False         # one sampler at a time
+
+    def arm(self, requests: int, route: Optional[str] = None):
+        self.remaining = requests
+        self.route = route
+
+profiler_state = ProfilerState()
+profiles = ProfileStore()
+
+def _tracking_task_factory(tasks: Set[asyncio.Task], previous):
+    """Task factory that adds tasks spawned by a task in `tasks` to it"""
+    def factory(loop, coro, **kwargs):
+        if previous is not None:
+            task = previous(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        if asyncio.current_task(loop) in tasks:
+            tasks.add(task)
+        return task
+    return factory
+
+def _has_profile_token(scope: Scope) -> bool:
+    token = Headers(scope=scope).get("x-profile-token")
+    return token is not None and hmac.compare_digest(token, PROFILER_TOKEN)
+
+class ProfilerMiddleware:
+    """Run the stack sampler around armed requests.
+
+    Requests are profiled when an admin armed the profiler via
+    POST /api/admin/profiler, or when they carry X-Profile-Token matching
+    PROFILER_TOKEN. Otherwise the cost is one attribute check.
+
+    The sampler reads the whole event loop thread, so samples are kept only
+    while the request's task, or a task it spawned, is running; concurrent
+    requests don't leak into its profile. Sync endpoints and work handed to
+    threads or processes are not sampled.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        state = profiler_state
+        if (
+            scope["type"] != "http"
+            or state.active
+            or not (state.remaining or PROFILER_TOKEN)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        armed = (
+            state.remaining > 0
+            and (state.route is None or scope["path"] == state.route)
+        )
+        if not armed and not (PROFILER_TOKEN and _has_profile_token(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        if armed:
+            state.remaining -= 1
+        state.active = True
+        loop = asyncio.get_running_loop()
+        tasks = {asyncio.current_task()}
+        previous_factory = loop.get_task_factory()
+        loop.set_task_factory(_tracking_task_factory(tasks, previous_factory))
+        sampler = StackSampler(threading.get_ident(), PROFILER_INTERVAL_MS / 1000, loop, tasks)
+        sampler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            stacks = sampler.stop()
+            loop.set_task_factory(previous_factory)
+            state.active = False
+            route = scope.get("route")
+            profiles.add(getattr(route, "path", scope["path"]), stacks, sampler.excluded)
@@ -0,0 +1,109 @@
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import tiktoken
+except ImportError:  # tiktoken is optional; without it tokens are estimated from length
+    tiktoken = None
+
+# Configuration
+PROMPT_PANTRY_TOKEN_BUDGET = int(os.getenv("PROMPT_PANTRY_TOKEN_BUDGET", "200"))
+PROMPT_CONTEXT_TOKEN_BUDGET = int(os.getenv("PROMPT_CONTEXT_TOKEN_BUDGET", "150"))
+PANTRY_CONTEXT_MAX_ITEMS = int(os.getenv("PANTRY_CONTEXT_MAX_ITEMS", "200"))  # candidate rows loaded
+CONTEXT_MAX_KEYS = 20
+CONTEXT_MAX_VALUE_CHARS = 200
+
+_encoding = None
+
+def estimate_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, else ~4 characters per token"""
+    global _encoding
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+def _days_left(item: Dict[str, Any], now: datetime) -> Optional[int]:
+    expiry = item.get("date_estimated_expiry")
+    if expiry is None:
+        return None
+    return max((expiry - now).days, 0)
+
+def rank_pantry_items(items: List[Dict[str, Any]], now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """Perishables closest to expiry first, then perishables without a date, then shelf-stable items"""
+    now = now or datetime.utcnow()
+
+    def priority(item):
+        days_left = _days_left(item, now)
+        perishable = item.get("perishable", True)
+        return (not perishable, days_left is None, days_left or 0)
+
+    return sorted(items, key=priority)
+
+def _format_number(value) -> str:
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+def _describe(item: Dict[str, Any], now: datetime) -> str:
+    text = item["item_name"]
+    if item.get("volume"):
+        text += f" {_format_number(item['volume'])}"
+        if item.get("units"):
+            text += f" {item['units']}"
+    days_left = _days_left(item, now)
+    if item.get("perishable", True) and days_left is not None:
+        text += f" ({days_left}d)"
+    return text
+
+def build_pantry_context(
+    items: List[Dict[str, Any]],
+    budget_tokens: int = PROMPT_PANTRY_TOKEN_BUDGET,
+    now: Optional[datetime] = None
+) -> str:
+    """Compact pantry summary for prompts, at most `budget_tokens` long.
+
+    Items are taken most urgent first and listed one line per type, e.g.
+    "dairy: Milk 1 gallon (2d), Eggs 12 (20d)"; (Nd) is days until the
+    estimated expiry. Items that don't fit are counted on a final line.
+    """
+    now = now or datetime.utcnow()
+    groups: Dict[str, List[str]] = {}
+    used = 0
+    included = 0
+    for item in rank_pantry_items(items, now):
+        entry = _describe(item, now)
+        item_type = (item.get("type") or "other").lower()
+        # A new group costs its "type: " prefix and a line break too
+        cost = estimate_tokens(entry + ", " if item_type in groups else f"{item_type}: {entry}\n")
+        if used + cost > budget_tokens:
+            break
+        groups.setdefault(item_type, []).append(entry)
+        used += cost
+        included += 1
+
+    lines = [f"{item_type}: {', '.join(entries)}" for item_type, entries in groups.items()]
+    if included < len(items):
+        lines.append(f"(+{len(items) - included} more items)")
+    return "\n".join(lines)
+
+def clamp_context(context: Optional[Dict[str, Any]], budget_tokens: int = PROMPT_CONTEXT_TOKEN_BUDGET) -> Dict[str, Any]:
+    """Bound client-supplied prompt context: key count, value length and total tokens.
+
+    Nested values are flattened to compact JSON strings; keys past the budget are dropped.
+    """
+    clamped: Dict[str, Any] = {}
+    used = 0
+    for key, value in list((context or {}).items())[:CONTEXT_MAX_KEYS]:
+        if value is not None and not isinstance(value, (str, int, float, bool)):
+            value = json.dumps(value, separators=(",", ":"), default=str)
+        if isinstance(value, str) and len(value) > CONTEXT_MAX_VALUE_CHARS:
+            value = value[:CONTEXT_MAX_VALUE_CHARS] + "..."
+        key = str(key)[:64]
+        cost = estimate_tokens(f'"{key}":{json.dumps(value)},')
+        if used + cost > budget_tokens:
+            break
+        clamped[key] = value
+        used += cost
+    return clamped
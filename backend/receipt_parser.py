@@ -0,0 +1,249 @@
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern
+
+# Receipt lines are classified by a small table of precompiled patterns. A
+# layout profile picks which rules apply and adds store-specific patterns;
+# profiles are chosen by matching the receipt header, or by name.
+
+SKIP_TERMS = (
+    "subtotal", "sub total", "total", "tax", "change", "cash", "credit", "debit",
+    "thank you", "receipt", "store", "date", "time", "balance", "tender", "visa",
+    "mastercard", "amex", "approved", "auth", "items sold", "member", "cashier",
+)
+DISCOUNT_TERMS = ("coupon", "discount", "savings", "you saved", "promo", "markdown", "bonus buy")
+VOID_TERMS = ("void", "voided", "refund")
+
+def _alternation(terms: Iterable[str]) -> str:
+    return "|".join(
+        re.escape(term).replace(r"\ ", r"\s*") for term in sorted(terms, key=len, reverse=True)
+    )
+
+def compile_keywords(skip_terms: Iterable[str]) -> Pattern:
+    """One matcher for void, discount and skip terms, run on the lowercased line.
+
+    The group that matched (lastgroup) says which kind of line it is, so each
+    line is scanned for keywords once instead of once per term.
+    """
+    return re.compile(
+        rf"\b(?:(?P<void>{_alternation(VOID_TERMS)})|(?P<discount>{_alternation(DISCOUNT_TERMS)})"
+        rf"|(?P<skip>{_alternation(skip_terms)}))(?![a-z])"
+    )
+
+# Trailing price with an optional tax/food flag ("3.49 F", "$3.49", "3.49-").
+# It is only searched for in the last PRICE_WINDOW characters of a line.
+PRICE_WINDOW = 16
+PRICE_RE = re.compile(r"\s*\$?(?P<price>-?\d{1,4}[.,]\d{2})(?P<negative>-)?(?:\s+[A-Z]{1,2})?\s*$")
+PRICE_ONLY_RE = re.compile(r"^\$?-?\d{1,4}[.,]\d{2}-?(?:\s+[A-Z]{1,2})?$")
+# Leading quantity: "2 MILK", "3x EGGS", "2 X BREAD"
+QTY_PREFIX_RE = re.compile(r"^(?P<qty>\d{1,2})\s*[xX]?\s+(?=[A-Za-z])")
+# "2 @ 1.99" / "2 @ $1.99 ea" / "3 for 5.00", either on its own line or inline
+QTY_AT_RE = re.compile(
+    r"(?P<qty>\d{1,3})\s*(?:@|for)\s*\$?(?P<unit_price>\d{1,4}[.,]\d{2})(?:\s*(?:ea|each|/ea))?",
+    re.IGNORECASE
+)
+# "1.23 lb @ 0.99 /lb", "0.456 kg @ $4.40/kg"
+WEIGHT_RE = re.compile(
+    r"(?P<qty>\d+(?:\.\d+)?)\s*(?P<unit>lbs?|kg|oz|g)\b\s*@\s*\$?(?P<unit_price>\d{1,4}[.,]\d{2})\s*(?:/\s*(?:lbs?|kg|oz|g))?",
+    re.IGNORECASE
+)
+LETTERS_RE = re.compile(r"[A-Za-z]{3,}")
+WHITESPACE_RE = re.compile(r"\s+")
+
+class LayoutProfile:
+    """How a family of receipts lays out item lines"""
+
+    def __init__(
+        self,
+        name: str,
+        detect: Optional[str] = None,
+        extra_skip_terms: Iterable[str] = (),
+        item_code: Optional[str] = None,
+        multi_line: bool = True,
+        require_price: bool = True
+    ):
+        self.name = name
+        # Matched against the first few lines to pick this profile
+        self.detect = re.compile(detect, re.IGNORECASE) if detect else None
+        self.keywords = compile_keywords(SKIP_TERMS + tuple(extra_skip_terms))
+        # Item/UPC codes to strip from the name, e.g. leading warehouse item numbers
+        self.item_code = re.compile(item_code) if item_code else None
+        # A name line without a price may take its price/quantity from the next line
+        self.multi_line = multi_line
+        # Lines without any price are not items (headers, addresses, slogans)
+        self.require_price = require_price
+
+GENERIC = LayoutProfile("generic")
+PROFILES: Dict[str, LayoutProfile] = {GENERIC.name: GENERIC}
+
+def register_profile(profile: LayoutProfile) -> LayoutProfile:
+    PROFILES[profile.name] = profile
+    return profile
+
+# Warehouse clubs print an item number before the name: "123456 KS WATER 5.99"
+register_profile(LayoutProfile(
+    "warehouse", detect=r"costco|sam'?s club|bj'?s wholesale",
+    extra_skip_terms=("instant savings", "member"), item_code=r"^\d{4,7}\s+"
+))
+# Big-box stores print the UPC after the name: "BANANAS 000000004011 F 1.24 N"
+register_profile(LayoutProfile(
+    "upc_suffix", detect=r"wal-?mart|target|kroger",
+    extra_skip_terms=("st#", "op#", "te#", "tr#"), item_code=r"\s+\d{8,14}(?:\s+[A-Z])?$"
+))
+
+def detect_profile(lines: List[str], header_lines: int = 6) -> LayoutProfile:
+    header = "\n".join(lines[:header_lines])
+    for profile in PROFILES.values():
+        if profile.detect is not None and profile.detect.search(header):
+            return profile
+    return GENERIC
+
+def _number(value: str) -> str:
+    return value.replace(",", ".")
+
+def _clean_name(name: str, profile: LayoutProfile) -> str:
+    if profile.item_code is not None:
+        name = profile.item_code.sub("", name)
+    return WHITESPACE_RE.sub(" ", name).strip(" .-*#")
+
+def _line_total(match, price) -> float:
+    """The amount a quantity line charges: its own total, else quantity x unit price"""
+    if price:
+        return float(_number(price.group("price")))
+    return float(_number(match.group("qty"))) * float(_number(match.group("unit_price")))
+
+def _price_matches(item: Dict[str, str], total: float) -> bool:
+    return "price" in item and abs(float(item["price"]) - total) < 0.015
+
+def iter_receipt_items(lines: Iterable[str], profile: LayoutProfile = GENERIC) -> Iterator[Dict[str, str]]:
+    """Yield {"receipt_name", "quantity"[, "unit", "price"]} for each item line.
+
+    Voids are applied by withholding the most recent item, so one item is
+    buffered before it is yielded. A quantity line goes to the item before it
+    unless that item's price doesn't match the line's total; it then waits for
+    the next item and goes to whichever neighbour's price matches.
+    """
+    pending: Optional[Dict[str, str]] = None   # name line still waiting for a price
+    held: Optional[Dict[str, str]] = None      # last complete item, voidable
+    leading = None   # (quantity details, line total) not yet assigned to an item
+
+    for raw in lines:
+        line = raw.strip()
+        if len(line) < 3:
+            continue
+
+        lower = line.lower()
+        price_from = max(0, len(line) - PRICE_WINDOW)
+
+        # Quantity/weight continuation lines belong to the name line before
+        # them, or to the item after them on layouts that print them first
+        weight = qty_at = None
+        if "@" in line or " for " in lower:
+            weight = WEIGHT_RE.search(line)
+            qty_at = None if weight else QTY_AT_RE.search(line)
+        if (weight or qty_at) and not LETTERS_RE.search(line[:(weight or qty_at).start()]):
+            match = weight or qty_at
+            detail = {"quantity": _number(match.group("qty"))}
+            if weight:
+                detail["unit"] = weight.group("unit").lower().rstrip("s")
+            price = PRICE_RE.search(line, max(match.end(), price_from))
+            if price:
+                detail["price"] = _number(price.group("price"))
+            if leading is not None and held is not None:
+                held.update(leading[0])
+            leading = None
+            if pending is not None:
+                pending.update(detail)
+                if held is not None:
+                    yield held
+                held, pending = pending, None
+            elif held is not None and _price_matches(held, _line_total(match, price)):
+                held.update(detail)
+            else:
+                # Decided by the next item's price
+                leading = (detail, _line_total(match, price))
+            continue
+
+        if PRICE_ONLY_RE.match(line):
+            if pending is not None and profile.multi_line:
+                pending["price"] = _number(line.split()[0].lstrip("$").rstrip("-"))
+                if held is not None:
+                    yield held
+                held, pending = pending, None
+            continue
+
+        keyword = profile.keywords.search(lower)
+        if keyword is not None:
+            if keyword.lastgroup == "void" and PRICE_RE.search(line, price_from):
+                # A priced void/refund cancels the item it follows
+                held = None
+                pending = None
+                leading = None
+            continue
+        if not LETTERS_RE.search(line):
+            continue
+
+        price = PRICE_RE.search(line, price_from)
+        if price and (price.group("negative") or price.group("price").startswith("-")):
+            continue   # unlabeled discount line
+        body = line[:price.start()] if price else line
+        item = {"receipt_name": body, "quantity": "1"}
+        inline = weight or qty_at
+        if inline is not None and inline.start() < len(body):
+            # "BANANAS 2.10 lb @ 0.59/lb 1.24" / "MILK 2 @ 3.49 6.98"
+            item["quantity"] = _number(inline.group("qty"))
+            if weight:
+                item["unit"] = weight.group("unit").lower().rstrip("s")
+            body = body[:inline.start()]
+        else:
+            qty = QTY_PREFIX_RE.match(body)
+            if qty:
+                item["quantity"] = qty.group("qty")
+                body = body[qty.end():]
+        name = _clean_name(body, profile)
+        if len(name) <= 2 or not LETTERS_RE.search(name):
+            continue
+        item["receipt_name"] = name
+
+        if price:
+            item["price"] = _number(price.group("price"))
+            if leading is not None:
+                if _price_matches(item, leading[1]):
+                    item.update(leading[0], price=item["price"])
+                elif held is not None:
+                    held.update(leading[0])
+                leading = None
+            pending = None
+            if held is not None:
+                yield held
+            held = item
+        elif profile.multi_line or not profile.require_price:
+            if leading is not None and held is not None:
+                held.update(leading[0])
+            leading = None
+            if pending is not None and not profile.require_price:
+                if held is not None:
+                    yield held
+                held = pending
+            pending = item
+
+    if held is not None:
+        if leading is not None:
+            held.update(leading[0])
+        yield held
+    if pending is not None and not profile.require_price:
+        yield pending
+
+def parse_receipt(text: str, profile: Optional[str] = None) -> List[Dict[str, str]]:
+    """Parse OCR'd receipt text into item dicts using a detected or named layout profile"""
+    lines = text.splitlines()
+    layout = PROFILES[profile] if profile else detect_profile(lines)
+    items = list(iter_receipt_items(lines, layout))
+    if not items and layout.require_price:
+        # Nothing priced (prices lost in OCR): fall back to name-only lines
+        fallback = LayoutProfile(
+            layout.name, item_code=layout.item_code.pattern if layout.item_code else None,
+            multi_line=False, require_price=False
+        )
+        fallback.keywords = layout.keywords
+        items = list(iter_receipt_items(lines, fallback))
+    return items
@@ -0,0 +1,225 @@
+import os
+from collections import Counter, OrderedDict, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from food_knowledge import lookup_food_knowledge, name_key
+
+# Configuration
+RECIPE_MIN_COVERAGE = float(os.getenv("RECIPE_MIN_COVERAGE", "0.7"))  # below this, fall back to the LLM
+RECIPE_SUGGESTIONS = int(os.getenv("RECIPE_SUGGESTIONS", "3"))
+RECIPE_INDEX_MAX_USERS = int(os.getenv("RECIPE_INDEX_MAX_USERS", "1000"))  # users whose recipes a worker keeps loaded
+RECIPE_URGENCY_WEIGHT = 0.3  # how much using up expiring items counts against coverage
+
+# Assumed to be on hand; never counted as missing
+STAPLES = {"salt", "black pepper", "water", "olive oil", "vegetable oil", "cooking spray"}
+
+def ingredient_key(name: str) -> str:
+    """Canonical ingredient name, so "Baby Spinach" and "spinach" match.
+
+    Uses the bundled food dataset's names, aliases and plurals (not its
+    trailing-word match, which would fold "Coconut Water" into water) and
+    falls back to the lowercased name without a plural "s".
+    """
+    known = lookup_food_knowledge(name)
+    if known is not None:
+        return known.item_name.lower()
+    key = name_key(name)
+    return key[:-1] if key.endswith("s") and not key.endswith("ss") and len(key) > 3 else key
+
+class Recipe:
+    """A stored meal, deduplicated by name and ingredients across one user's meal plans"""
+
+    __slots__ = ("plan_ids", "meal", "ingredient_keys", "needed")
+
+    def __init__(self, plan_id: int, meal: Dict[str, Any], ingredient_keys: Set[str]):
+        self.plan_ids = {plan_id}
+        self.meal = meal
+        self.ingredient_keys = ingredient_keys
+        self.needed = len(ingredient_keys - STAPLES)
+
+class UserRecipes:
+    """One user's recipes with an inverted index from canonical ingredient to recipe.
+
+    `revision` is the user's meal plan collection revision the recipes were
+    loaded at; RecipeIndex serves them only while it is still current.
+    Recipes are keyed by their own ids, not meal ids, since SQLite reuses the
+    ids of deleted meals.
+    """
+
+    def __init__(self, revision: int = 0):
+        self.revision = revision
+        self.recipes: Dict[int, Recipe] = {}
+        self.postings: Dict[str, Set[int]] = defaultdict(set)
+        self._by_signature: Dict[Tuple[str, frozenset], int] = {}
+        self._by_plan: Dict[int, Set[int]] = defaultdict(set)
+        self._next_id = 0
+
+    def add_meal(self, plan_id: int, meal: Dict[str, Any]):
+        keys = {ingredient_key(ingredient["item_name"]) for ingredient in meal["ingredients"]} - {""}
+        signature = (name_key(meal["name"]), frozenset(keys))
+        existing = self._by_signature.get(signature)
+        if existing is not None:
+            self.recipes[existing].plan_ids.add(plan_id)
+            self._by_plan[plan_id].add(existing)
+            return
+        self._next_id += 1
+        recipe_id = self._next_id
+        self._by_signature[signature] = recipe_id
+        self.recipes[recipe_id] = Recipe(plan_id, meal, keys)
+        self._by_plan[plan_id].add(recipe_id)
+        for key in keys - STAPLES:
+            self.postings[key].add(recipe_id)
+
+    def remove_plan(self, plan_id: int):
+        for recipe_id in self._by_plan.pop(plan_id, ()):
+            recipe = self.recipes[recipe_id]
+            recipe.plan_ids.discard(plan_id)
+            if recipe.plan_ids:
+                continue
+            del self.recipes[recipe_id]
+            del self._by_signature[(name_key(recipe.meal["name"]), frozenset(recipe.ingredient_keys))]
+            for key in recipe.ingredient_keys - STAPLES:
+                self.postings[key].discard(recipe_id)
+
+    def suggest(
+        self,
+        pantry: List[Dict[str, Any]],
+        meal_type: Optional[str] = None,
+        limit: int = RECIPE_SUGGESTIONS,
+        min_coverage: float = 0.0,
+        now: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Recipes ranked by pantry coverage plus a bonus for using soon-to-expire items.
+
+        Each suggestion is the stored meal plus coverage, missing
+        and expiring ingredient lists.
+        """
+        now = now or datetime.utcnow()
+        # canonical key -> urgency in (0, 1], 1 = expires today
+        available: Dict[str, float] = {}
+        for item in pantry:
+            key = ingredient_key(item["item_name"])
+            urgency = 0.0
+            expiry = item.get("date_estimated_expiry")
+            if item.get("perishable", True) and expiry is not None:
+                urgency = 1 / (1 + max((expiry - now).days, 0))
+            available[key] = max(available.get(key, 0.0), urgency)
+
+        # Walking the postings of the pantry's ingredients counts, per recipe,
+        # how many of its (non-staple) ingredients are on hand
+        on_hand = Counter()
+        for key in available:
+            postings = self.postings.get(key)
+            if postings:
+                on_hand.update(postings)
+
+        scored = []
+        for recipe_id, count in on_hand.items():
+            recipe = self.recipes[recipe_id]
+            coverage = count / recipe.needed
+            if coverage < min_coverage or (meal_type and recipe.meal["meal_type"].lower() != meal_type):
+                continue
+            urgency = max(available.get(key, 0.0) for key in recipe.ingredient_keys)
+            scored.append((coverage + RECIPE_URGENCY_WEIGHT * urgency, coverage, recipe))
+        scored.sort(key=lambda entry: entry[0], reverse=True)
+
+        suggestions = []
+        for score, coverage, recipe in scored[:limit]:
+            needed = recipe.ingredient_keys - STAPLES
+            suggestions.append(dict(
+                recipe.meal,
+                coverage=round(coverage, 2),
+                missing=sorted(needed - available.keys()),
+                expiring=sorted(key for key in needed if available.get(key, 0.0) >= 1 / 3)
+            ))
+        return suggestions
+
+class RecipeIndex:
+    """Per-user recipe indexes, loaded on first use and kept for the least
+    recently used RECIPE_INDEX_MAX_USERS users.
+
+    A user is only ever offered meals from their own plans. Each load is
+    checked against the user's meal plan collection revision, so plans saved
+    or deleted by another worker trigger a reload of that user's meals
+    instead of being served stale. Writes in this worker update the index in
+    place when it is exactly one revision behind.
+    """
+
+    def __init__(self, max_users: int = RECIPE_INDEX_MAX_USERS):
+        self.max_users = max_users
+        self._users: "OrderedDict[int, UserRecipes]" = OrderedDict()
+
+    async def load(self, db: AsyncSession, user_id: int) -> UserRecipes:
+        """The user's recipes as of their current meal plan revision"""
+        from crud import get_collection_revision, get_user_meals, MEAL_PLANS_COLLECTION
+
+        # Read the revision before the meals: a write committing in between
+        # bumps it past the one recorded here and forces the next reload
+        revision = await get_collection_revision(db, user_id, MEAL_PLANS_COLLECTION)
+        recipes = self._users.get(user_id)
+        if recipes is None or recipes.revision != revision:
+            recipes = UserRecipes(revision)
+            for plan_id, meal in await get_user_meals(db, user_id):
+                recipes.add_meal(plan_id, meal)
+            self._users[user_id] = recipes
+        self._users.move_to_end(user_id)
+        while len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return recipes
+
+    def _advance(self, user_id: int, revision: int) -> Optional[UserRecipes]:
+        """The user's loaded recipes moved to `revision`, or None (and dropped)
+        if another write happened since they were loaded"""
+        recipes = self._users.get(user_id)
+        if recipes is not None and recipes.revision != revision - 1:
+            del self._users[user_id]
+            return None
+        if recipes is not None:
+            recipes.revision = revision
+        return recipes
+
+    def add_plan(self, user_id: int, revision: int, plan_id: int, meals: List[Dict[str, Any]]):
+        recipes = self._advance(user_id, revision)
+        if recipes is not None:
+            for meal in meals:
+                recipes.add_meal(plan_id, meal)
+
+    def remove_plan(self, user_id: int, revision: int, plan_id: int):
+        recipes = self._advance(user_id, revision)
+        if recipes is not None:
+            recipes.remove_plan(plan_id)
+
+recipe_index = RecipeIndex()
+
+MEAL_TYPES = ("breakfast", "lunch", "dinner", "snack")
+
+def requested_meal_type(message: str) -> Optional[str]:
+    message = message.lower()
+    return next((meal_type for meal_type in MEAL_TYPES if meal_type in message), None)
+
+async def suggest_recipes(
+    db: AsyncSession,
+    user_id: int,
+    pantry: List[Dict[str, Any]],
+    message: str
+) -> List[Dict[str, Any]]:
+    """The user's stored recipes covering at least RECIPE_MIN_COVERAGE of their
+    ingredients, of the meal type the message names if any"""
+    recipes = await recipe_index.load(db, user_id)
+    return recipes.suggest(pantry, requested_meal_type(message), min_coverage=RECIPE_MIN_COVERAGE)
+
+def describe_suggestions(suggestions: List[Dict[str, Any]]) -> str:
+    """Chat reply listing suggestions, what they use up and what is missing"""
+    lines = ["Here are recipes from saved meal plans that fit your pantry:"]
+    for number, suggestion in enumerate(suggestions, start=1):
+        line = f"{number}. {suggestion['name']} ({suggestion['coverage']:.0%} of ingredients on hand)"
+        if suggestion["expiring"]:
+            line += f" - uses up {', '.join(suggestion['expiring'])}"
+        if suggestion["missing"]:
+            line += f"; missing {', '.join(suggestion['missing'])}"
+        lines.append(line)
+    lines.append("Ask for a meal plan if you'd like something new.")
+    return "\n".join(lines)
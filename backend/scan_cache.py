@@ -0,0 +1,154 @@
+import asyncio
+import hashlib
+import io
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from metrics import record_cache
+
+# Configuration
+SCAN_CACHE_SIZE = int(os.getenv("SCAN_CACHE_SIZE", "256"))                  # OCR results kept
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "1024"))   # scan responses kept
+IDEMPOTENCY_TTL_S = float(os.getenv("IDEMPOTENCY_TTL_S", str(24 * 3600)))
+# Same user, byte-identical image, no Idempotency-Key: replay within this window
+SCAN_DEDUP_WINDOW_S = float(os.getenv("SCAN_DEDUP_WINDOW_S", "600"))
+# Max differing bits for two images to count as the same receipt photographed
+# again; -1 disables perceptual matching
+SCAN_PHASH_MAX_DISTANCE = int(os.getenv("SCAN_PHASH_MAX_DISTANCE", "-1"))
+
+PHASH_SIZE = 16  # 16x16 difference hash = 256 bits
+
+def content_hash(image_data: bytes) -> str:
+    return hashlib.sha256(image_data).hexdigest()
+
+def perceptual_hash(image_data: bytes) -> Optional[int]:
+    """Difference hash of the grayscale image; near-identical photos differ in few bits"""
+    from PIL import Image
+
+    try:
+        image = Image.open(io.BytesIO(image_data)).convert("L")
+        image = image.resize((PHASH_SIZE + 1, PHASH_SIZE))
+    except Exception:
+        return None
+    pixels = list(image.getdata())
+    bits = 0
+    for row in range(PHASH_SIZE):
+        offset = row * (PHASH_SIZE + 1)
+        for col in range(PHASH_SIZE):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+def _distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+class OCRResultCache:
+    """Bounded LRU of OCR text and parsed items by image content hash.
+
+    With perceptual matching enabled, a miss on the content hash falls back
+    to the closest cached perceptual hash within SCAN_PHASH_MAX_DISTANCE.
+    """
+
+    def __init__(self, size: int = SCAN_CACHE_SIZE, max_distance: int = SCAN_PHASH_MAX_DISTANCE):
+        self.size = size
+        self.max_distance = max_distance
+        self._entries: "OrderedDict[str, Tuple[Optional[int], str, List[Dict[str, str]]]]" = OrderedDict()
+
+    def get(self, digest: str, phash: Optional[int] = None) -> Optional[Tuple[str, List[Dict[str, str]]]]:
+        entry = self._entries.get(digest)
+        if entry is None and phash is not None and self.max_distance >= 0:
+            best = None
+            for other_digest, other in self._entries.items():
+                if other[0] is not None:
+                    distance = _distance(phash, other[0])
+                    if distance <= self.max_distance and (best is None or distance < best[0]):
+                        best = (distance, other_digest)
+            if best is not None:
+                digest = best[1]
+                entry = self._entries[digest]
+        if entry is None:
+            return None
+        self._entries.move_to_end(digest)
+        return entry[1], entry[2]
+
+    def put(self, digest: str, phash: Optional[int], text: str, items: List[Dict[str, str]]):
+        self._entries[digest] = (phash, text, items)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    @property
+    def perceptual(self) -> bool:
+        return self.max_distance >= 0
+
+class IdempotencyStore:
+    """Replays the stored result of a request with a key that was already seen.
+
+    A key that is still running shares the first request's in-flight task.
+    Only successful results are stored. Reusing a key for a different
+    request (fingerprint) is rejected with 422.
+    """
+
+    def __init__(self, size: int = IDEMPOTENCY_CACHE_SIZE):
+        self.size = size
+        # key -> (fingerprint, expires_at, result)
+        self._results: "OrderedDict[Hashable, Tuple[str, float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, Tuple[str, asyncio.Future]] = {}
+
+    def _check(self, stored_fingerprint: str, fingerprint: str):
+        if stored_fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used for a different request"
+            )
+
+    async def run(
+        self,
+        key: Hashable,
+        fingerprint: str,
+        ttl: float,
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """Return (result, replayed)"""
+        now = time.monotonic()
+        stored = self._results.get(key)
+        if stored is not None:
+            if stored[1] > now:
+                self._check(stored[0], fingerprint)
+                self._results.move_to_end(key)
+                record_cache("idempotency", True)
+                return stored[2], True
+            del self._results[key]
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self._check(in_flight[0], fingerprint)
+            record_cache("idempotency", True)
+            return await asyncio.shield(in_flight[1]), True
+
+        record_cache("idempotency", False)
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (fingerprint, future)
+        try:
+            result = await compute()
+        except BaseException as exc:
+            if isinstance(exc, Exception):
+                future.set_exception(exc)
+                # Mark the exception retrieved in case nobody else was waiting
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        finally:
+            del self._in_flight[key]
+        future.set_result(result)
+        self._results[key] = (fingerprint, time.monotonic() + ttl, result)
+        while len(self._results) > self.size:
+            self._results.popitem(last=False)
+        return result, False
+
+ocr_results = OCRResultCache()
+scan_idempotency = IdempotencyStore()
@@ -0,0 +1,158 @@
+import asyncio
+import os
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from chatgpt_service import normalize_item_name, get_item_details
+from crud import create_pantry_items, get_global_knowledge_items
+from food_knowledge import lookup_food_knowledge_many
+from metrics import record_cache
+from models import PantryItemCreate
+from ocr_service import OCR_WORKERS, extract_text, parse_receipt_items
+from scan_cache import ocr_results, perceptual_hash
+from tracing import span
+
+# Configuration
+SCAN_LLM_CONCURRENCY = int(os.getenv("SCAN_LLM_CONCURRENCY", "8"))   # LLM calls in flight per scan request
+
+class ReceiptScan:
+    """One receipt's progress through the scan pipeline"""
+
+    def __init__(self, index: int, image_data: bytes, image_hash: str):
+        self.index = index
+        self.image_data = image_data
+        self.image_hash = image_hash
+        self.status = "pending"     # "ok", "error" or "duplicate"
+        self.message = ""
+        self.extracted: List[Dict[str, str]] = []
+        self.items: List[Any] = []
+
+    def fail(self, message: str):
+        self.status = "error"
+        self.message = message
+
+async def _ocr_and_parse(scan: ReceiptScan, ocr_slots: asyncio.Semaphore) -> ReceiptScan:
+    # OCR and parsing are cached by image content
+    phash = perceptual_hash(scan.image_data) if ocr_results.perceptual else None
+    cached = ocr_results.get(scan.image_hash, phash)
+    record_cache("ocr", cached is not None)
+    if cached is not None:
+        scan.extracted = cached[1]
+    else:
+        async with ocr_slots:
+            receipt_text = await extract_text(scan.image_data)
+        if not receipt_text:
+            scan.fail("Could not extract text from image")
+            return scan
+        with span("parse"):
+            scan.extracted = parse_receipt_items(receipt_text)
+        ocr_results.put(scan.image_hash, phash, receipt_text, scan.extracted)
+
+    if not scan.extracted:
+        scan.fail("Could not find any items in the receipt")
+    return scan
+
+def _pantry_item(item_name: str, extracted: Dict[str, str], knowledge, details: Optional[Dict[str, Any]]) -> PantryItemCreate:
+    if knowledge is not None:
+        # Use existing knowledge
+        return PantryItemCreate(
+            item_name=item_name,
+            receipt_name=extracted["receipt_name"],
+            days_before_expiry=knowledge.typical_days_before_expiry,
+            perishable=knowledge.perishable,
+            type=knowledge.type,
+            units=extracted.get("unit") or knowledge.typical_units,
+            volume=float(extracted.get("quantity", "1")),
+            calories=knowledge.calories_per_unit
+        )
+    details = details or {}
+    return PantryItemCreate(
+        item_name=item_name,
+        receipt_name=extracted["receipt_name"],
+        days_before_expiry=details.get("days_before_expiry"),
+        perishable=details.get("perishable", True),
+        type=details.get("type"),
+        units=extracted.get("unit") or details.get("typical_units"),
+        volume=float(extracted.get("quantity", "1")),
+        calories=details.get("calories_per_unit")
+    )
+
+async def scan_receipts(db: AsyncSession, user_id: int, scans: List[ReceiptScan]) -> List[ReceiptScan]:
+    """Run receipts through OCR -> parse -> enrichment -> one bulk insert.
+
+    Stages overlap: a receipt's names go to the LLM for normalization as soon
+    as its OCR finishes, while other receipts are still in OCR. Each distinct
+    receipt name is normalized once and each distinct item name is looked up
+    or enriched once, however many receipts it appears on.
+    """
+    ocr_slots = asyncio.Semaphore(OCR_WORKERS)
+    llm_slots = asyncio.Semaphore(SCAN_LLM_CONCURRENCY)
+
+    async def limited(call, *args):
+        async with llm_slots:
+            return await call(*args)
+
+    # Identical images in one batch are scanned once. Receipts that already
+    # failed (e.g. undecodable images) are each reported as their own error
+    first_by_hash: Dict[str, ReceiptScan] = {}
+    unique: List[ReceiptScan] = []
+    for scan in scans:
+        if scan.status != "pending":
+            continue
+        first = first_by_hash.setdefault(scan.image_hash, scan)
+        if first is scan:
+            unique.append(scan)
+        else:
+            scan.status = "duplicate"
+            scan.message = f"Same image as receipt {first.index}"
+
+    # Stage 1 + 2: OCR/parse, feeding normalization as each receipt completes
+    normalized: Dict[str, asyncio.Task] = {}
+    for finished in asyncio.as_completed([_ocr_and_parse(scan, ocr_slots) for scan in unique]):
+        scan = await finished
+        for extracted in scan.extracted:
+            name = extracted["receipt_name"]
+            if name not in normalized:
+                normalized[name] = asyncio.create_task(limited(normalize_item_name, name))
+    if normalized:
+        await asyncio.wait(normalized.values())
+    names = {receipt_name: task.result() for receipt_name, task in normalized.items()}
+
+    # Stage 3: bundled seed dataset, then one knowledge query, then the seed
+    # by trailing words, LLM details for the rest
+    item_names = set(names.values())
+    with span("knowledge_lookup"):
+        knowledge = lookup_food_knowledge_many(item_names)
+        for item_name in item_names:
+            record_cache("food_knowledge", item_name in knowledge)
+        unseeded = [item_name for item_name in item_names if item_name not in knowledge]
+        stored = await get_global_knowledge_items(db, unseeded)
+        unknown = [item_name for item_name in unseeded if item_name not in stored]
+        approximate = lookup_food_knowledge_many(unknown, fuzzy=True)
+    for item_name in unseeded:
+        record_cache("global_knowledge", item_name in stored)
+    for item_name in unknown:
+        record_cache("food_knowledge_fuzzy", item_name in approximate)
+    knowledge.update(stored)
+    knowledge.update(approximate)
+    missing = [item_name for item_name in unknown if item_name not in approximate]
+    details = dict(zip(missing, await asyncio.gather(*[limited(get_item_details, name) for name in missing])))
+
+    # Stage 4: one bulk insert for every receipt
+    pending = [scan for scan in unique if scan.status == "pending"]
+    to_create: List[PantryItemCreate] = []
+    for scan in pending:
+        for extracted in scan.extracted:
+            item_name = names[extracted["receipt_name"]]
+            to_create.append(_pantry_item(item_name, extracted, knowledge.get(item_name), details.get(item_name)))
+    with span("persist"):
+        created = await create_pantry_items(db, user_id, to_create) if to_create else []
+
+    position = 0
+    for scan in pending:
+        scan.items = created[position:position + len(scan.extracted)]
+        position += len(scan.extracted)
+        scan.status = "ok"
+        scan.message = f"Successfully added {len(scan.items)} items to your pantry"
+    return scans
@@ -0,0 +1,227 @@
+import re
+from typing import List, Dict, Optional
+from sqlalchemy import text, select, or_
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncConnection
+
+from database import engine, PantryItem, MealPlan, MealPlanMeal, MealPlanIngredient
+
+# Full-text search is backed by SQLite FTS5 virtual tables. The rowid of each
+# index row is the id of the pantry item / meal plan it describes, so keeping
+# the index in sync is a single statement per write.
+FTS_ENABLED = engine.dialect.name == "sqlite"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_SEARCH_TABLES = {
+    "pantry_search": """
+        CREATE VIRTUAL TABLE IF NOT EXISTS pantry_search USING fts5(
+            item_name, receipt_name, type,
+            user_id UNINDEXED,
+            tokenize = 'porter unicode61'
+        )
+    """,
+    "meal_plan_search": """
+        CREATE VIRTUAL TABLE IF NOT EXISTS meal_plan_search USING fts5(
+            name, meal_names, ingredients, directions,
+            user_id UNINDEXED,
+            tokenize = 'porter unicode61'
+        )
+    """,
+}
+
+def _meal_plan_document(meals: List[MealPlanMeal]) -> Dict[str, str]:
+    """Flatten a plan's meals into searchable text columns"""
+    meal_names, ingredients, directions = [], [], []
+    for meal in meals:
+        meal_names.append(meal.name)
+        if meal.description:
+            meal_names.append(meal.description)
+        ingredients.extend(ingredient.item_name for ingredient in meal.ingredients)
+        directions.extend(meal.directions or [])
+    return {
+        "meal_names": "\n".join(meal_names),
+        "ingredients": "\n".join(ingredients),
+        "directions": "\n".join(directions),
+    }
+
+def build_match_query(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 MATCH expression (all terms, prefix match)"""
+    tokens = _TOKEN_RE.findall(query.lower())
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+async def ensure_search_index(conn: AsyncConnection):
+    """Create the FTS tables and backfill them from existing rows if they are new"""
+    if not FTS_ENABLED:
+        return
+    for table_name, ddl in _SEARCH_TABLES.items():
+        result = await conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": table_name}
+        )
+        if result.first():
+            continue
+        await conn.execute(text(ddl))
+        if table_name == "pantry_search":
+            await conn.execute(text(
+                "INSERT INTO pantry_search (rowid, item_name, receipt_name, type, user_id) "
+                "SELECT id, item_name, coalesce(receipt_name, ''), coalesce(type, ''), user_id "
+                "FROM pantry_items"
+            ))
+        else:
+            await conn.execute(text(
+                "INSERT INTO meal_plan_search "
+                "(rowid, name, meal_names, ingredients, directions, user_id) "
+                "SELECT p.id, p.name, "
+                "coalesce((SELECT group_concat(m.name || ' ' || coalesce(m.description, ''), char(10)) "
+                "          FROM meal_plan_meals m WHERE m.meal_plan_id = p.id), ''), "
+                "coalesce((SELECT group_concat(i.item_name, char(10)) "
+                "          FROM meal_plan_ingredients i JOIN meal_plan_meals m ON i.meal_id = m.id "
+                "          WHERE m.meal_plan_id = p.id), ''), "
+                "coalesce((SELECT group_concat(d.value, char(10)) "
+                "          FROM meal_plan_meals m, json_each(m.directions) d "
+                "          WHERE m.meal_plan_id = p.id), ''), "
+                "p.user_id "
+                "FROM meal_plans p"
+            ))
+
+async def index_pantry_item(db: AsyncSession, item: PantryItem):
+    """Insert or replace the search index row for a pantry item"""
+    if not FTS_ENABLED:
+        return
+    await remove_pantry_item_from_index(db, item.id)
+    await db.execute(
+        text(
+            "INSERT INTO pantry_search (rowid, item_name, receipt_name, type, user_id) "
+            "VALUES (:id, :item_name, :receipt_name, :type, :user_id)"
+        ),
+        {
+            "id": item.id,
+            "item_name": item.item_name,
+            "receipt_name": item.receipt_name or "",
+            "type": item.type or "",
+            "user_id": item.user_id,
+        }
+    )
+
+async def remove_pantry_item_from_index(db: AsyncSession, item_id: int):
+    """Drop a pantry item from the search index"""
+    if not FTS_ENABLED:
+        return
+    await db.execute(text("DELETE FROM pantry_search WHERE rowid = :id"), {"id": item_id})
+
+async def index_meal_plan(db: AsyncSession, meal_plan: MealPlan):
+    """Insert or replace the search index row for a meal plan"""
+    if not FTS_ENABLED:
+        return
+    await remove_meal_plan_from_index(db, meal_plan.id)
+    await db.execute(
+        text(
+            "INSERT INTO meal_plan_search "
+            "(rowid, name, meal_names, ingredients, directions, user_id) "
+            "VALUES (:id, :name, :meal_names, :ingredients, :directions, :user_id)"
+        ),
+        {
+            "id": meal_plan.id,
+            "name": meal_plan.name,
+            "user_id": meal_plan.user_id,
+            **_meal_plan_document(meal_plan.meals),
+        }
+    )
+
+async def remove_meal_plan_from_index(db: AsyncSession, meal_plan_id: int):
+    """Drop a meal plan from the search index"""
+    if not FTS_ENABLED:
+        return
+    await db.execute(text("DELETE FROM meal_plan_search WHERE rowid = :id"), {"id": meal_plan_id})
+
+async def search_pantry_items(
+    db: AsyncSession,
+    user_id: int,
+    query: str,
+    limit: int = 20
+) -> List[PantryItem]:
+    """Search a user's pantry by item name, receipt name and type"""
+    if not FTS_ENABLED:
+        pattern = f"%{query}%"
+        result = await db.execute(
+            select(PantryItem)
+            .where(
+                PantryItem.user_id == user_id,
+                or_(
+                    PantryItem.item_name.ilike(pattern),
+                    PantryItem.receipt_name.ilike(pattern),
+                    PantryItem.type.ilike(pattern)
+                )
+            )
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    match = build_match_query(query)
+    if match is None:
+        return []
+    hits = await db.execute(
+        text(
+            "SELECT rowid FROM pantry_search "
+            "WHERE pantry_search MATCH :match AND user_id = :user_id "
+            "ORDER BY rank LIMIT :limit"
+        ),
+        {"match": match, "user_id": user_id, "limit": limit}
+    )
+    ids = [row[0] for row in hits]
+    if not ids:
+        return []
+    result = await db.execute(select(PantryItem).where(PantryItem.id.in_(ids)))
+    items = {item.id: item for item in result.scalars()}
+    return [items[item_id] for item_id in ids if item_id in items]
+
+async def search_meal_plans(
+    db: AsyncSession,
+    user_id: int,
+    query: str,
+    limit: int = 20
+) -> List[MealPlan]:
+    """Search a user's meal plans by plan name, meal names, ingredients and directions"""
+    if not FTS_ENABLED:
+        pattern = f"%{query}%"
+        result = await db.execute(
+            select(MealPlan)
+            .where(
+                MealPlan.user_id == user_id,
+                or_(
+                    MealPlan.name.ilike(pattern),
+                    MealPlan.meals.any(MealPlanMeal.name.ilike(pattern)),
+                    MealPlan.meals.any(
+                        MealPlanMeal.ingredients.any(MealPlanIngredient.item_name.ilike(pattern))
+                    )
+                )
+            )
+            .options(selectinload(MealPlan.meals).selectinload(MealPlanMeal.ingredients))
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+    match = build_match_query(query)
+    if match is None:
+        return []
+    hits = await db.execute(
+        text(
+            "SELECT rowid FROM meal_plan_search "
+            "WHERE meal_plan_search MATCH :match AND user_id = :user_id "
+            "ORDER BY rank LIMIT :limit"
+        ),
+        {"match": match, "user_id": user_id, "limit": limit}
+    )
+    ids = [row[0] for row in hits]
+    if not ids:
+        return []
+    result = await db.execute(
+        select(MealPlan)
+        .where(MealPlan.id.in_(ids))
+        .options(selectinload(MealPlan.meals).selectinload(MealPlanMeal.ingredients))
+    )
+    plans = {plan.id: plan for plan in result.scalars()}
+    return [plans[plan_id] for plan_id in ids if plan_id in plans]
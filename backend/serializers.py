@@ -0,0 +1,41 @@
+from typing import Dict, Any
+
+from database import MealPlan, MealPlanMeal
+
+# Plain-dict serializers for rows loaded by our own queries. They skip
+# Pydantic validation on the way out; responses built from them are encoded
+# with ORJSONResponse.
+
+def meal_to_dict(meal: MealPlanMeal) -> Dict[str, Any]:
+    """Serialize a meal and its ingredients"""
+    return {
+        "date": meal.date,
+        "meal_type": meal.meal_type,
+        "name": meal.name,
+        "description": meal.description,
+        "ingredients": [
+            {
+                "item_name": ingredient.item_name,
+                "quantity": ingredient.quantity,
+                "unit": ingredient.unit
+            }
+            for ingredient in meal.ingredients
+        ],
+        "directions": meal.directions,
+        "prep_time": meal.prep_time,
+        "cook_time": meal.cook_time,
+        "servings": meal.servings,
+        "calories": meal.calories
+    }
+
+def meal_plan_to_dict(meal_plan: MealPlan) -> Dict[str, Any]:
+    """Serialize a meal plan with its meals loaded"""
+    return {
+        "id": meal_plan.id,
+        "user_id": meal_plan.user_id,
+        "name": meal_plan.name,
+        "description": meal_plan.description,
+        "meals": [meal_to_dict(meal) for meal in meal_plan.meals],
+        "created_at": meal_plan.created_at,
+        "updated_at": meal_plan.updated_at
+    }
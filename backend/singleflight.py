@@ -0,0 +1,52 @@
+import asyncio
+import functools
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from metrics import SINGLEFLIGHT_CALLS
+
+# Configuration
+SINGLEFLIGHT_MAX_WAITERS = int(os.getenv("SINGLEFLIGHT_MAX_WAITERS", "100"))
+
+class SingleFlight:
+    """Concurrent calls with the same key share one in-flight call.
+
+    The call runs in its own task, so a caller that is cancelled (say, a
+    client that disconnected) does not cancel it for the others. Once a key
+    has `max_waiters` waiters, further callers run their own call instead of
+    queueing behind it.
+    """
+
+    def __init__(self, group: str, max_waiters: int = SINGLEFLIGHT_MAX_WAITERS):
+        self.group = group
+        self.max_waiters = max_waiters
+        self._calls: Dict[Hashable, Tuple[asyncio.Task, list]] = {}
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        in_flight = self._calls.get(key)
+        if in_flight is not None:
+            task, waiters = in_flight
+            if waiters[0] < self.max_waiters:
+                waiters[0] += 1
+                SINGLEFLIGHT_CALLS.inc(self.group, "coalesced")
+                return await asyncio.shield(task)
+            SINGLEFLIGHT_CALLS.inc(self.group, "overflow")
+            return await call()
+
+        SINGLEFLIGHT_CALLS.inc(self.group, "leader")
+        task = asyncio.ensure_future(call())
+        self._calls[key] = (task, [0])
+        task.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(task)
+
+def single_flight(group: str, key: Callable[..., Hashable] = lambda *args: args):
+    """Decorate an async function so concurrent calls with equal keys coalesce"""
+    flight = SingleFlight(group)
+
+    def decorator(function):
+        @functools.wraps(function)
+        async def wrapper(*args):
+            return await flight.do(key(*args), lambda: function(*args))
+        wrapper.flight = flight
+        return wrapper
+    return decorator
@@ -0,0 +1,108 @@
+"""Cold start timing: import time per backend module and time to ready.
+
+main imports this module first and calls `track_imports()`, which times
+every module from the backend directory plus each package main imports
+directly. Other third-party imports count toward the module that first
+imported them. The startup hook calls `mark_ready()` and logs the report.
+"""
+import importlib.abc
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from metrics import Gauge, register
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = str(Path(__file__).resolve().parent)
+
+STARTUP_SECONDS = register(Gauge(
+    "process_startup_seconds", "Cold start duration by phase (imports, startup, ready)", ("phase",)
+))
+
+class _TimedLoader(importlib.abc.Loader):
+    def __init__(self, loader, report: "StartupReport"):
+        self.loader = loader
+        self.report = report
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        self.report._enter()
+        start = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            self.report._exit(module.__name__, time.perf_counter() - start)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
+
+class _ImportTimer(importlib.abc.MetaPathFinder):
+    def __init__(self, report: "StartupReport"):
+        self.report = report
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            top_level = not self.report._children
+            backend = bool(spec.origin) and spec.origin.startswith(BACKEND_DIR)
+            if (top_level or backend) and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self.report)
+            return spec
+        return None
+
+class StartupReport:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.imports_done: Optional[float] = None
+        self.ready: Optional[float] = None
+        # module -> (inclusive seconds, seconds spent in nested backend modules)
+        self.modules: Dict[str, Tuple[float, float]] = {}
+        self._children: List[float] = []
+        self._finder: Optional[_ImportTimer] = None
+
+    def _enter(self):
+        self._children.append(0.0)
+
+    def _exit(self, name: str, elapsed: float):
+        nested = self._children.pop()
+        if self._children:
+            self._children[-1] += elapsed
+        self.modules[name] = (elapsed, nested)
+
+    def track_imports(self):
+        if self._finder is None:
+            self._finder = _ImportTimer(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def imports_finished(self):
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self.imports_done = time.perf_counter()
+
+    def slowest(self, count: int = 8) -> List[Tuple[str, float]]:
+        """Modules by time spent loading them, excluding nested backend modules"""
+        own = [(name, total - nested) for name, (total, nested) in self.modules.items()]
+        return sorted(own, key=lambda item: item[1], reverse=True)[:count]
+
+    def mark_ready(self):
+        self.ready = time.perf_counter()
+        imports = (self.imports_done or self.ready) - self.started
+        STARTUP_SECONDS.set(imports, "imports")
+        STARTUP_SECONDS.set(self.ready - (self.imports_done or self.started), "startup")
+        STARTUP_SECONDS.set(self.ready - self.started, "ready")
+        logger.info(
+            "Ready in %.0f ms (imports %.0f ms); slowest imports: %s",
+            (self.ready - self.started) * 1000, imports * 1000,
+            ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.slowest())
+        )
+
+startup_report = StartupReport()
@@ -0,0 +1,22 @@
+"""Server start must leave the OCR stack, the LLM SDK and the ASGI server unimported.
+
+Runs import main plus the startup hook in a fresh interpreter, like a new
+worker. benchmarks/cold_start.py times the same probe.
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from cold_start import LAZY_MODULES, probe
+
+def test_startup_does_not_import_lazy_modules(tmp_path):
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path}/cold_start.db",
+        SECRET_KEY="test",
+        LOG_LEVEL="WARNING",
+    )
+    result = probe(env)
+    assert result["loaded"] == [], f"imported at startup: {result['loaded']} (must stay lazy: {LAZY_MODULES})"
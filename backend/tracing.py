@@ -0,0 +1,189 @@
+import logging
+import os
+import re
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Configuration
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "1000"))   # keep traces at least this slow
+TRACE_KEEP = int(os.getenv("TRACE_KEEP", "50"))             # how many slow traces to keep
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH")          # append every trace as JSON lines
+MAX_SPANS_PER_TRACE = 2000
+
+# Traces are handed to the logging writer thread, which appends them to
+# TRACE_EXPORT_PATH (see logging_config), so export never blocks the event loop
+export_logger = logging.getLogger(f"{__name__}.export")
+export_logger.setLevel(logging.INFO)
+
+_REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+_SERVER_TIMING_NAME_RE = re.compile(r"[^A-Za-z0-9._-]")
+
+class Trace:
+    """Spans recorded for one request; times are ms relative to the trace start"""
+
+    def __init__(self, trace_id: str, name: str):
+        self.trace_id = trace_id
+        self.name = name
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.dropped_spans = 0
+        self._next_span_id = 0
+
+    def new_span_id(self) -> int:
+        self._next_span_id += 1
+        return self._next_span_id
+
+    def add_span(
+        self,
+        name: str,
+        span_id: int,
+        parent_id: Optional[int],
+        start: float,
+        end: float,
+        attributes: Dict[str, Any]
+    ):
+        if len(self.spans) >= MAX_SPANS_PER_TRACE:
+            self.dropped_spans += 1
+            return
+        self.spans.append({
+            "name": name,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "start_ms": round((start - self.start) * 1000, 3),
+            "duration_ms": round((end - start) * 1000, 3),
+            **({"attributes": attributes} if attributes else {})
+        })
+
+    def duration_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def server_timing(self, total_ms: float, limit: int = 20) -> str:
+        """Summarize span time by name for the Server-Timing header"""
+        totals: Dict[str, List[float]] = {}
+        for span in self.spans:
+            entry = totals.setdefault(span["name"], [0.0, 0])
+            entry[0] += span["duration_ms"]
+            entry[1] += 1
+        parts = [f"total;dur={total_ms:.1f}"]
+        for name, (duration, count) in list(totals.items())[:limit]:
+            token = _SERVER_TIMING_NAME_RE.sub("_", name)
+            part = f"{token};dur={duration:.1f}"
+            if count > 1:
+                part += f';desc="x{count}"'
+            parts.append(part)
+        return ", ".join(parts)
+
+    def to_dict(self, status_code: Optional[int] = None) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration_ms(), 3),
+            "status": status_code,
+            "spans": self.spans,
+            "dropped_spans": self.dropped_spans
+        }
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span_id: ContextVar[Optional[int]] = ContextVar("current_span_id", default=None)
+
+# Most recent traces slower than TRACE_SLOW_MS, newest last
+slow_traces: deque = deque(maxlen=TRACE_KEEP)
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+@contextmanager
+def span(name: str, **attributes):
+    """Record a nested span in the current trace; a no-op outside a request"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    span_id = trace.new_span_id()
+    parent_id = _current_span_id.get()
+    token = _current_span_id.set(span_id)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _current_span_id.reset(token)
+        trace.add_span(name, span_id, parent_id, start, time.perf_counter(), attributes)
+
+def instrument_engine_tracing(sync_engine):
+    """Record every SQL statement as a db.<VERB> span of the current trace"""
+    from sqlalchemy import event
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if _current_trace.get() is not None:
+            conn.info.setdefault("trace_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        trace = _current_trace.get()
+        starts = conn.info.get("trace_start")
+        if trace is None or not starts:
+            return
+        start = starts.pop()
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement else "OTHER"
+        trace.add_span(
+            f"db.{verb}", trace.new_span_id(), _current_span_id.get(),
+            start, time.perf_counter(), {}
+        )
+
+def _export(record: Dict[str, Any]):
+    if record["duration_ms"] >= TRACE_SLOW_MS:
+        slow_traces.append(record)
+    if TRACE_EXPORT_PATH:
+        export_logger.info("trace", extra={"trace": record})
+
+class TracingMiddleware:
+    """Start a trace per request and report its breakdown in Server-Timing.
+
+    The trace id comes from an incoming X-Request-ID when it looks sane and is
+    echoed back as X-Trace-Id.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id", "")
+        trace_id = request_id if _REQUEST_ID_RE.match(request_id) else uuid.uuid4().hex
+        trace = Trace(trace_id, f"{scope['method']} {scope['path']}")
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span_id.set(None)
+        status_code = None
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(raw=message["headers"])
+                headers["X-Trace-Id"] = trace_id
+                headers["Server-Timing"] = trace.server_timing(trace.duration_ms())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_span_id.reset(span_token)
+            _current_trace.reset(trace_token)
+            route = scope.get("route")
+            if route is not None:
+                trace.name = f"{scope['method']} {route.path}"
+            _export(trace.to_dict(status_code))
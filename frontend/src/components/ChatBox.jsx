@@ -2,7 +2,7 @@ import { useState, useRef, useEffect } from 'react';
 import { chatAPI } from '../services/api';
 import '../styles/Chat.css';
 
-function ChatBox({ pantryItems, onResponse }) {
+function ChatBox({ onResponse }) {
   const [messages, setMessages] = useState([
     {
       role: 'assistant',
@@ -11,6 +11,7 @@ function ChatBox({ pantryItems, onResponse }) {
   ]);
   const [input, setInput] = useState('');
   const [loading, setLoading] = useState(false);
+  const [threadId, setThreadId] = useState(null);
   const messagesEndRef = useRef(null);
 
   const scrollToBottom = () => {
@@ -32,9 +33,8 @@ function ChatBox({ pantryItems, onResponse }) {
     setLoading(true);
 
     try {
-      const response = await chatAPI.sendMessage(userMessage, {
-        pantry_item_count: pantryItems.length
-      });
+      const response = await chatAPI.sendMessage(userMessage, threadId);
+      setThreadId(response.data.thread_id);
       
       // Add assistant response
       setMessages(prev => [...prev, {
@@ -128,7 +128,6 @@ function MainApp({ user, onLogout }) {
 
         <div className="chat-section">
           <ChatBox 
-            pantryItems={pantryItems}
             onResponse={handleChatResponse}
           />
         </div>
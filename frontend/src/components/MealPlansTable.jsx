@@ -1,10 +1,22 @@
 import { useState } from 'react';
+import { mealPlanAPI } from '../services/api';
 import '../styles/Table.css';
 
 function MealPlansTable({ mealPlans, onDelete }) {
   const [selectedPlan, setSelectedPlan] = useState(null);
   const [selectedMeal, setSelectedMeal] = useState(null);
 
+  // The list only carries summaries; load the meals when a plan is opened
+  const openPlan = async (plan) => {
+    try {
+      const response = await mealPlanAPI.getById(plan.id);
+      setSelectedPlan(response.data);
+    } catch (err) {
+      console.error('Error loading meal plan:', err);
+      alert('Failed to load meal plan');
+    }
+  };
+
   const formatDate = (dateString) => {
     const date = new Date(dateString);
     return date.toLocaleDateString();
@@ -33,10 +45,10 @@ function MealPlansTable({ mealPlans, onDelete }) {
         </thead>
         <tbody>
           {mealPlans.map(plan => (
-            <tr key={plan.id} onClick={() => setSelectedPlan(plan)}>
+            <tr key={plan.id} onClick={() => openPlan(plan)}>
               <td className="item-name">{plan.name}</td>
               <td>{plan.description || 'No description'}</td>
-              <td>{plan.meals.length}</td>
+              <td>{plan.meal_count}</td>
               <td>{formatDate(plan.created_at)}</td>
               <td>
                 <button 
@@ -5,22 +5,28 @@ import '../styles/Scanner.css';
 function ReceiptScanner({ onSuccess, onClose }) {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
-  const [preview, setPreview] = useState(null);
+  const [previews, setPreviews] = useState([]);
+  const [scanKey, setScanKey] = useState(null);
   const fileInputRef = useRef(null);
 
-  const handleFileSelect = (e) => {
-    const file = e.target.files[0];
-    if (file) {
-      const reader = new FileReader();
-      reader.onloadend = () => {
-        setPreview(reader.result);
-      };
-      reader.readAsDataURL(file);
+  const readFile = (file) => new Promise((resolve, reject) => {
+    const reader = new FileReader();
+    reader.onloadend = () => resolve(reader.result);
+    reader.onerror = reject;
+    reader.readAsDataURL(file);
+  });
+
+  const handleFileSelect = async (e) => {
+    const files = Array.from(e.target.files);
+    if (files.length) {
+      setPreviews(await Promise.all(files.map(readFile)));
+      // One key per selection: rescanning it replays the first result
+      setScanKey(crypto.randomUUID());
     }
   };
 
   const handleScan = async () => {
-    if (!preview) {
+    if (!previews.length) {
       setError('Please select an image first');
       return;
     }
@@ -29,9 +35,17 @@ function ReceiptScanner({ onSuccess, onClose }) {
     setError('');
 
     try {
-      const response = await pantryAPI.scanReceipt(preview);
-      alert(response.data.message);
-      onSuccess(response.data.items);
+      if (previews.length > 1) {
+        // Several receipts go through the batch endpoint in one request
+        const response = await pantryAPI.scanReceipts(previews, scanKey);
+        const failed = response.data.receipts.filter((receipt) => receipt.status === 'error');
+        alert(response.data.message + (failed.length ? `\n${failed.length} receipt(s) could not be read` : ''));
+        onSuccess(response.data.receipts.flatMap((receipt) => receipt.items));
+      } else {
+        const response = await pantryAPI.scanReceipt(previews[0], scanKey);
+        alert(response.data.message);
+        onSuccess(response.data.items);
+      }
     } catch (err) {
       setError(err.response?.data?.detail || 'Failed to scan receipt');
     } finally {
@@ -53,6 +67,7 @@ function ReceiptScanner({ onSuccess, onClose }) {
             type="file"
             accept="image/*"
             capture="environment"
+            multiple
             onChange={handleFileSelect}
             style={{ display: 'none' }}
           />
@@ -65,9 +80,10 @@ function ReceiptScanner({ onSuccess, onClose }) {
           </button>
         </div>
 
-        {preview && (
+        {previews.length > 0 && (
           <div className="preview-container">
-            <img src={preview} alt="Receipt preview" />
+            <img src={previews[0]} alt="Receipt preview" />
+            {previews.length > 1 && <p>+ {previews.length - 1} more receipt(s)</p>}
           </div>
         )}
 
@@ -76,7 +92,7 @@ function ReceiptScanner({ onSuccess, onClose }) {
         <div className="scanner-footer">
           <button 
             onClick={handleScan} 
-            disabled={!preview || loading}
+            disabled={!previews.length || loading}
             className="scan-btn-primary"
           >
             {loading ? 'Scanning...' : 'Scan & Add Items'}
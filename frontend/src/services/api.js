@@ -19,38 +19,81 @@ api.interceptors.request.use((config) => {
   return config;
 });
 
+// Buffered error reporting: errors are collapsed by (message, component, url)
+// and sent in batches, so an error storm costs a handful of requests
+const ERROR_FLUSH_INTERVAL_MS = 5000;
+const ERROR_BUFFER_LIMIT = 50;
+let errorBuffer = new Map();
+let errorFlushTimer = null;
+
+const flushErrors = (keepalive = false) => {
+  if (errorFlushTimer) {
+    clearTimeout(errorFlushTimer);
+    errorFlushTimer = null;
+  }
+  const token = localStorage.getItem('token');
+  if (!token || errorBuffer.size === 0) {
+    errorBuffer.clear();
+    return;
+  }
+  const errors = Array.from(errorBuffer.values());
+  errorBuffer = new Map();
+
+  // fetch with keepalive survives page unload, unlike an axios request
+  fetch(`${API_BASE_URL}/log/frontend-errors`, {
+    method: 'POST',
+    keepalive,
+    headers: {
+      'Content-Type': 'application/json',
+      Authorization: `Bearer ${token}`
+    },
+    body: JSON.stringify({ errors })
+  }).catch(() => {
+    // Silently fail if logging fails
+    console.warn('Failed to log errors to backend');
+  });
+};
+
+export const reportError = (errorLog) => {
+  // Only report errors if we have a token (user is logged in)
+  if (!localStorage.getItem('token')) return;
+  try {
+    const key = `${errorLog.error_message}|${errorLog.component || ''}|${errorLog.url || ''}`;
+    const existing = errorBuffer.get(key);
+    if (existing) {
+      existing.count += 1;
+    } else if (errorBuffer.size < ERROR_BUFFER_LIMIT) {
+      errorBuffer.set(key, { ...errorLog, count: 1 });
+    }
+    if (!errorFlushTimer) {
+      errorFlushTimer = setTimeout(flushErrors, ERROR_FLUSH_INTERVAL_MS);
+    }
+  } catch (loggingError) {
+    // Don't let logging errors break the app
+    console.warn('Error while logging to backend:', loggingError);
+  }
+};
+
+window.addEventListener('pagehide', () => flushErrors(true));
+
 // Add error interceptor to log errors to backend
 api.interceptors.response.use(
   (response) => response,
   async (error) => {
-    // Log error to backend if we have a token (user is logged in)
-    const token = localStorage.getItem('token');
-    if (token && error.config && !error.config.url?.includes('/log/frontend-error')) {
-      try {
-        // Extract error details
-        const errorLog = {
-          error_message: error.message || 'Unknown error',
-          error_stack: error.stack || null,
-          url: window.location.href,
-          user_agent: navigator.userAgent,
-          timestamp: new Date().toISOString(),
-          additional_data: {
-            request_url: error.config.url,
-            request_method: error.config.method,
-            response_status: error.response?.status,
-            response_data: error.response?.data
-          }
-        };
-
-        // Send to backend (don't await to avoid blocking)
-        api.post('/log/frontend-error', errorLog).catch(() => {
-          // Silently fail if logging fails
-          console.warn('Failed to log error to backend');
-        });
-      } catch (loggingError) {
-        // Don't let logging errors break the app
-        console.warn('Error while logging to backend:', loggingError);
-      }
+    if (error.config) {
+      reportError({
+        error_message: error.message || 'Unknown error',
+        error_stack: error.stack || null,
+        url: window.location.href,
+        user_agent: navigator.userAgent,
+        timestamp: new Date().toISOString(),
+        additional_data: {
+          request_url: error.config.url,
+          request_method: error.config.method,
+          response_status: error.response?.status,
+          response_data: error.response?.data
+        }
+      });
     }
     
     return Promise.reject(error);
@@ -86,14 +129,23 @@ export const pantryAPI = {
   delete: (id) => 
     api.delete(`/pantry/${id}`),
   
-  scanReceipt: (imageBase64) => 
-    api.post('/receipt/scan', { image_base64: imageBase64 })
+  // The idempotency key makes a retried or double-tapped scan return the
+  // original result instead of adding the items twice
+  scanReceipt: (imageBase64, idempotencyKey) => 
+    api.post('/receipt/scan', { image_base64: imageBase64 }, {
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {}
+    }),
+
+  scanReceipts: (imagesBase64, idempotencyKey) => 
+    api.post('/receipt/scan-batch', { images_base64: imagesBase64 }, {
+      headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {}
+    })
 };
 
 // Meal Plan API
 export const mealPlanAPI = {
   getAll: () => 
-    api.get('/meal-plans'),
+    api.get('/meal-plans', { params: { view: 'summary' } }),
   
   getById: (id) => 
     api.get(`/meal-plans/${id}`),
@@ -107,8 +159,18 @@ export const mealPlanAPI = {
 
 // Chat API
 export const chatAPI = {
-  sendMessage: (message, context = null) => 
-    api.post('/chat', { message, context })
+  // History lives server-side; send only the new message and the thread it continues
+  sendMessage: (message, threadId = null) => 
+    api.post('/chat', { message, thread_id: threadId }),
+  
+  getThreads: () => 
+    api.get('/chat/threads'),
+  
+  getThread: (id) => 
+    api.get(`/chat/threads/${id}`),
+  
+  deleteThread: (id) => 
+    api.delete(`/chat/threads/${id}`)
 };
 
 export default api;